@@ -1,13 +1,212 @@
-
 import argparse
-from .job_agent import run
+import json
+import logging
+import os
+import sys
+
+from .settings import load_config
+
+
+def run_command(args):
+    from .job_agent import run
+
+    if args.profile:
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            rp = run(args.config)
+        finally:
+            profiler.disable()
+            os.makedirs(os.path.dirname(args.profile) or '.', exist_ok=True)
+            profiler.dump_stats(args.profile)
+            logging.info(f'Profile written to {args.profile}')
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+    else:
+        rp = run(args.config)
+    print(rp)
+
+
+def database_path(args) -> str:
+    db_path = args.db
+    if not db_path:
+        cfg = load_config(args.config) if os.path.exists(args.config) else {}
+        db_path = cfg.get('persistence', {}).get('database_path', 'data/jobs.db')
+    if not os.path.exists(db_path):
+        sys.exit(f'No job database at {db_path}; run the agent first.')
+    return db_path
+
+
+def query_command(args):
+    from .search import search_jobs
+    from .storage import JobStore
+
+    with JobStore(database_path(args)) as store:
+        try:
+            results = search_jobs(store, ' '.join(args.text) or None, source=args.source, company=args.company,
+                                  min_score=args.min_score, since=args.since, until=args.until, days=args.days,
+                                  limit=args.limit, raw_query=args.raw, profile=args.candidate)
+        except ValueError as e:
+            sys.exit(str(e))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for r in results:
+        score = f"{r['final_score']:.2f}" if r['final_score'] is not None else '  - '
+        seen = (r['last_seen'] or '')[:10]
+        print(f"{score}  {seen}  {r['company']} | {r['title']} | {r['location']}\n      {r['url']}")
+    print(f'{len(results)} result(s)')
+
+
+def compact_command(args):
+    from .storage import JobStore
+
+    with JobStore(database_path(args)) as store:
+        removed = store.compact(prune_days=args.prune_days)
+    if args.prune_days is not None:
+        print(f"Pruned {removed['jobs']} job(s), {removed['scores']} score(s) and {removed['fingerprints']} "
+              f"fingerprint(s) not seen in {args.prune_days} days")
+    print(f"Removed {removed['descriptions']} unreferenced description(s); "
+          f"{removed['bytes_before'] / 1e6:.1f} MB -> {removed['bytes_after'] / 1e6:.1f} MB")
+
+
+def rescore_command(args):
+    from .job_agent import report_path_for
+    from .report import ReportWriter
+    from .rescore import (diff_rankings, iter_postings, ranking_changes, rescore, snapshot_config, snapshot_corpora,
+                          summarize_diff)
+    from .snapshot import list_snapshots, read_header
+    from .storage import JobStore
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+    cfg = load_config(args.config)
+    if args.snapshot:
+        paths = list_snapshots(args.snapshot)
+    else:
+        directory = (cfg.get('snapshots', {}) or {}).get('directory', 'data/snapshots')
+        paths = list_snapshots([directory]) if os.path.isdir(directory) else []
+        paths = paths[-1:]
+    if not paths:
+        sys.exit('No crawl snapshots found; enable `snapshots` in the config and run the agent first.')
+    logging.info(f"Rescoring {len(paths)} snapshot(s): {', '.join(os.path.basename(p) for p in paths)}")
+
+    configs = {'current': cfg}
+    if args.against:
+        configs['previous'] = load_config(args.against)
+    elif args.diff:
+        configs['previous'] = snapshot_config(read_header(paths[-1]), cfg)
+
+    batch_size = int(cfg.get('pipeline', {}).get('batch_size', 500) or 500)
+    corpora = snapshot_corpora(iter_postings(paths), configs, batch_size)
+    db_path = cfg.get('persistence', {}).get('database_path', 'data/jobs.db')
+    store = JobStore(db_path) if os.path.exists(db_path) else None
+    try:
+        results = rescore(iter_postings(paths), configs, store, batch_size, corpora)
+    finally:
+        if store is not None:
+            store.close()
+
+    output = {}
+    for name, result in results['current'].items():
+        report_path = report_path_for(name, args.out)
+        ReportWriter.from_config(result.cfg).write(report_path, result.top)
+        entry = {'report': report_path, 'accepted': result.accepted, 'rejections': dict(result.rejections)}
+        previous = results.get('previous', {}).get(name)
+        if previous is not None:
+            rows = diff_rankings(previous.top, result.top)
+            entry['previous_accepted'] = previous.accepted
+            entry['diff'] = summarize_diff(rows)
+            entry['changes'] = ranking_changes(rows)
+        output[name or 'default'] = entry
+
+    if args.json:
+        print(json.dumps(output, indent=2))
+        return
+    for name, entry in output.items():
+        rejected = ', '.join(f'{k} {v}' for k, v in sorted(entry['rejections'].items()))
+        print(f"[{name}] {entry['accepted']} accepted ({rejected or 'none rejected'}); report: {entry['report']}")
+        if 'diff' not in entry:
+            continue
+        d = entry['diff']
+        print(f"  vs previous config ({entry['previous_accepted']} accepted): {d['entered']} entered, "
+              f"{d['dropped']} dropped, {d['moved']} moved, {d['unchanged']} unchanged in the top results")
+        for r in entry['changes'][:args.limit]:
+            rank = f"{r['rank']:>4}" if r['rank'] is not None else '   -'
+            was = f"{r['previous_rank']:>4}" if r['previous_rank'] is not None else '   -'
+            if r['score'] is None:
+                change = 'dropped'
+            elif r['previous_score'] is None:
+                change = 'new'
+            else:
+                change = f"{r['score'] - r['previous_score']:+.2f}"
+            score = f"{r['score']:.2f}" if r['score'] is not None else f"{r['previous_score']:.2f}"
+            print(f"  {rank} {was}  {score} {change:>7}  {r['company']} | {r['title']}")
+        if len(entry['changes']) > args.limit:
+            print(f"  ... {len(entry['changes']) - args.limit} more change(s)")
+
 
 def main():
     parser = argparse.ArgumentParser(description='Run the Enhanced Job AI Agent')
     parser.add_argument('--config', type=str, default='config/config.yaml', help='Path to YAML config file')
+    parser.add_argument('--profile', nargs='?', const='reports/profile.pstats', default=None, metavar='PATH',
+                        help='Capture a cProfile of the run (default: reports/profile.pstats)')
+    commands = parser.add_subparsers(dest='command')
+
+    query = commands.add_parser('query', help='Search jobs stored by earlier runs')
+    query.add_argument('text', nargs='*', help='Full-text query, e.g. kubernetes new-grad')
+    query.add_argument('--config', type=str, default=argparse.SUPPRESS, help='Path to YAML config file')
+    query.add_argument('--db', type=str, default=None, help='Job database (default: from config)')
+    query.add_argument('--source', type=str, default=None, help="Source or board, e.g. greenhouse or lever:acme")
+    query.add_argument('--company', type=str, default=None, help='Exact company name (case-insensitive)')
+    query.add_argument('--candidate', type=str, default=None, metavar='PROFILE',
+                       help='Only jobs accepted for this candidate profile')
+    query.add_argument('--min-score', type=float, default=None,
+                       help="Minimum final score (with --candidate, that profile's score)")
+    query.add_argument('--days', type=int, default=None, help='Only jobs seen in the last N days')
+    query.add_argument('--since', type=str, default=None, help='Only jobs last seen on/after this date (YYYY-MM-DD)')
+    query.add_argument('--until', type=str, default=None, help='Only jobs last seen on/before this date (YYYY-MM-DD)')
+    query.add_argument('--limit', type=int, default=20, help='Maximum results (default: 20)')
+    query.add_argument('--raw', action='store_true', help='Pass the query to SQLite FTS5 unchanged')
+    query.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    serve = commands.add_parser('serve', help='Keep running and poll boards for new postings')
+    serve.add_argument('--config', type=str, default=argparse.SUPPRESS, help='Path to YAML config file')
+    serve.add_argument('--once', action='store_true', help='Run the baseline poll only, then exit')
+
+    compact = commands.add_parser('compact', help='Drop unreferenced descriptions and shrink the job database')
+    compact.add_argument('--config', type=str, default=argparse.SUPPRESS, help='Path to YAML config file')
+    compact.add_argument('--db', type=str, default=None, help='Job database (default: from config)')
+    compact.add_argument('--prune-days', type=int, default=None, metavar='N',
+                         help='Also forget postings not seen in the last N days')
+
+    rescore = commands.add_parser('rescore', help='Re-rank saved crawl snapshots offline under the current config')
+    rescore.add_argument('--config', type=str, default=argparse.SUPPRESS, help='Path to YAML config file')
+    rescore.add_argument('--snapshot', nargs='+', default=None, metavar='PATH',
+                         help='Snapshot file(s) or directories of them (default: the latest snapshot)')
+    rescore.add_argument('--diff', action='store_true',
+                         help='Compare the ranking with the config the snapshot was crawled with')
+    rescore.add_argument('--against', type=str, default=None, metavar='CONFIG',
+                         help='Compare the ranking with this config instead')
+    rescore.add_argument('--out', type=str, default=os.path.join('reports', 'rescore'),
+                         help='Directory for the rescored reports (default: reports/rescore)')
+    rescore.add_argument('--limit', type=int, default=20, help='Ranking changes to list (default: 20)')
+    rescore.add_argument('--json', action='store_true', help='Print the results as JSON')
     args = parser.parse_args()
-    rp = run(args.config)
-    print(rp)
+
+    if args.command == 'query':
+        query_command(args)
+    elif args.command == 'compact':
+        compact_command(args)
+    elif args.command == 'rescore':
+        rescore_command(args)
+    elif args.command == 'serve':
+        from .daemon import serve as serve_forever
+        serve_forever(args.config, once=args.once)
+    else:
+        run_command(args)
 
 if __name__ == '__main__':
     main()
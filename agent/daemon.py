@@ -0,0 +1,259 @@
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+from .dedupe import NearDuplicateIndex
+from .job_agent import (ProfileRun, ScoringPool, board_tasks, collapse_duplicates, content_hash, fetch_board,
+                        iter_all_jobs, job_hash, load_config, prepare_corpus, prepare_profiles, report_path_for,
+                        score_batch, send_email)
+from .models import Job
+from .report import ReportWriter, TopJobs, render_html_report
+from .scheduler import THROTTLE_STATUSES, CrawlScheduler
+from .sources.cache import ResponseCache
+from .sources.http import RETRY_STATUSES, HttpTransport
+from .storage import JobStore
+
+# A board whose poll brought nothing new waits this much longer before the
+# next one, up to serve.max_interval_minutes.
+IDLE_BACKOFF = 1.5
+
+# How often the HTTP cache directory is pruned while serving.
+CACHE_PRUNE_INTERVAL = 3600.0
+
+
+@dataclass
+class BoardState:
+    task: Tuple[str, str]
+    interval: float
+    due: float = 0.0
+    job_ids: Set[str] = field(default_factory=set)
+    synced: bool = False
+
+
+class JobWatcher:
+    """Keeps the config, profiles, matchers, DB connection and HTTP state warm
+    and polls every board on its own schedule.
+
+    Boards are first polled together to build a baseline (writing the reports
+    like a run would), then spread evenly over the poll interval. Later polls
+    only handle the delta: a 304 from the ETag cache is skipped outright, and
+    otherwise only postings whose content hash changed since the last poll are
+    deduplicated, scored and persisted. Boards that keep coming back unchanged
+    are polled less often, and a board that changes returns to the base
+    interval. Reports are rewritten only when a profile's top-N changes, and
+    a notification goes out only for newly accepted postings scoring at least
+    serve.notify_min_score on a board that already had its baseline poll.
+    """
+
+    def __init__(self, cfg: Dict, store: JobStore, profiles: List[ProfileRun],
+                 pool: Optional[ScoringPool] = None, dedupe: Optional[NearDuplicateIndex] = None):
+        serve_cfg = cfg.get('serve', {}) or {}
+        sources_cfg = cfg.get('sources', {}) or {}
+        self.cfg = cfg
+        self.store = store
+        self.profiles = profiles
+        self.pool = pool
+        self.dedupe = dedupe
+        self.interval = float(serve_cfg.get('interval_minutes', 30)) * 60
+        self.max_interval = max(self.interval, float(serve_cfg.get('max_interval_minutes', 240)) * 60)
+        self.notify_min_score = float(serve_cfg.get('notify_min_score', 0.75))
+
+        self.transport = HttpTransport.from_config(cfg, retry_statuses=RETRY_STATUSES - THROTTLE_STATUSES)
+        self.cache = ResponseCache.from_config(cfg)
+        self.scheduler = CrawlScheduler.from_config(cfg)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, int(sources_cfg.get('max_workers', 1) or 1)))
+        self.boards = [BoardState(task, self.interval) for task in board_tasks(cfg)]
+
+        # The daemon always scores incrementally, whatever persistence.incremental says.
+        for p in profiles:
+            if not p.cached:
+                p.cached = store.load_scores(p.ctx.score_key, p.name)
+        self.seen: Dict[str, str] = {}
+        self.duplicates: Set[str] = set()
+        # Accepted postings per profile, without descriptions, for the reports.
+        self.live: Dict[str, Dict[str, Job]] = {p.name: {} for p in profiles}
+        self._tops: Dict[str, List[Tuple[str, float]]] = {}
+        self._pruned = time.monotonic()
+        self.stop = threading.Event()
+
+    def _fetch(self, board: BoardState) -> Tuple[Optional[List[Dict]], Optional[int]]:
+        jobs = fetch_board(*board.task, self.transport, self.cache, scheduler=self.scheduler)
+        return jobs, self.transport.last_response()[0]
+
+    def poll(self, boards: List[BoardState]) -> int:
+        """Poll `boards` once and process what changed; returns the number of
+        new or changed postings."""
+        results = list(self.executor.map(self._fetch, boards))
+        now = time.monotonic()
+        new: List[Dict] = []
+        changed: List[Dict] = []
+        quiet: Set[str] = set()
+        for board, (jobs, status) in zip(boards, results):
+            if jobs is None:
+                # Throttled: retry once the host has cooled down.
+                board.due = now + self.scheduler.retry_delay
+                continue
+            if status not in (200, 304):
+                board.due = now + board.interval
+                continue
+            # A 304 replays the cached postings, which only matters for the baseline.
+            if status == 304 and board.synced:
+                board_new, board_changed = [], []
+            else:
+                board_new, board_changed = self._delta(board, jobs)
+            if not board.synced:
+                quiet.update(job_hash((rj.get('url') or '').strip()) for rj in board_new + board_changed)
+                board.synced = True
+            if board_new or board_changed:
+                board.interval = self.interval
+            else:
+                board.interval = min(self.max_interval, board.interval * IDLE_BACKOFF)
+            board.due = now + board.interval
+            new.extend(board_new)
+            changed.extend(board_changed)
+
+        if new or changed:
+            self._process(new, changed, quiet)
+        self._refresh_reports()
+        if self.cache and now - self._pruned > CACHE_PRUNE_INTERVAL:
+            self.cache.prune()
+            self._pruned = now
+        log = logging.info if new or changed else logging.debug
+        log(f"Polled {len(boards)} boards: {len(new)} new and {len(changed)} changed postings")
+        return len(new) + len(changed)
+
+    def _delta(self, board: BoardState, jobs: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        new: List[Dict] = []
+        changed: List[Dict] = []
+        ids: Set[str] = set()
+        for rj in jobs:
+            jid = job_hash((rj.get('url') or '').strip())
+            ids.add(jid)
+            chash = content_hash(rj)
+            before = self.seen.get(jid)
+            if before == chash:
+                continue
+            self.seen[jid] = chash
+            (new if before is None else changed).append(rj)
+        for jid in board.job_ids - ids:
+            self._forget(jid)
+        board.job_ids = ids
+        return new, changed
+
+    def _forget(self, jid: str):
+        self.seen.pop(jid, None)
+        self.duplicates.discard(jid)
+        for live in self.live.values():
+            live.pop(jid, None)
+
+    def _process(self, new: List[Dict], changed: List[Dict], quiet: Set[str]):
+        # Only postings not seen before are clustered; an edited posting keeps
+        # the verdict it got when it first appeared.
+        kept = collapse_duplicates(new, self.dedupe)
+        if len(kept) < len(new):
+            kept_ids = {job_hash((rj.get('url') or '').strip()) for rj in kept}
+            self.duplicates.update(jid for jid in (job_hash((rj.get('url') or '').strip()) for rj in new)
+                                   if jid not in kept_ids)
+        batch = kept + [rj for rj in changed if job_hash((rj.get('url') or '').strip()) not in self.duplicates]
+        batch_ids = [job_hash((rj.get('url') or '').strip()) for rj in batch]
+        accepted_before = {p.name: {jid for jid in batch_ids if (p.cached.get(jid) or (None, 0))[1]}
+                           for p in self.profiles}
+
+        accepted_by, persist = score_batch(batch, self.profiles, self.store, self.pool)
+        self.store.upsert_jobs(persist)
+        if self.dedupe is not None:
+            self.dedupe.flush(self.store)
+
+        for p in self.profiles:
+            accepted = {j.id: j for j in accepted_by[p.name]}
+            live = self.live[p.name]
+            for jid in batch_ids:
+                job = accepted.get(jid)
+                if job is not None:
+                    live[jid] = replace(job, description='')
+                else:
+                    live.pop(jid, None)
+            hits = [j for j in accepted_by[p.name]
+                    if j.final_score >= self.notify_min_score and j.id not in accepted_before[p.name]
+                    and j.id not in quiet]
+            if hits:
+                self._notify(p, hits)
+
+    def _notify(self, profile: ProfileRun, jobs: List[Job]):
+        jobs = sorted(jobs, key=lambda j: j.final_score, reverse=True)
+        subject = f'Job AI Agent: {len(jobs)} new posting(s)' + (f' ({profile.name})' if profile.name else '')
+        if send_email(profile.cfg, subject=subject, html_body=render_html_report(jobs, limit=len(jobs))):
+            logging.info(f'Notified {len(jobs)} new posting(s)' + (f' for {profile.name}' if profile.name else ''))
+            return
+        for j in jobs:
+            logging.info(f'New posting {j.final_score:.2f}: {j.title} at {j.company} ({j.location}) {j.url}')
+
+    def _refresh_reports(self):
+        for p in self.profiles:
+            selected = TopJobs(p.top_n)
+            selected.extend(self.live[p.name].values())
+            top = selected.sorted()
+            signature = [(j.id, j.final_score) for j in top]
+            if signature == self._tops.get(p.name):
+                continue
+            self._tops[p.name] = signature
+            report_path = report_path_for(p.name)
+            ReportWriter.from_config(p.cfg).write(report_path, top)
+            logging.info(f'Report updated: {report_path}')
+
+    def serve_forever(self, once: bool = False):
+        logging.info(f"Baseline poll of {len(self.boards)} boards")
+        self.poll(self.boards)
+        if once:
+            return
+        # Spread the boards evenly over one interval from here on.
+        start = time.monotonic()
+        for i, board in enumerate(self.boards):
+            if board.synced:
+                board.due = start + board.interval * (i + 1) / len(self.boards)
+        while not self.stop.is_set():
+            now = time.monotonic()
+            due = [b for b in self.boards if b.due <= now]
+            if not due:
+                self.stop.wait(min((b.due for b in self.boards), default=now + self.interval) - now)
+                continue
+            self.poll(due)
+
+    def close(self):
+        self.executor.shutdown()
+        self.transport.close()
+        if self.cache:
+            self.cache.prune()
+
+
+def serve(config_path: str, once: bool = False):
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+    cfg = load_config(config_path)
+    store = JobStore.from_config(cfg)
+    corpus = prepare_corpus(cfg)
+    if corpus is not None:
+        # BM25 statistics are taken from one full crawl and kept while serving.
+        logging.info('Crawling every board once for BM25 corpus statistics')
+        corpus.add(iter_all_jobs(cfg))
+    profiles = prepare_profiles(cfg, store, corpus=corpus)
+    pool = ScoringPool.from_config(cfg, [p.ctx for p in profiles])
+    watcher = JobWatcher(cfg, store, profiles, pool, NearDuplicateIndex.from_config(cfg, store))
+
+    def stop(signum, frame):
+        logging.info(f'Received signal {signum}; stopping after the current poll')
+        watcher.stop.set()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+    try:
+        watcher.serve_forever(once)
+    finally:
+        watcher.close()
+        if pool:
+            pool.close()
+        store.close()
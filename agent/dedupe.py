@@ -0,0 +1,139 @@
+import hashlib
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+WORD_RE = re.compile(r'\w+')
+
+# Each 64-bit feature hash is spread into 64 lanes of 32 bits so the per-bit
+# SimHash counters for a whole document can be accumulated with plain integer
+# additions instead of a Python loop over bits.
+LANE_BITS = 32
+_LANE_MASK = (1 << LANE_BITS) - 1
+_BYTE_LANES = [sum(1 << (LANE_BITS * i) for i in range(8) if v >> i & 1) for v in range(256)]
+_BYTE_TABLES = [[lanes << (LANE_BITS * 8 * j) for lanes in _BYTE_LANES] for j in range(8)]
+
+# Title tokens carry this share of a fingerprint's weight, so two different
+# roles that share a company's boilerplate description do not collide.
+TITLE_SHARE = 0.4
+
+_spread_cache: Dict[str, int] = {}
+_SPREAD_CACHE_MAX = 200000
+
+
+def _spread(token: str) -> int:
+    lanes = _spread_cache.get(token)
+    if lanes is None:
+        d = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+        lanes = 0
+        for j in range(8):
+            lanes |= _BYTE_TABLES[j][d[j]]
+        if len(_spread_cache) >= _SPREAD_CACHE_MAX:
+            _spread_cache.clear()
+        _spread_cache[token] = lanes
+    return lanes
+
+
+def simhash(title: str, company: str, description: str) -> int:
+    """64-bit SimHash over the distinct tokens of a posting.
+
+    Tokens are weighted by presence rather than frequency so that common
+    words do not dominate every fingerprint; title tokens are boosted to
+    roughly TITLE_SHARE of the fingerprint.
+    """
+    body = set(WORD_RE.findall(f'{company} {description}'.lower()))
+    head = set(WORD_RE.findall(title.lower()))
+    boost = 1
+    if head and body:
+        # SimHash approximates cosine similarity, so the share is taken over
+        # squared weights.
+        boost = max(1, round(math.sqrt(len(body) * TITLE_SHARE / ((1 - TITLE_SHARE) * len(head)))))
+    body -= head
+
+    total = 0
+    for token in body:
+        total += _spread(token)
+    for token in head:
+        total += _spread(token) * boost
+    half = (len(body) + len(head) * boost) / 2
+    fp = 0
+    for i in range(64):
+        if (total >> (LANE_BITS * i)) & _LANE_MASK > half:
+            fp |= 1 << i
+    return fp
+
+
+class NearDuplicateIndex:
+    """Banded LSH over SimHash fingerprints of every posting seen so far.
+
+    A fingerprint is split into max_distance + 1 bands; two fingerprints
+    within max_distance bits of each other must agree exactly on at least one
+    band, so lookups only compare against postings sharing a band bucket.
+    Each posting belongs to the cluster of the first near-duplicate it
+    matched (or starts its own), and within one run only the first posting
+    of each cluster is kept for scoring.
+    """
+
+    def __init__(self, max_distance: int = 4):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self._width = 64 // self.bands
+        self._band_mask = (1 << self._width) - 1
+        self._buckets: List[Dict[int, Dict[int, str]]] = [{} for _ in range(self.bands)]
+        self._known: Dict[str, Tuple[int, str]] = {}
+        self._claimed: Set[str] = set()
+        self._pending: List[Tuple[str, int, str]] = []
+
+    @classmethod
+    def from_config(cls, cfg: Dict, store) -> Optional['NearDuplicateIndex']:
+        dedupe_cfg = cfg.get('dedupe', {}) or {}
+        if not dedupe_cfg.get('enabled', False):
+            return None
+        index = cls(int(dedupe_cfg.get('max_distance', 4)))
+        if store is not None:
+            index.load(store.load_fingerprints())
+        return index
+
+    def _band_keys(self, fp: int) -> Iterable[Tuple[int, int]]:
+        for band in range(self.bands):
+            yield band, (fp >> (band * self._width)) & self._band_mask
+
+    def add(self, job_id: str, fp: int, cluster_id: str):
+        self._known[job_id] = (fp, cluster_id)
+        for band, key in self._band_keys(fp):
+            self._buckets[band].setdefault(key, {}).setdefault(fp, cluster_id)
+
+    def load(self, rows: Iterable[Tuple[str, int, str]]):
+        for job_id, fp, cluster_id in rows:
+            self.add(job_id, fp, cluster_id)
+
+    def lookup(self, fp: int) -> Optional[str]:
+        """Cluster of the closest indexed fingerprint within max_distance, if any."""
+        best: Optional[Tuple[int, str]] = None
+        for band, key in self._band_keys(fp):
+            for other, cluster_id in self._buckets[band].get(key, {}).items():
+                distance = (fp ^ other).bit_count()
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, cluster_id)
+        return best[1] if best else None
+
+    def assign(self, job_id: str, raw_job: Dict) -> Tuple[str, bool]:
+        """Cluster a posting and report whether its cluster was already seen this run."""
+        fp = simhash(raw_job.get('title') or '', raw_job.get('company') or '', raw_job.get('description') or '')
+        known = self._known.get(job_id)
+        if known is not None:
+            cluster_id = known[1]
+            if known[0] != fp:
+                self.add(job_id, fp, cluster_id)
+        else:
+            cluster_id = self.lookup(fp) or job_id
+            self.add(job_id, fp, cluster_id)
+        self._pending.append((job_id, fp, cluster_id))
+        duplicate = cluster_id in self._claimed
+        self._claimed.add(cluster_id)
+        return cluster_id, duplicate
+
+    def flush(self, store):
+        if self._pending:
+            store.save_fingerprints(self._pending)
+            self._pending = []
@@ -1,10 +1,10 @@
 
-import re
-from typing import Dict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Container, Dict, Iterable, List, Optional, Tuple
 
-US_STATES = {
-    'AL','AK','AZ','AR','CA','CO','CT','DE','FL','GA','HI','ID','IL','IN','IA','KS','KY','LA','ME','MD','MA','MI','MN','MS','MO','MT','NE','NV','NH','NJ','NM','NY','NC','ND','OH','OK','OR','PA','RI','SC','SD','TN','TX','UT','VT','VA','WA','WV','WI','WY','DC'
-}
+from .locations import resolve_location
+from .matcher import Hits, KeywordMatcher
 
 NEGATIVE_SPONSOR_PHRASES = [
     'no sponsorship',
@@ -19,59 +19,101 @@ POSITIVE_SPONSOR_PHRASES = [
 ]
 
 SENIOR_BLOCK = ['senior', 'sr.', 'staff', 'principal', 'lead', 'manager', 'director']
-ENTRY_KEYWORDS_DEFAULT = ['new grad', 'entry-level', 'junior', 'graduate', 'early career', 'university', 'campus', 'recent graduate', '0-2 years', '1+ years']
+ENTRY_KEYWORDS_DEFAULT = ['new grad*', 'entry-level', 'junior', 'graduate', 'early career', 'university', 'campus', 'recent graduate', '0-2 years', '1+ years']
 
 
 def is_us_location(location: str) -> bool:
+    """Whether the posting is in (or remote within) the US; see resolve_location."""
     if not location:
         return False
-    s = location.lower()
-    if 'united states' in s or s.strip() in ('us', 'usa', 'u.s.', 'u.s.a.'):
-        return True
-    tokens = re.split(r'[,\s]+', location.upper())
-    return any(tok in US_STATES for tok in tokens)
+    return resolve_location(location).is_us
 
 
-def compute_entry_level_score(title: str, description: str, cfg: Dict) -> float:
-    t = (title or '').lower()
-    d = (description or '').lower()
+def _keywords(values, default: Iterable[str] = ()) -> Tuple[str, ...]:
+    return tuple(x.lower() for x in values or []) or tuple(default)
 
-    excluded = set([x.lower() for x in cfg.get('filters', {}).get('excluded_seniority', [])] or SENIOR_BLOCK)
-    if any(x in t for x in excluded):
+
+@dataclass(frozen=True)
+class FilterSettings:
+    """The filters/h1b/resume thresholds of one config, lowercased and
+    defaulted once. Hashable, so matchers built from it can be shared."""
+    excluded: Tuple[str, ...]
+    entry: Tuple[str, ...]
+    interest: Tuple[str, ...]
+    negative: Tuple[str, ...]
+    positive: Tuple[str, ...]
+    require_us_location: bool = True
+    min_match: float = 0.0
+
+    @classmethod
+    def from_config(cls, cfg: Dict) -> 'FilterSettings':
+        filters_cfg = cfg.get('filters', {}) or {}
+        h1b_cfg = cfg.get('h1b', {}) or {}
+        return cls(
+            excluded=_keywords(filters_cfg.get('excluded_seniority'), SENIOR_BLOCK),
+            entry=_keywords(filters_cfg.get('entry_level_keywords'), ENTRY_KEYWORDS_DEFAULT),
+            interest=_keywords(filters_cfg.get('titles_of_interest')),
+            negative=_keywords(h1b_cfg.get('negative_keywords'), NEGATIVE_SPONSOR_PHRASES),
+            positive=_keywords(h1b_cfg.get('positive_keywords'), POSITIVE_SPONSOR_PHRASES),
+            require_us_location=bool(filters_cfg.get('require_us_location', True)),
+            min_match=float((cfg.get('resume', {}) or {}).get('min_match_score', 0.0) or 0.0),
+        )
+
+    def categories(self) -> Dict[str, List[str]]:
+        return {'excluded': list(self.excluded), 'entry': list(self.entry), 'interest': list(self.interest),
+                'negative': list(self.negative), 'positive': list(self.positive)}
+
+
+def keyword_categories(cfg: Dict) -> Dict[str, List[str]]:
+    return FilterSettings.from_config(cfg).categories()
+
+
+def build_matcher(cfg: Dict, skills: Iterable[str] = (), settings: Optional[FilterSettings] = None) -> KeywordMatcher:
+    categories = (settings or FilterSettings.from_config(cfg)).categories()
+    categories['skill'] = list(skills)
+    return KeywordMatcher(categories)
+
+
+@lru_cache(maxsize=32)
+def _shared_matcher(settings: FilterSettings) -> KeywordMatcher:
+    return build_matcher({}, settings=settings)
+
+
+def entry_level_score(title_hits: Hits, description_hits: Hits) -> float:
+    if title_hits['excluded']:
         return 0.0
 
-    entry_terms = set([x.lower() for x in cfg.get('filters', {}).get('entry_level_keywords', [])] or ENTRY_KEYWORDS_DEFAULT)
     score = 0.0
-    if any(x in t for x in entry_terms):
+    if title_hits['entry']:
         score = max(score, 0.9)
-    if any(x in d for x in entry_terms):
+    if description_hits['entry']:
         score = max(score, 0.8)
-
-    interests = [x.lower() for x in cfg.get('filters', {}).get('titles_of_interest', [])]
-    if interests and any(x in t for x in interests):
+    if title_hits['interest']:
         score = max(score, 0.6)
 
-    if score == 0.0 and not any(x in d for x in excluded):
+    if score == 0.0 and not description_hits['excluded']:
         score = 0.4
 
     return min(score, 1.0)
 
 
+def compute_entry_level_score(title: str, description: str, cfg: Dict,
+                              matcher: Optional[KeywordMatcher] = None) -> float:
+    matcher = matcher or _shared_matcher(FilterSettings.from_config(cfg))
+    return entry_level_score(matcher.scan(title), matcher.scan(description))
+
+
 def clean_company_name(name: str) -> str:
     return (name or '').strip().lower()
 
 
-def compute_h1b_confidence(company: str, text: str, known_sponsors: set, cfg: Dict) -> float:
-    s = (text or '').lower()
-    comp = clean_company_name(company)
-
-    neg = [x.lower() for x in cfg.get('h1b', {}).get('negative_keywords', [])] or NEGATIVE_SPONSOR_PHRASES
-    if any(x in s for x in neg):
+def h1b_confidence(company: str, hits: Hits, known_sponsors: Container[str]) -> float:
+    if hits['negative']:
         return 0.0
 
-    pos = [x.lower() for x in cfg.get('h1b', {}).get('positive_keywords', [])] or POSITIVE_SPONSOR_PHRASES
+    comp = clean_company_name(company)
     confidence = 0.0
-    if any(x in s for x in pos):
+    if hits['positive']:
         confidence = max(confidence, 1.0)
 
     if comp in known_sponsors:
@@ -81,3 +123,9 @@ def compute_h1b_confidence(company: str, text: str, known_sponsors: set, cfg: Di
         confidence = 0.4 if comp in known_sponsors else 0.2
 
     return min(confidence, 1.0)
+
+
+def compute_h1b_confidence(company: str, text: str, known_sponsors: Container[str], cfg: Dict,
+                           matcher: Optional[KeywordMatcher] = None) -> float:
+    matcher = matcher or _shared_matcher(FilterSettings.from_config(cfg))
+    return h1b_confidence(company, matcher.scan(text), known_sponsors)
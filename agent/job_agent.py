@@ -1,131 +1,245 @@
 
 import argparse
 import hashlib
+import json
 import logging
 import os
-import smtplib
-import sqlite3
-import ssl
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from pathlib import Path
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
 
-import yaml
-
-from .sources.greenhouse import fetch_jobs as fetch_greenhouse_jobs
-from .sources.lever import fetch_jobs as fetch_lever_jobs
+from .sources import greenhouse, lever
+from .sources.cache import ResponseCache
+from .sources.http import RETRY_STATUSES, HttpTransport, parse_retry_after
 from . import filters as job_filters
 from . import resume_matching
-
-
-@dataclass
-class Job:
-    id: str
-    title: str
-    company: str
-    location: str
-    url: str
-    source: str
-    description: str
-    date_posted: Optional[str] = None
-    entry_level_score: float = 0.0
-    h1b_confidence: float = 0.0
-    resume_match: float = 0.0
-    final_score: float = 0.0
-
-
-def load_config(path: str) -> Dict:
-    if not os.path.isfile(path):
-        example_path = os.path.join(os.path.dirname(path), 'config.example.yaml')
-        if os.path.isfile(example_path):
-            with open(example_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
-        else:
-            raise FileNotFoundError(f"Config not found: {path}")
-    with open(path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+from .dedupe import NearDuplicateIndex
+from .matcher import MATCHER_VERSION, KeywordMatcher, merge_hits, tokenize
+from .metrics import RunMetrics
+from .relevance import BM25Relevance, CorpusStats
+from .report import ReportWriter, TopJobs, render_html_report
+from .scheduler import THROTTLE_STATUSES, CrawlScheduler
+from .settings import PROFILE_SECTIONS, load_config
+from .snapshot import SnapshotWriter, iter_snapshot
+from .sponsors import SponsorIndex
+from .models import Job
+from .storage import JobStore
+
+
+# Source name -> (display label, fetch function, API host). Boards are crawled
+# in this order, which keeps results deterministic in concurrent mode too.
+SOURCES = {
+    'greenhouse': ('Greenhouse', greenhouse.fetch_jobs, urlparse(greenhouse.API_URL).netloc),
+    'lever': ('Lever', lever.fetch_jobs, urlparse(lever.API_URL).netloc),
+}
 
 
 def ensure_db(db_path: str):
-    Path(os.path.dirname(db_path)).mkdir(parents=True, exist_ok=True)
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
-    cur.execute(
-        '''CREATE TABLE IF NOT EXISTS jobs (
-               job_id TEXT PRIMARY KEY,
-               title TEXT,
-               company TEXT,
-               location TEXT,
-               url TEXT,
-               source TEXT,
-               date_posted TEXT,
-               first_seen TEXT,
-               last_seen TEXT,
-               description TEXT
-           )'''
-    )
-    con.commit()
-    con.close()
+    JobStore(db_path).close()
 
 
 def job_hash(url: str) -> str:
-    import hashlib as _h
-    return _h.sha256(url.encode('utf-8')).hexdigest()
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
 
 
 def upsert_job(db_path: str, job: Job):
-    now = datetime.utcnow().isoformat()
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
-    cur.execute('SELECT job_id FROM jobs WHERE job_id = ?', (job.id,))
-    existing = cur.fetchone()
-    if existing:
-        cur.execute(
-            '''UPDATE jobs SET last_seen=?, title=?, company=?, location=?, url=?, source=?, date_posted=?, description=?
-               WHERE job_id=?''',
-            (now, job.title, job.company, job.location, job.url, job.source, job.date_posted, job.description, job.id)
-        )
-    else:
-        cur.execute(
-            '''INSERT INTO jobs (job_id, title, company, location, url, source, date_posted, first_seen, last_seen, description)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (job.id, job.title, job.company, job.location, job.url, job.source, job.date_posted, now, now, job.description)
-        )
-    con.commit()
-    con.close()
+    with JobStore(db_path) as store:
+        store.upsert_jobs([job])
+
+
+def content_hash(raw_job: Dict) -> str:
+    parts = [(raw_job.get(k) or '').strip() for k in ('title', 'location', 'description')]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def scoring_key(cfg: Dict, resume_profile: resume_matching.ResumeProfile,
+                relevance: Optional[BM25Relevance] = None, profile: str = '') -> str:
+    """Fingerprint of everything that affects a job's scores, so cached scores
+    are only reused while filters, H-1B settings and the resume are unchanged."""
+    sponsors_file = cfg.get('h1b', {}).get('known_sponsors_file')
+    sponsors_mtime = os.path.getmtime(sponsors_file) if sponsors_file and os.path.isfile(sponsors_file) else None
+    material = {
+        'filters': cfg.get('filters', {}),
+        'h1b': cfg.get('h1b', {}),
+        'sponsors_mtime': sponsors_mtime,
+        'min_match_score': cfg.get('resume', {}).get('min_match_score', 0.0),
+        'matcher_version': MATCHER_VERSION,
+        'skills': resume_profile.skills,
+        'titles_of_interest': sorted(resume_profile.titles_of_interest),
+    }
+    if relevance is not None:
+        material['relevance'] = relevance.key()
+    if profile:
+        material['profile'] = profile
+    return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def board_tasks(cfg: Dict) -> List[Tuple[str, str]]:
+    sources_cfg = cfg.get('sources', {}) or {}
+    tasks: List[Tuple[str, str]] = []
+    for name in SOURCES:
+        for slug in sources_cfg.get(name, []) or []:
+            tasks.append((name, slug))
+    return tasks
+
+
+def fetch_board(name: str, slug: str, transport: Optional[HttpTransport] = None,
+                cache: Optional[ResponseCache] = None, metrics: Optional[RunMetrics] = None,
+                scheduler: Optional[CrawlScheduler] = None) -> Optional[List[Dict]]:
+    """Fetch one board. With a scheduler, returns None when the board was
+    throttled and should be retried later in the run."""
+    label, fetch, host = SOURCES[name]
+    if transport is not None:
+        transport.reset_last_response()
+    started = time.perf_counter()
+    error = None
+    admitted = None
+    try:
+        if scheduler is not None:
+            with scheduler.slot(host) as admitted:
+                jobs = fetch(slug, transport=transport, cache=cache)
+        else:
+            jobs = fetch(slug, transport=transport, cache=cache)
+    except Exception as e:
+        jobs, error = [], e
+    status, nbytes, elapsed = transport.last_response() if transport is not None else (None, 0, 0.0)
+    if scheduler is not None:
+        response = getattr(error, 'response', None)
+        retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+        if scheduler.complete(host, (name, slug), status, elapsed, retry_after, admitted):
+            logging.info(f"{label} throttled {slug} (HTTP {status}); retrying later in this run")
+            return None
+    if error is not None:
+        logging.warning(f"{label} fetch failed for {slug}: {error}")
+    if metrics is not None:
+        metrics.record_fetch(name, slug, time.perf_counter() - started, status, nbytes, len(jobs),
+                             str(error) if error is not None else None)
+    return jobs
 
 
-def fetch_all_jobs(cfg: Dict) -> List[Dict]:
-    jobs: List[Dict] = []
-    gh_companies = cfg.get('sources', {}).get('greenhouse', []) or []
-    lever_companies = cfg.get('sources', {}).get('lever', []) or []
+def iter_all_jobs(cfg: Dict, metrics: Optional[RunMetrics] = None) -> Iterator[Dict]:
+    """Yield raw job dicts board by board, in config order.
+
+    In concurrent mode only a bounded window of boards is in flight (or
+    finished but not yet consumed) at any time, so memory stays flat no
+    matter how many boards are configured. Requests go through a per-host
+    CrawlScheduler; boards it defers after throttling are re-queued behind
+    the remaining boards (as soon as their host has cooled down), so only
+    they come out of order.
+    """
+    tasks = deque(board_tasks(cfg))
+    sources_cfg = cfg.get('sources', {}) or {}
+    max_workers = int(sources_cfg.get('max_workers', 1) or 1)
+    # Throttled responses come straight back so the board can be deferred
+    # instead of holding a worker while it backs off.
+    transport = HttpTransport.from_config(cfg, retry_statuses=RETRY_STATUSES - THROTTLE_STATUSES)
+    cache = ResponseCache.from_config(cfg)
+    scheduler = CrawlScheduler.from_config(cfg)
+    deferred: deque = deque()
+
+    def next_task() -> Optional[Tuple[str, str]]:
+        if deferred and (not tasks or scheduler.ready(SOURCES[deferred[0][0]][2])):
+            return deferred.popleft()
+        return tasks.popleft() if tasks else None
+
+    try:
+        if max_workers <= 1 or len(tasks) <= 1:
+            task = next_task()
+            while task is not None:
+                board_jobs = fetch_board(*task, transport, cache, metrics, scheduler)
+                if board_jobs is None:
+                    deferred.append(task)
+                else:
+                    yield from board_jobs
+                task = next_task()
+            return
+
+        # Results are consumed in submission order, so the output matches the serial crawl.
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending: deque = deque()
+
+            def submit():
+                task = next_task()
+                if task is not None:
+                    pending.append((task, pool.submit(fetch_board, *task, transport, cache, metrics, scheduler)))
+
+            for _ in range(max_workers * 2):
+                submit()
+            while pending:
+                task, future = pending.popleft()
+                board_jobs = future.result()
+                if board_jobs is None:
+                    deferred.append(task)
+                submit()
+                if board_jobs:
+                    yield from board_jobs
+    finally:
+        transport.close()
+        if cache:
+            cache.prune()
+        if metrics is not None:
+            metrics.record_hosts(scheduler.stats())
+        for host, st in scheduler.stats().items():
+            if st['throttled']:
+                logging.warning(f"{host}: throttled {st['throttled']}x, {st['recovered']} deferred board(s) "
+                                f"recovered, {st['dropped']} dropped")
+
+
+def fetch_all_jobs(cfg: Dict, metrics: Optional[RunMetrics] = None) -> List[Dict]:
+    return list(iter_all_jobs(cfg, metrics))
 
-    for slug in gh_companies:
-        try:
-            jobs.extend(fetch_greenhouse_jobs(slug))
-        except Exception as e:
-            logging.warning(f"Greenhouse fetch failed for {slug}: {e}")
 
-    for slug in lever_companies:
-        try:
-            jobs.extend(fetch_lever_jobs(slug))
-        except Exception as e:
-            logging.warning(f"Lever fetch failed for {slug}: {e}")
+@dataclass
+class ScoringContext:
+    """Everything score_and_filter_jobs needs, prepared once per run."""
+    resume_profile: resume_matching.ResumeProfile
+    matcher: KeywordMatcher
+    known_sponsors: SponsorIndex
+    require_us_location: bool
+    min_match: float
+    score_key: str
+    relevance: Optional[BM25Relevance] = None
+    profile: str = ''
+
+
+def prepare_scoring(cfg: Dict, resume_profile: resume_matching.ResumeProfile,
+                    corpus: Optional[CorpusStats] = None, profile: str = '') -> ScoringContext:
+    relevance = BM25Relevance.from_config(cfg, resume_profile.skills, corpus)
+    settings = job_filters.FilterSettings.from_config(cfg)
+    return ScoringContext(
+        resume_profile=resume_profile,
+        matcher=job_filters.build_matcher(cfg, resume_profile.skills, settings),
+        known_sponsors=SponsorIndex.from_config(cfg),
+        require_us_location=settings.require_us_location,
+        min_match=settings.min_match,
+        score_key=scoring_key(cfg, resume_profile, relevance, profile),
+        relevance=relevance,
+        profile=profile,
+    )
 
-    return jobs
 
+def _reject(reason: str, url: str, rejections: Counter, reasons: Optional[Dict[str, str]]):
+    rejections[reason] += 1
+    if reasons is not None:
+        reasons[job_hash(url)] = reason
 
-def score_and_filter_jobs(raw_jobs: List[Dict], cfg: Dict, resume_profile: resume_matching.ResumeProfile) -> List[Job]:
-    known_sponsors_file = cfg.get('h1b', {}).get('known_sponsors_file')
-    known_set = set()
-    if known_sponsors_file and os.path.isfile(known_sponsors_file):
-        with open(known_sponsors_file, 'r', encoding='utf-8') as f:
-            known_set = {line.strip().lower() for line in f if line.strip()}
 
-    out: List[Job] = []
+def iter_scored_jobs(raw_jobs: Iterable[Dict], ctx: ScoringContext,
+                     rejections: Optional[Counter] = None,
+                     reasons: Optional[Dict[str, str]] = None) -> Iterator[Job]:
+    """Yield accepted jobs in input order (unsorted), counting each rejected
+    posting under its filter reason in `rejections` when given, and recording
+    the reason by job id in `reasons`."""
+    if rejections is None:
+        rejections = Counter()
+    matcher = ctx.matcher
     for rj in raw_jobs:
         title = (rj.get('title') or '').strip()
         company = (rj.get('company') or '').strip()
@@ -135,27 +249,36 @@ def score_and_filter_jobs(raw_jobs: List[Dict], cfg: Dict, resume_profile: resum
         description = (rj.get('description') or '').strip()
         date_posted = rj.get('date_posted')
 
-        if cfg.get('filters', {}).get('require_us_location', True):
+        if ctx.require_us_location:
             if not job_filters.is_us_location(location):
+                _reject('non_us_location', url, rejections, reasons)
                 continue
 
-        entry_score = job_filters.compute_entry_level_score(title, description, cfg)
+        title_tokens = tokenize(title)
+        description_tokens = tokenize(description)
+        title_hits = matcher.scan_tokens(title_tokens)
+        description_hits = matcher.scan_tokens(description_tokens)
+        entry_score = job_filters.entry_level_score(title_hits, description_hits)
         if entry_score <= 0.0:
+            _reject('seniority', url, rejections, reasons)
             continue
 
-        h1b_conf = job_filters.compute_h1b_confidence(company, f"{title}"
-"{description}", known_set, cfg)
-        resume_match = resume_matching.compute_match_score(f"{title}"
-"{description}", resume_profile)
+        hits = merge_hits(title_hits, description_hits)
+        h1b_conf = job_filters.h1b_confidence(company, hits, ctx.known_sponsors)
+        if ctx.relevance is not None:
+            resume_match = ctx.relevance.score_hits(hits['skill'], title_tokens, description_tokens,
+                                                    len(title) + len(description))
+        else:
+            resume_match = resume_matching.match_score(hits, ctx.resume_profile)
 
-        min_match = float(cfg.get('resume', {}).get('min_match_score', 0.0))
-        if resume_match < min_match:
+        if resume_match < ctx.min_match:
+            _reject('low_resume_match', url, rejections, reasons)
             continue
 
         final_score = 0.5 * resume_match + 0.3 * h1b_conf + 0.2 * entry_score
 
         jid = job_hash(url)
-        job = Job(
+        yield Job(
             id=jid,
             title=title,
             company=company,
@@ -169,68 +292,375 @@ def score_and_filter_jobs(raw_jobs: List[Dict], cfg: Dict, resume_profile: resum
             resume_match=resume_match,
             final_score=final_score,
         )
-        out.append(job)
 
-    out.sort(key=lambda j: j.final_score, reverse=True)
+
+_worker_ctxs: Dict[str, ScoringContext] = {}
+
+
+def _init_scoring_worker(contexts: List[ScoringContext]):
+    global _worker_ctxs
+    _worker_ctxs = {ctx.score_key: ctx for ctx in contexts}
+
+
+def _score_chunk(task: Tuple[str, List[Dict]]) -> Tuple[List[Job], Counter, Dict[str, str]]:
+    score_key, chunk = task
+    rejections: Counter = Counter()
+    reasons: Dict[str, str] = {}
+    return list(iter_scored_jobs(chunk, _worker_ctxs[score_key], rejections, reasons)), rejections, reasons
+
+
+class ScoringPool:
+    """Process pool that scores raw jobs in chunks.
+
+    The ScoringContexts (compiled matcher, known sponsors, resume profile) of
+    every profile in the run are shipped to each worker once at startup; only
+    raw job chunks and scored jobs cross process boundaries afterwards.
+    Chunks are reassembled in input order, so results are identical to
+    iter_scored_jobs.
+    """
+
+    def __init__(self, contexts: List[ScoringContext], workers: int, chunk_size: int = 250):
+        self.contexts = contexts
+        self.chunk_size = max(1, chunk_size)
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_scoring_worker,
+                                         initargs=(contexts,))
+
+    @classmethod
+    def from_config(cls, cfg: Dict, contexts: List[ScoringContext]) -> Optional['ScoringPool']:
+        scoring_cfg = cfg.get('scoring', {}) or {}
+        workers = int(scoring_cfg.get('workers', 0) or 0)
+        if workers < 0:
+            workers = os.cpu_count() or 1
+        if workers <= 1:
+            return None
+        return cls(contexts, workers, int(scoring_cfg.get('chunk_size', 250) or 250))
+
+    def score(self, raw_jobs: List[Dict], rejections: Optional[Counter] = None,
+              ctx: Optional[ScoringContext] = None, reasons: Optional[Dict[str, str]] = None) -> List[Job]:
+        ctx = ctx or self.contexts[0]
+        if len(raw_jobs) <= self.chunk_size:
+            return list(iter_scored_jobs(raw_jobs, ctx, rejections, reasons))
+        chunks = [(ctx.score_key, raw_jobs[i:i + self.chunk_size])
+                  for i in range(0, len(raw_jobs), self.chunk_size)]
+        out: List[Job] = []
+        for part, part_rejections, part_reasons in self._pool.map(_score_chunk, chunks):
+            out.extend(part)
+            if rejections is not None:
+                rejections.update(part_rejections)
+            if reasons is not None:
+                reasons.update(part_reasons)
+        return out
+
+    def close(self):
+        self._pool.shutdown()
+
+
+def score_and_filter_jobs(raw_jobs: List[Dict], cfg: Dict, resume_profile: resume_matching.ResumeProfile,
+                          ctx: Optional[ScoringContext] = None, pool: Optional[ScoringPool] = None,
+                          rejections: Optional[Counter] = None, sort: bool = True,
+                          reasons: Optional[Dict[str, str]] = None) -> List[Job]:
+    """Accepted jobs, best first; with sort=False in crawl order, for callers
+    that select the top-N themselves."""
+    if pool is not None:
+        out = pool.score(raw_jobs, rejections, ctx, reasons)
+    else:
+        ctx = ctx or prepare_scoring(cfg, resume_profile)
+        out = list(iter_scored_jobs(raw_jobs, ctx, rejections, reasons))
+    if sort:
+        out.sort(key=lambda j: j.final_score, reverse=True)
     return out
 
 
-def render_html_report(jobs: list, limit: int = 50) -> str:
+def score_incrementally(raw_jobs: List[Dict], cfg: Dict, resume_profile: resume_matching.ResumeProfile,
+                        store: JobStore, ctx: Optional[ScoringContext] = None,
+                        cached: Optional[Dict[str, tuple]] = None,
+                        pool: Optional[ScoringPool] = None,
+                        metrics: Optional[RunMetrics] = None, sort: bool = True) -> Tuple[List[Job], List[Job]]:
+    """Score only postings that are new or changed since they were last scored.
+
+    Returns all accepted jobs (ordered exactly like score_and_filter_jobs) and
+    the subset that was freshly scored and therefore needs to be persisted.
+    Callers scoring in batches pass the ctx and the store.load_scores() map
+    once instead of reloading them per batch; fresh scores are added to it.
+    """
+    ctx = ctx or prepare_scoring(cfg, resume_profile)
+    key = ctx.score_key
+    if cached is None:
+        cached = store.load_scores(key, ctx.profile)
+
+    reused: Dict[str, Job] = {}
+    seen_ids: List[str] = []
+    pending: List[Dict] = []
+    hashes: Dict[str, str] = {}
+    rejections: Counter = Counter()
+    for rj in raw_jobs:
+        url = (rj.get('url') or '').strip()
+        jid = job_hash(url)
+        chash = content_hash(rj)
+        hit = cached.get(jid)
+        # Rejections stored before reasons were recorded are scored once more.
+        if hit is None or hit[0] != chash or (not hit[1] and hit[6] is None):
+            pending.append(rj)
+            hashes[jid] = chash
+            continue
+        seen_ids.append(jid)
+        if not hit[1]:
+            rejections[hit[6]] += 1
+        else:
+            reused[jid] = Job(
+                id=jid,
+                title=(rj.get('title') or '').strip(),
+                company=(rj.get('company') or '').strip(),
+                location=(rj.get('location') or '').strip(),
+                url=url,
+                source=(rj.get('source') or '').strip(),
+                description=(rj.get('description') or '').strip(),
+                date_posted=rj.get('date_posted'),
+                entry_level_score=hit[2],
+                h1b_confidence=hit[3],
+                resume_match=hit[4],
+                final_score=hit[5],
+            )
+
+    reasons: Dict[str, str] = {}
+    fresh = score_and_filter_jobs(pending, cfg, resume_profile, ctx, pool, rejections, sort=False, reasons=reasons)
+    accepted = {j.id: j for j in fresh}
     rows = []
-    for j in jobs[:limit]:
-        rows.append(
-            f"""<tr>
-                <td><a href='{j.url}' target='_blank' rel='noopener'>{j.title}</a></td>
-                <td>{j.company}</td>
-                <td>{j.location}</td>
-                <td>{j.source}</td>
-                <td>{j.date_posted or ''}</td>
-                <td>{j.resume_match:.2f}</td>
-                <td>{j.h1b_confidence:.2f}</td>
-                <td>{j.entry_level_score:.2f}</td>
-                <td><b>{j.final_score:.2f}</b></td>
-            </tr>"""
-        )
-    table_rows = "".join(rows)
-    generated = datetime.utcnow().isoformat() + 'Z'
-    html = (
-        "<html>"
-        "  <head>"
-        "    <meta charset='utf-8'>"
-        "    <title>Job AI Agent Report</title>"
-        "    <style>"
-        "      body { font-family: Arial, sans-serif; padding: 20px; }"
-        "      table { border-collapse: collapse; width: 100%; }"
-        "      th, td { border: 1px solid #ddd; padding: 8px; }"
-        "      th { background-color: #f4f4f4; }"
-        "      tr:hover { background: #fafafa; }"
-        "    </style>"
-        "  </head>"
-        "  <body>"
-        f"    <h2>Job AI Agent Report</h2>"
-        f"    <p>Generated at: {generated}</p>"
-        "    <table>"
-        "      <thead>"
-        "        <tr>"
-        "          <th>Title</th>"
-        "          <th>Company</th>"
-        "          <th>Location</th>"
-        "          <th>Source</th>"
-        "          <th>Date</th>"
-        "          <th>Resume</th>"
-        "          <th>H-1B</th>"
-        "          <th>Entry</th>"
-        "          <th>Score</th>"
-        "        </tr>"
-        "      </thead>"
-        "      <tbody>"
-        f"        {table_rows}"
-        "      </tbody>"
-        "    </table>"
-        "  </body>"
-        "</html>"
-    )
-    return html
+    for jid, chash in hashes.items():
+        j = accepted.get(jid)
+        if j is not None:
+            rows.append((jid, chash, 1, j.entry_level_score, j.h1b_confidence, j.resume_match, j.final_score, None))
+        else:
+            rows.append((jid, chash, 0, None, None, None, None, reasons.get(jid)))
+    store.save_scores(key, rows, seen_ids, ctx.profile)
+    for row in rows:
+        cached[row[0]] = row[1:]
+    logging.info(f"Incremental: {len(hashes)} new/changed, {len(seen_ids)} unchanged ({len(reused)} reused)")
+    if metrics is not None:
+        metrics.add_rejections(rejections, ctx.profile)
+        metrics.counts['scored_fresh'] += len(hashes)
+        metrics.counts['unchanged'] += len(seen_ids)
+        metrics.counts['cached_scores_reused'] += len(reused)
+
+    # Rebuild the result in crawl order before the stable sort so ties rank
+    # exactly as they would in a full rescore.
+    out: List[Job] = []
+    for rj in raw_jobs:
+        jid = job_hash((rj.get('url') or '').strip())
+        j = reused.get(jid) or accepted.get(jid)
+        if j is not None:
+            out.append(j)
+    if sort:
+        out.sort(key=lambda j: j.final_score, reverse=True)
+    return out, fresh
+
+
+def collapse_duplicates(raw_jobs: List[Dict], index: Optional[NearDuplicateIndex],
+                        metrics: Optional[RunMetrics] = None) -> List[Dict]:
+    """Keep only the first posting of each near-duplicate cluster seen this run.
+
+    Only US postings are clustered: the rest are rejected by scoring anyway
+    and must not become the representative of a US role's cluster.
+    """
+    if index is None:
+        return raw_jobs
+    kept: List[Dict] = []
+    for rj in raw_jobs:
+        if job_filters.is_us_location(rj.get('location') or ''):
+            _, duplicate = index.assign(job_hash((rj.get('url') or '').strip()), rj)
+            if duplicate:
+                continue
+        kept.append(rj)
+    if metrics is not None:
+        metrics.counts['duplicates_collapsed'] += len(raw_jobs) - len(kept)
+    return kept
+
+
+def profile_configs(cfg: Dict) -> List[Tuple[str, Dict]]:
+    """(name, effective config) for every candidate profile in the config.
+
+    Each entry of `profiles` overrides the top-level resume/filters/h1b/report/
+    email sections key by key. Without `profiles` the run has a single
+    unnamed profile that uses the config as-is.
+    """
+    entries = cfg.get('profiles') or []
+    if not entries:
+        return [('', cfg)]
+    out: List[Tuple[str, Dict]] = []
+    for i, entry in enumerate(entries):
+        name = re.sub(r'[^\w.-]+', '_', str(entry.get('name') or f'profile{i + 1}'))
+        if any(name == other for other, _ in out):
+            raise ValueError(f"Duplicate profile name in config: {name}")
+        merged = {k: v for k, v in cfg.items() if k != 'profiles'}
+        for section in PROFILE_SECTIONS:
+            if section in entry:
+                merged[section] = {**(cfg.get(section) or {}), **(entry.get(section) or {})}
+        out.append((name, merged))
+    return out
+
+
+@dataclass
+class ProfileRun:
+    """One candidate's scoring setup and results within a run."""
+    name: str
+    cfg: Dict
+    resume_profile: resume_matching.ResumeProfile
+    ctx: ScoringContext
+    top_n: int
+    cached: Optional[Dict[str, tuple]] = None
+
+
+def prepare_profiles(cfg: Dict, store: Optional[JobStore] = None, load_cached: bool = True,
+                     corpus: Optional[CorpusStats] = None) -> List[ProfileRun]:
+    """Build every profile's resume and scoring context, and load its cached
+    scores when they will be needed.
+
+    With several profiles every score is recorded in job_scores under its
+    profile, even without incremental mode, so persisted rows can be told
+    apart per candidate. With load_cached=False stored scores are left
+    alone. BM25 profiles are scored against `corpus` (see prepare_corpus).
+    """
+    entries = profile_configs(cfg)
+    incremental = cfg.get('persistence', {}).get('incremental', False)
+    tagged = load_cached and (incremental or len(entries) > 1)
+    runs: List[ProfileRun] = []
+    for name, profile_cfg in entries:
+        resume_profile = resume_matching.build_resume_profile(profile_cfg)
+        ctx = prepare_scoring(profile_cfg, resume_profile, corpus, name)
+        cached = None
+        if tagged and store is not None:
+            cached = store.load_scores(ctx.score_key, name)
+            if not incremental:
+                cached = {}
+        runs.append(ProfileRun(name, profile_cfg, resume_profile, ctx,
+                               int(profile_cfg.get('report', {}).get('top_n', 50)), cached))
+    return runs
+
+
+def prepare_corpus(cfg: Dict) -> Optional[CorpusStats]:
+    """Empty corpus statistics for the skills of every profile ranked by BM25,
+    or None when no profile is. Callers add the whole crawl to them before
+    preparing the profiles."""
+    terms: List[str] = []
+    for _, profile_cfg in profile_configs(cfg):
+        if (profile_cfg.get('resume', {}) or {}).get('relevance', 'keywords') == 'bm25':
+            terms.extend(resume_matching.build_resume_profile(profile_cfg).skills)
+    return CorpusStats(terms) if terms else None
+
+
+def spool_crawl(cfg: Dict, corpus: CorpusStats, spool: SnapshotWriter, metrics: RunMetrics) -> int:
+    """Crawl every board into `spool`, adding each batch to `corpus`, so a
+    streaming run can score from complete corpus statistics."""
+    batch_size = int(cfg.get('pipeline', {}).get('batch_size', 500) or 500)
+    postings = metrics.timed_iter('fetch', iter_all_jobs(cfg, metrics))
+    for batch in iter_batches(postings, batch_size):
+        with metrics.stage('spool', items=len(batch)):
+            spool.write(batch)
+        with metrics.stage('corpus', items=len(batch)):
+            corpus.add(batch)
+    return spool.count
+
+
+def score_batch(raw_jobs: List[Dict], profiles: List[ProfileRun], store: JobStore,
+                pool: Optional[ScoringPool] = None,
+                metrics: Optional[RunMetrics] = None) -> Tuple[Dict[str, List[Job]], List[Job]]:
+    """Score one batch of postings for every profile.
+
+    Returns each profile's accepted jobs in crawl order (for TopJobs) and the
+    jobs to persist: every posting freshly scored for some profile, carrying
+    its best score across profiles.
+    """
+    accepted_by: Dict[str, List[Job]] = {}
+    changed: List[Job] = []
+    for p in profiles:
+        if p.cached is not None:
+            accepted, fresh = score_incrementally(raw_jobs, p.cfg, p.resume_profile, store, p.ctx, p.cached, pool,
+                                                  metrics, sort=False)
+        else:
+            rejections: Counter = Counter()
+            accepted = fresh = score_and_filter_jobs(raw_jobs, p.cfg, p.resume_profile, p.ctx, pool, rejections,
+                                                     sort=False)
+            if metrics is not None:
+                metrics.add_rejections(rejections, p.name)
+        accepted_by[p.name] = accepted
+        changed.extend(fresh)
+    if len(profiles) == 1:
+        return accepted_by, changed
+
+    changed_ids = {j.id for j in changed}
+    best: Dict[str, Job] = {}
+    for accepted in accepted_by.values():
+        for j in accepted:
+            if j.id in changed_ids and (j.id not in best or j.final_score > best[j.id].final_score):
+                best[j.id] = j
+    return accepted_by, list(best.values())
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_pipeline(cfg: Dict, profiles: List[ProfileRun], store: JobStore,
+                 pool: Optional[ScoringPool] = None, metrics: Optional[RunMetrics] = None,
+                 dedupe: Optional[NearDuplicateIndex] = None,
+                 snapshot: Optional[SnapshotWriter] = None,
+                 postings: Optional[Iterable[Dict]] = None) -> Dict[str, List[Job]]:
+    """Streaming fetch -> score -> persist; only each profile's report top-N is retained.
+    Raw postings are also appended to `snapshot` as they arrive. `postings`
+    (a spooled crawl) replaces fetching."""
+    metrics = metrics or RunMetrics()
+    batch_size = int(cfg.get('pipeline', {}).get('batch_size', 500) or 500)
+
+    tops = {p.name: TopJobs(p.top_n) for p in profiles}
+    kept = Counter()
+    raw_count = 0
+    if postings is None:
+        postings = metrics.timed_iter('fetch', iter_all_jobs(cfg, metrics))
+    else:
+        postings = metrics.timed_iter('spool_read', postings)
+    for batch in iter_batches(postings, batch_size):
+        raw_count += len(batch)
+        if snapshot is not None:
+            with metrics.stage('snapshot', items=len(batch)):
+                snapshot.write(batch)
+        with metrics.stage('dedupe', items=len(batch)):
+            batch = collapse_duplicates(batch, dedupe, metrics)
+        with metrics.stage('score', items=len(batch) * len(profiles)):
+            accepted_by, changed = score_batch(batch, profiles, store, pool, metrics)
+        with metrics.stage('persist', items=len(changed)):
+            store.upsert_jobs(changed)
+            if dedupe is not None:
+                dedupe.flush(store)
+        for name, accepted in accepted_by.items():
+            tops[name].extend(accepted)
+            kept[name] += len(accepted)
+
+    metrics.counts['raw_jobs'] += raw_count
+    logging.info(f"Fetched {raw_count} raw jobs")
+    for p in profiles:
+        log_accepted(p.name, kept[p.name], metrics)
+    return {name: top.sorted() for name, top in tops.items()}
+
+
+def log_accepted(profile: str, count: int, metrics: RunMetrics):
+    if profile:
+        metrics.counts[f'accepted:{profile}'] += count
+        logging.info(f"Scored/filtered down to {count} jobs for profile {profile}")
+    else:
+        metrics.counts['accepted'] += count
+        logging.info(f"Scored/filtered down to {count} jobs")
+
+
+def report_path_for(profile: str, root: str = 'reports') -> str:
+    if profile:
+        return os.path.join(root, profile, 'latest_report.html')
+    return os.path.join(root, 'latest_report.html')
+
 
 def send_email(cfg: Dict, subject: str, html_body: str):
     email_cfg = cfg.get('email', {})
@@ -248,6 +678,11 @@ def send_email(cfg: Dict, subject: str, html_body: str):
         logging.warning('Email not fully configured; skipping send.')
         return False
 
+    import smtplib
+    import ssl
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     msg = MIMEMultipart('alternative')
     msg['Subject'] = subject
     msg['From'] = from_email
@@ -256,8 +691,7 @@ def send_email(cfg: Dict, subject: str, html_body: str):
     msg.attach(part)
 
     context = ssl.create_default_context()
-    import smtplib as _smtp
-    with _smtp.SMTP(host, port) as server:
+    with smtplib.SMTP(host, port) as server:
         try:
             server.starttls(context=context)
         except Exception:
@@ -270,37 +704,116 @@ def send_email(cfg: Dict, subject: str, html_body: str):
 
 def run(config_path: str) -> str:
     logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
-    cfg = load_config(config_path)
-
-    db_path = cfg.get('persistence', {}).get('database_path', 'data/jobs.db')
-    ensure_db(db_path)
-
-    profile = resume_matching.build_resume_profile(cfg)
-
-    raw = fetch_all_jobs(cfg)
-    logging.info(f"Fetched {len(raw)} raw jobs")
-
-    scored = score_and_filter_jobs(raw, cfg, profile)
-    logging.info(f"Scored/filtered down to {len(scored)} jobs")
-
-    for j in scored:
-        upsert_job(db_path, j)
-
-    top_n = int(cfg.get('report', {}).get('top_n', 50))
-    html = render_html_report(scored, limit=top_n)
-
-    Path('reports').mkdir(exist_ok=True)
-    report_path = os.path.join('reports', 'latest_report.html')
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(html)
+    metrics = RunMetrics()
+    with metrics.stage('setup'):
+        cfg = load_config(config_path)
+
+        store = JobStore.from_config(cfg)
+
+        # BM25 profiles need statistics over the whole crawl before the first
+        # posting is scored, so their contexts are prepared after the crawl.
+        corpus = prepare_corpus(cfg)
+        profiles: List[ProfileRun] = []
+        pool = None
+        if corpus is None:
+            profiles = prepare_profiles(cfg, store)
+            pool = ScoringPool.from_config(cfg, [p.ctx for p in profiles])
+        dedupe = NearDuplicateIndex.from_config(cfg, store)
+        snapshot = SnapshotWriter.from_config(cfg)
+
+    spool_dir = None
+    try:
+        if cfg.get('pipeline', {}).get('streaming', False):
+            postings = None
+            if corpus is not None:
+                # Spool the crawl to disk (into the snapshot when there is
+                # one), then stream it from there through scoring.
+                spool = snapshot
+                if spool is None:
+                    spool_dir = tempfile.mkdtemp(prefix='job-agent-crawl-')
+                    spool = SnapshotWriter(spool_dir, compresslevel=1)
+                spool_crawl(cfg, corpus, spool, metrics)
+                with metrics.stage('spool'):
+                    postings = iter_snapshot(spool.close())
+                snapshot = None
+                with metrics.stage('setup'):
+                    profiles = prepare_profiles(cfg, store, corpus=corpus)
+                    pool = ScoringPool.from_config(cfg, [p.ctx for p in profiles])
+            results = run_pipeline(cfg, profiles, store, pool, metrics, dedupe, snapshot, postings)
+            if snapshot is not None:
+                with metrics.stage('snapshot'):
+                    snapshot.close()
+                snapshot = None
+        else:
+            with metrics.stage('fetch') as st:
+                raw = fetch_all_jobs(cfg, metrics)
+                st['items'] = len(raw)
+            metrics.counts['raw_jobs'] = len(raw)
+            logging.info(f"Fetched {len(raw)} raw jobs")
+
+            if snapshot is not None:
+                with metrics.stage('snapshot', items=len(raw)):
+                    snapshot.write(raw)
+                    snapshot.close()
+                snapshot = None
+
+            if corpus is not None:
+                with metrics.stage('corpus', items=len(raw)):
+                    corpus.add(raw)
+                with metrics.stage('setup'):
+                    profiles = prepare_profiles(cfg, store, corpus=corpus)
+                    pool = ScoringPool.from_config(cfg, [p.ctx for p in profiles])
+
+            with metrics.stage('dedupe', items=len(raw)):
+                raw = collapse_duplicates(raw, dedupe, metrics)
+
+            with metrics.stage('score', items=len(raw) * len(profiles)):
+                accepted_by, changed = score_batch(raw, profiles, store, pool, metrics)
+            results = {}
+            for p in profiles:
+                log_accepted(p.name, len(accepted_by[p.name]), metrics)
+                top = TopJobs(p.top_n)
+                top.extend(accepted_by[p.name])
+                results[p.name] = top.sorted()
+            del accepted_by
+
+            with metrics.stage('persist', items=len(changed)):
+                store.upsert_jobs(changed)
+                if dedupe is not None:
+                    dedupe.flush(store)
+    finally:
+        # A crawl that did not finish leaves no snapshot behind.
+        if snapshot is not None:
+            snapshot.close(complete=False)
+        if pool:
+            pool.close()
+        store.close()
+        if spool_dir is not None:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+    report_paths = []
+    for p in profiles:
+        top = results[p.name]
+        report_path = report_path_for(p.name)
+        with metrics.stage('render', items=len(top)):
+            ReportWriter.from_config(p.cfg).write(report_path, top)
+        report_paths.append(report_path)
+
+        subject = 'Job AI Agent Daily Report' + (f' ({p.name})' if p.name else '')
+        with metrics.stage('email'):
+            sent = False
+            if (p.cfg.get('email', {}) or {}).get('enabled', False):
+                sent = send_email(p.cfg, subject=subject, html_body=render_html_report(top, limit=p.top_n))
+        if sent:
+            logging.info('Email sent successfully.')
+        else:
+            logging.info(f'Report written to {report_path}')
 
-    sent = send_email(cfg, subject='Job AI Agent Daily Report', html_body=html)
-    if sent:
-        logging.info('Email sent successfully.')
-    else:
-        logging.info(f'Report written to {report_path}')
+    summary_path = os.path.join('reports', 'run_summary.json')
+    metrics.write(summary_path)
+    logging.info(f'Run summary written to {summary_path}')
 
-    return report_path
+    return '\n'.join(report_paths)
 
 
 if __name__ == '__main__':
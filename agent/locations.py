@@ -0,0 +1,285 @@
+import re
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+US_STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California', 'CO': 'Colorado',
+    'CT': 'Connecticut', 'DE': 'Delaware', 'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho',
+    'IL': 'Illinois', 'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana',
+    'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota',
+    'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York', 'NC': 'North Carolina',
+    'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma', 'OR': 'Oregon', 'PA': 'Pennsylvania',
+    'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota', 'TN': 'Tennessee', 'TX': 'Texas',
+    'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia', 'WA': 'Washington', 'WV': 'West Virginia',
+    'WI': 'Wisconsin', 'WY': 'Wyoming', 'DC': 'District of Columbia', 'PR': 'Puerto Rico',
+}
+
+# Major US cities and tech hubs. Names shared with a well-known place abroad
+# (Cambridge, Dublin, Vancouver, Burlington, Waterloo, ...) are left out: they
+# only resolve together with a state.
+US_CITIES = {
+    'CA': ['san francisco', 'sf', 'bay area', 'sf bay area', 'san francisco bay area', 'silicon valley',
+           'palo alto', 'mountain view', 'menlo park', 'sunnyvale', 'santa clara', 'san jose', 'cupertino',
+           'redwood city', 'san mateo', 'south san francisco', 'oakland', 'berkeley', 'emeryville', 'fremont',
+           'los angeles', 'santa monica', 'culver city', 'irvine', 'pasadena', 'san diego', 'sacramento'],
+    'WA': ['seattle', 'bellevue', 'redmond', 'kirkland', 'tacoma', 'spokane'],
+    'OR': ['portland', 'beaverton', 'eugene'],
+    'NY': ['new york city', 'nyc', 'manhattan', 'brooklyn', 'queens', 'buffalo', 'rochester'],
+    'NJ': ['jersey city', 'hoboken', 'newark', 'princeton'],
+    'MA': ['boston', 'somerville', 'waltham'],
+    'TX': ['austin', 'dallas', 'houston', 'san antonio', 'fort worth', 'plano', 'irving', 'frisco'],
+    'IL': ['chicago', 'evanston'],
+    'CO': ['denver', 'boulder', 'colorado springs'],
+    'GA': ['atlanta', 'alpharetta'],
+    'FL': ['miami', 'tampa', 'orlando', 'jacksonville', 'fort lauderdale', 'boca raton'],
+    'NC': ['raleigh', 'durham', 'charlotte', 'research triangle', 'chapel hill'],
+    'TN': ['nashville', 'memphis', 'knoxville'],
+    'PA': ['pittsburgh', 'philadelphia'],
+    'MD': ['baltimore', 'bethesda', 'rockville'],
+    'DC': ['washington dc', 'washington d c', 'dc'],
+    'VA': ['reston', 'mclean', 'herndon', 'tysons'],
+    'MI': ['detroit', 'ann arbor', 'grand rapids'],
+    'MN': ['minneapolis', 'saint paul', 'st paul'],
+    'MO': ['st louis', 'saint louis', 'kansas city'],
+    'UT': ['salt lake city', 'lehi', 'provo'],
+    'AZ': ['phoenix', 'scottsdale', 'tempe', 'chandler'],
+    'NV': ['las vegas', 'reno'],
+    'OH': ['columbus', 'cleveland', 'cincinnati'],
+    'IN': ['indianapolis'],
+    'WI': ['milwaukee'],
+    'NE': ['omaha'],
+    'LA': ['new orleans'],
+    'HI': ['honolulu'],
+    'AK': ['anchorage'],
+    'ID': ['boise'],
+    'NM': ['albuquerque'],
+    'KY': ['louisville'],
+    'OK': ['oklahoma city', 'tulsa'],
+}
+
+US_NAMES = ['united states', 'united states of america', 'usa', 'us', 'u s', 'u s a', 'us only',
+            'continental us', 'contiguous us']
+
+# Countries, regions, provinces and cities that put a posting outside the US.
+FOREIGN = {
+    'CA': ['canada', 'ontario', 'quebec', 'british columbia', 'alberta', 'toronto', 'montreal', 'ottawa',
+           'calgary', 'edmonton', 'kitchener'],
+    'GB': ['united kingdom', 'uk', 'england', 'scotland', 'wales', 'london', 'manchester', 'edinburgh'],
+    'IE': ['ireland'],
+    'IN': ['india', 'bangalore', 'bengaluru', 'hyderabad', 'pune', 'chennai', 'mumbai', 'delhi', 'new delhi',
+           'gurgaon', 'gurugram', 'noida'],
+    'DE': ['germany', 'berlin', 'munich', 'hamburg'],
+    'FR': ['france'],
+    'NL': ['netherlands', 'amsterdam'],
+    'ES': ['spain', 'madrid', 'barcelona'],
+    'PT': ['portugal', 'lisbon'],
+    'PL': ['poland', 'warsaw', 'krakow'],
+    'RO': ['romania', 'bucharest'],
+    'SE': ['sweden', 'stockholm'],
+    'DK': ['denmark', 'copenhagen'],
+    'NO': ['norway', 'oslo'],
+    'FI': ['finland', 'helsinki'],
+    'CH': ['switzerland', 'zurich', 'geneva'],
+    'IL': ['israel', 'tel aviv'],
+    'MX': ['mexico', 'mexico city', 'guadalajara'],
+    'BR': ['brazil', 'sao paulo'],
+    'AR': ['argentina', 'buenos aires'],
+    'CR': ['costa rica'],
+    'CO': ['colombia', 'bogota'],
+    'SG': ['singapore'],
+    'JP': ['japan', 'tokyo'],
+    'KR': ['korea', 'south korea', 'seoul'],
+    'CN': ['china', 'beijing', 'shanghai', 'shenzhen'],
+    'HK': ['hong kong'],
+    'AU': ['australia', 'sydney'],
+    'NZ': ['new zealand', 'auckland'],
+    'PH': ['philippines', 'manila'],
+    'AE': ['united arab emirates', 'uae', 'dubai'],
+    'ZA': ['south africa', 'cape town'],
+    'NG': ['nigeria', 'lagos'],
+    'KE': ['kenya', 'nairobi'],
+    'GE': ['tbilisi'],
+    # Regions; no single country.
+    '': ['europe', 'emea', 'apac', 'latam', 'asia', 'africa', 'eu', 'latin america', 'south america',
+         'central america', 'americas'],
+}
+
+# Upper-case codes for places abroad ("Toronto, ON", "Paris, FR"); codes that
+# are also US state codes are never read as foreign.
+FOREIGN_CODES = {
+    'ON': 'CA', 'BC': 'CA', 'QC': 'CA', 'AB': 'CA', 'UK': 'GB', 'GB': 'GB', 'FR': 'FR', 'NL': 'NL',
+    'ES': 'ES', 'SE': 'SE', 'CH': 'CH', 'SG': 'SG', 'JP': 'JP', 'AU': 'AU', 'NZ': 'NZ', 'IE': 'IE',
+    'BR': 'BR', 'MX': 'MX', 'PL': 'PL', 'PT': 'PT', 'CN': 'CN', 'HK': 'HK', 'KR': 'KR', 'EU': '',
+}
+
+# State codes that are also ISO country codes; next to a place abroad they
+# are read as the country ("Bangalore, IN", "Toronto, ON, CA").
+COUNTRY_LIKE_CODES = {'AL', 'AR', 'AZ', 'CA', 'CO', 'DE', 'GA', 'ID', 'IL', 'IN', 'LA', 'MA', 'MD', 'ME', 'MN',
+                      'MS', 'MT', 'NC', 'NE', 'PA', 'SC', 'SD', 'TN', 'VA'}
+
+# State names that are also countries; next to a place abroad they are read
+# as the country ("Tbilisi, Georgia").
+COUNTRY_LIKE_STATES = {'GA'}
+
+# State codes that are also English words only count after a comma or at
+# the end ("Salem OR"), not in "Remote OR Hybrid".
+WORD_CODES = {'OR', 'IN', 'ME', 'OK', 'HI'}
+
+REMOTE_WORDS = ['remote', 'anywhere', 'work from home', 'wfh', 'distributed', 'virtual', 'telecommute',
+                'home based', 'home office']
+
+# Parts of a multi-location string: "Seattle, WA; Toronto, ON" or "NYC | Remote".
+_SEGMENTS = re.compile(r'\s*[;|/\n•·]\s*|\s+or\s+')
+_WORDS = re.compile(r'[A-Za-z0-9]+')
+
+# Phrase kinds in the index.
+_US, _STATE, _CITY, _FOREIGN, _REMOTE = range(5)
+
+
+@dataclass(frozen=True)
+class Location:
+    """Where a posting's location string points.
+
+    country is an ISO code ('US', 'GB', ...), '' for a region abroad such as
+    EMEA, or None when nothing was recognized. state is the US state code,
+    when known; remote is set for remote/anywhere postings, with country
+    saying where remote work is allowed (a bare "Remote" has none).
+    """
+    country: Optional[str] = None
+    state: Optional[str] = None
+    city: Optional[str] = None
+    remote: bool = False
+
+    @property
+    def is_us(self) -> bool:
+        return self.country == 'US'
+
+
+def _build_index() -> Tuple[Dict[Tuple[str, ...], Tuple[int, str]], int]:
+    index: Dict[Tuple[str, ...], Tuple[int, str]] = {}
+
+    def add(phrase: str, kind: int, value: str):
+        index.setdefault(tuple(phrase.split()), (kind, value))
+
+    # Most specific first: 'washington dc' is a city, 'new york' a state.
+    for state, cities in US_CITIES.items():
+        for city in cities:
+            add(city, _CITY, state)
+    for code, name in US_STATES.items():
+        add(name.lower(), _STATE, code)
+    for name in US_NAMES:
+        add(name, _US, 'US')
+    for country, names in FOREIGN.items():
+        for name in names:
+            add(name, _FOREIGN, country)
+    for word in REMOTE_WORDS:
+        add(word, _REMOTE, '')
+    return index, max(len(key) for key in index)
+
+
+_INDEX, _MAX_WORDS = _build_index()
+
+
+def _resolve_segment(segment: str, after_comma: List[bool]) -> Location:
+    words = _WORDS.findall(segment.replace('.', ''))
+    lowered = [w.lower() for w in words]
+    us = strong = remote = False
+    states: List[str] = []
+    # States written out ("ME", "Maine") beat the state a city name implies,
+    # so "Portland, ME" is in Maine rather than Oregon.
+    explicit: List[str] = []
+    city: Optional[str] = None
+    foreign: Optional[str] = None
+    # Word positions of the last US city/state and the last country abroad: a
+    # country after the US place names where it is ("San Jose, Costa Rica").
+    place_at = foreign_at = -1
+    i = 0
+    while i < len(words):
+        for n in range(min(_MAX_WORDS, len(words) - i), 0, -1):
+            hit = _INDEX.get(tuple(lowered[i:i + n]))
+            if hit is not None:
+                break
+        else:
+            n, hit = 1, None
+        word = words[i]
+        # Two-letter codes count when written in capitals ("Austin, TX") or
+        # right after a comma ("austin, tx"); a lower-case "in" or "or" is a word.
+        if n == 1 and len(word) == 2 and (word.isupper() or after_comma[i]):
+            code = word.upper()
+            if code in US_STATES and (code not in WORD_CODES or after_comma[i] or i == len(words) - 1):
+                explicit.append(code)
+                strong = strong or code not in COUNTRY_LIKE_CODES
+                place_at = i
+                i += 1
+                continue
+            if code in FOREIGN_CODES:
+                foreign = FOREIGN_CODES[code]
+                if foreign:
+                    foreign_at = i
+                i += 1
+                continue
+        if hit is None:
+            i += 1
+            continue
+        kind, value = hit
+        if kind == _CITY:
+            strong = True
+            states.append(value)
+            city = city or ' '.join(words[i:i + n])
+            place_at = i
+        elif kind == _STATE:
+            strong = strong or value not in COUNTRY_LIKE_STATES
+            explicit.append(value)
+            place_at = i
+        elif kind == _US:
+            us = strong = True
+        elif kind == _FOREIGN:
+            # The last place wins: "London, ON" is in Canada.
+            foreign = value
+            if value:
+                foreign_at = i
+        elif kind == _REMOTE:
+            remote = True
+        i += n
+
+    states = explicit + states
+    if foreign and foreign_at > place_at and not us:
+        return Location(foreign, None, None, remote)
+    if strong or ((us or states) and foreign is None):
+        return Location('US', states[0] if states else None, city, remote)
+    if foreign is not None:
+        return Location(foreign, None, None, remote)
+    return Location(None, None, None, remote)
+
+
+@lru_cache(maxsize=8192)
+def resolve_location(location: str) -> Location:
+    """Resolve a board's location string against the gazetteer.
+
+    Multi-location strings are split on ';', '|', '/' and 'or'; the result is
+    the first US part if there is one, since the posting is then open in the
+    US, and a bare "Remote" part makes it remote ("NYC / Remote"). Results
+    are memoized per raw string, as boards repeat the same few hundred
+    locations across thousands of postings.
+    """
+    if not location or not location.strip():
+        return Location()
+    found: Optional[Location] = None
+    remote = False
+    for segment in _SEGMENTS.split(location):
+        if not segment:
+            continue
+        # Word positions that directly follow a comma, for lower-case codes.
+        after_comma: List[bool] = []
+        for piece_no, piece in enumerate(segment.replace('.', '').split(',')):
+            after_comma.extend(piece_no > 0 and k == 0 for k, _ in enumerate(_WORDS.findall(piece)))
+        loc = _resolve_segment(segment, after_comma)
+        if loc.country is None:
+            remote = remote or loc.remote
+        elif found is None or (loc.is_us and not found.is_us):
+            found = loc
+    if found is None:
+        return Location(remote=remote)
+    return replace(found, remote=True) if remote and not found.remote else found
@@ -0,0 +1,120 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+Hits = Dict[str, Set[str]]
+
+_TOKEN = re.compile(r'\w+|[^\w\s]')
+
+
+# Bump when the forms a term matches change, so cached scores are redone.
+MATCHER_VERSION = 2
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall((text or '').lower())
+
+
+def plural(word: str) -> Optional[str]:
+    """The regular plural of an alphabetic word of 3+ letters ('managers',
+    'classes'), or None."""
+    if len(word) < 3 or not word.isalpha():
+        return None
+    return word + ('es' if word.endswith(('s', 'x', 'z', 'ch', 'sh')) else 's')
+
+
+def term_forms(term: str) -> Tuple[List[Tuple[str, ...]], bool]:
+    """The token sequences `term` matches, and whether its last token is a
+    prefix. 'data structure' also matches 'data structures'; a trailing '*'
+    matches any word starting with the last token ('new grad*' matches
+    'new grads' and 'new graduate')."""
+    term = (term or '').strip()
+    prefix = term.endswith('*')
+    toks = tuple(tokenize(term.rstrip('*')))
+    if not toks:
+        return [], prefix
+    forms = [toks]
+    if not prefix:
+        last = plural(toks[-1])
+        if last:
+            forms.append(toks[:-1] + (last,))
+    return forms, prefix
+
+
+class KeywordMatcher:
+    """Finds every configured term in a text with one tokenizer pass.
+
+    Terms are grouped into categories (e.g. 'entry', 'negative', 'skill') and
+    matched on whole tokens, so 'java' does not match inside 'javascript' and
+    'lead' does not match 'leading'. A term also matches its regular plural
+    ('manager' matches 'managers'), and a term ending in '*' matches words
+    starting with it (see term_forms). Single-token terms are resolved with a
+    set intersection and multi-token phrases with one substring check against
+    the re-joined token stream, so the cost of a scan grows with the length
+    of the text rather than the number of configured terms.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories = tuple(categories)
+        self.term_categories: Dict[str, Set[str]] = {}
+        for category, terms in categories.items():
+            for term in terms or []:
+                term = (term or '').strip().lower()
+                if term:
+                    self.term_categories.setdefault(term, set()).add(category)
+
+        self._single: Dict[str, List[str]] = {}
+        # (needle, tokens that must all be present, term); a prefix needle has
+        # no trailing space and its last token is left out of the tokens.
+        self._phrases: List[Tuple[str, Tuple[str, ...], str]] = []
+        self._prefixes: List[Tuple[str, Tuple[str, ...], str]] = []
+        for term in self.term_categories:
+            forms, prefix = term_forms(term)
+            for toks in forms:
+                if prefix:
+                    self._prefixes.append((' ' + ' '.join(toks), toks[:-1], term))
+                elif len(toks) == 1:
+                    self._single.setdefault(toks[0], []).append(term)
+                else:
+                    self._phrases.append((' ' + ' '.join(toks) + ' ', toks, term))
+        self._single_keys = frozenset(self._single)
+
+    def empty(self) -> Hits:
+        return {c: set() for c in self.categories}
+
+    def find_terms(self, tokens: List[str]) -> Set[str]:
+        found: Set[str] = set()
+        if not tokens:
+            return found
+        present = set(tokens)
+        for tok in self._single_keys & present:
+            found.update(self._single[tok])
+        joined = None
+        for needle, toks, term in self._phrases:
+            if term in found or not present.issuperset(toks):
+                continue
+            if joined is None:
+                joined = ' ' + ' '.join(tokens) + ' '
+            if needle in joined:
+                found.add(term)
+        for needle, toks, term in self._prefixes:
+            if term in found or not present.issuperset(toks):
+                continue
+            if joined is None:
+                joined = ' ' + ' '.join(tokens) + ' '
+            if needle in joined:
+                found.add(term)
+        return found
+
+    def scan(self, text: str) -> Hits:
+        return self.scan_tokens(tokenize(text))
+
+    def scan_tokens(self, tokens: List[str]) -> Hits:
+        hits = self.empty()
+        for term in self.find_terms(tokens):
+            for category in self.term_categories[term]:
+                hits[category].add(term)
+        return hits
+
+
+def merge_hits(a: Hits, b: Hits) -> Hits:
+    return {c: a.get(c, set()) | b.get(c, set()) for c in set(a) | set(b)}
@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class RunMetrics:
+    """Collects per-stage timings, per-board fetch stats and filter rejections
+    for one run, and writes them out as a JSON run summary.
+
+    Stage timings accumulate, so a stage entered once per batch (streaming
+    mode) reports its total. CPU time is process-wide and therefore includes
+    fetch worker threads. Rejections are kept per candidate profile, as every
+    profile filters the same postings; a run with several profiles reports
+    them by profile name.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.utcnow().isoformat() + 'Z'
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self.stages: Dict[str, Dict] = {}
+        self.fetches: List[Dict] = []
+        self.rejections: Dict[str, Counter] = {}
+        self.counts: Counter = Counter()
+        self.hosts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _add_stage(self, name: str, wall: float, cpu: float, items: int = 0):
+        with self._lock:
+            st = self.stages.setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0, 'items': 0})
+            st['wall_s'] += wall
+            st['cpu_s'] += cpu
+            st['items'] += items
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0):
+        """Time a block; the yielded dict's 'items' can be set inside it."""
+        record = {'items': items}
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            self._add_stage(name, time.perf_counter() - wall0, time.process_time() - cpu0, record['items'])
+
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """Wrap an iterator so time spent producing items is charged to `name`."""
+        it = iter(iterable)
+        while True:
+            wall0, cpu0 = time.perf_counter(), time.process_time()
+            try:
+                item = next(it)
+            except StopIteration:
+                self._add_stage(name, time.perf_counter() - wall0, time.process_time() - cpu0)
+                return
+            self._add_stage(name, time.perf_counter() - wall0, time.process_time() - cpu0, 1)
+            yield item
+
+    def record_fetch(self, source: str, slug: str, latency: float, status: Optional[int], nbytes: int,
+                     jobs: int, error: Optional[str] = None):
+        with self._lock:
+            self.fetches.append({
+                'source': source,
+                'slug': slug,
+                'latency_s': round(latency, 4),
+                'status': status,
+                'bytes': nbytes,
+                'jobs': jobs,
+                'error': error,
+            })
+
+    def record_hosts(self, hosts: Dict[str, Dict]):
+        with self._lock:
+            self.hosts = hosts
+
+    def add_rejections(self, rejections: Counter, profile: str = ''):
+        with self._lock:
+            self.rejections.setdefault(profile, Counter()).update(rejections)
+
+    def summary(self) -> Dict:
+        stages = {}
+        for name, st in self.stages.items():
+            wall = st['wall_s']
+            stages[name] = {
+                'wall_s': round(wall, 4),
+                'cpu_s': round(st['cpu_s'], 4),
+                'items': st['items'],
+                'items_per_s': round(st['items'] / wall, 1) if wall > 0 and st['items'] else None,
+            }
+        fetches = sorted(self.fetches, key=lambda f: (f['source'], f['slug']))
+        if set(self.rejections) <= {''}:
+            rejections = dict(self.rejections.get('', {}))
+        else:
+            rejections = {name: dict(counts) for name, counts in sorted(self.rejections.items())}
+        return {
+            'started_at': self.started_at,
+            'wall_s': round(time.perf_counter() - self._t0, 4),
+            'cpu_s': round(time.process_time() - self._cpu0, 4),
+            'counts': dict(self.counts),
+            'rejections': rejections,
+            'stages': stages,
+            'fetch': {
+                'boards': len(fetches),
+                'failed': sum(1 for f in fetches if f['error']),
+                'not_modified': sum(1 for f in fetches if f['status'] == 304),
+                'bytes': sum(f['bytes'] for f in fetches),
+                'hosts': self.hosts,
+                'slowest': sorted(fetches, key=lambda f: f['latency_s'], reverse=True)[:5],
+                'boards_detail': fetches,
+            },
+        }
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
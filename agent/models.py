@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class Job:
+    id: str
+    title: str
+    company: str
+    location: str
+    url: str
+    source: str
+    description: str
+    date_posted: Optional[str] = None
+    entry_level_score: float = 0.0
+    h1b_confidence: float = 0.0
+    resume_match: float = 0.0
+    final_score: float = 0.0
@@ -0,0 +1,153 @@
+import math
+from collections import Counter
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+
+from .matcher import KeywordMatcher, term_forms, tokenize
+
+# Average posting length (characters of title + description) assumed until the
+# job database has history to measure it from.
+DEFAULT_AVG_LENGTH = 4000.0
+
+# A skill mentioned this many times in an average-length posting counts fully;
+# fewer mentions or a longer posting count proportionally less.
+REFERENCE_TF = 2
+
+# Skills found in nearly every stored posting keep this much IDF, so the
+# configured weights still rank them against each other.
+MIN_IDF = 0.1
+
+
+class CorpusStats:
+    """Document frequencies of the resume skills, and the average posting
+    length, over one crawl.
+
+    Every crawled posting is counted, whether or not the filters go on to
+    accept it, and nothing is read from the job database: the statistics
+    depend only on what the boards list, so scoring the same postings twice
+    gives the same scores whatever earlier runs accepted. Postings are added
+    batch by batch before the first one is scored.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.matcher = KeywordMatcher({'skill': terms})
+        self.total = 0
+        self.length = 0
+        # Keyed by matcher term (lower-cased, stripped skill name).
+        self.df: Counter = Counter()
+
+    def add(self, postings: Iterable[Dict]):
+        find_terms = self.matcher.find_terms
+        for rj in postings:
+            title = (rj.get('title') or '').strip()
+            description = (rj.get('description') or '').strip()
+            self.df.update(find_terms(tokenize(title)) | find_terms(tokenize(description)))
+            self.length += len(title) + len(description)
+            self.total += 1
+
+    def doc_freq(self, term: str) -> int:
+        return self.df[(term or '').strip().lower()]
+
+
+class BM25Relevance:
+    """BM25 relevance of a posting to the resume's weighted skills.
+
+    Each posting is reduced to sparse counts of the profile's skill terms, and
+    every skill contributes weight * idf * saturated term frequency. In a
+    run, score_hits() only scores the skills the keyword matcher already
+    found in the posting, counting single-token skills (and their plurals)
+    in one filtered pass and re-joining the tokens only when a matched skill
+    is a phrase or a prefix. The sum
+    is normalized by the total weight * idf, so the result stays in [0, 1]
+    like the keyword match score it replaces.
+
+    Document frequencies and the average posting length come from the run's
+    whole crawl (CorpusStats) and are rounded, so every posting in a run is
+    scored against the same statistics (streaming or not) and the
+    statistics can be part of the incremental scoring key.
+    """
+
+    def __init__(self, skills: Dict[str, float], idf: Optional[Dict[str, float]] = None,
+                 avg_length: float = DEFAULT_AVG_LENGTH, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.avg_length = avg_length or DEFAULT_AVG_LENGTH
+        idf = idf or {}
+        self.weights: Dict[str, float] = {}
+        # (matcher term, single-token forms, phrase/prefix needles, weight) in
+        # scoring order; matcher terms are the lower-cased, stripped skill
+        # names, and every form a term matches counts towards its frequency.
+        self._entries: List[Tuple[str, Tuple[str, ...], Tuple[str, ...], float]] = []
+        for term, weight in skills.items():
+            forms, prefix = term_forms(term)
+            if not forms or weight <= 0:
+                continue
+            self.weights[term] = weight * idf.get(term, 1.0)
+            singles = tuple(toks[0] for toks in forms if len(toks) == 1 and not prefix)
+            needles = tuple(' ' + ' '.join(toks) + ('' if prefix else ' ')
+                            for toks in forms if prefix or len(toks) > 1)
+            self._entries.append((term.strip().lower(), singles, needles, self.weights[term]))
+        self._counted = frozenset(tok for _, singles, _, _ in self._entries for tok in singles).__contains__
+        self._all = frozenset(key for key, _, _, _ in self._entries)
+        self._norm = sum(self.weights.values())
+        self._reference = self._saturation(REFERENCE_TF, self.avg_length)
+
+    @classmethod
+    def from_config(cls, cfg: Dict, skills: Dict[str, float],
+                    corpus: Optional[CorpusStats] = None) -> Optional['BM25Relevance']:
+        resume_cfg = cfg.get('resume', {}) or {}
+        if resume_cfg.get('relevance', 'keywords') != 'bm25':
+            return None
+        bm25_cfg = resume_cfg.get('bm25', {}) or {}
+        idf: Dict[str, float] = {}
+        avg_length = DEFAULT_AVG_LENGTH
+        if corpus is not None and corpus.total:
+            total = corpus.total
+            df = {t: corpus.doc_freq(t) for t in skills}
+            idf = {t: max(MIN_IDF, round(math.log(1 + (total - n + 0.5) / (n + 0.5)), 1))
+                   for t, n in df.items() if n}
+            # A skill no crawled posting mentions would otherwise get the
+            # largest IDF of all and only deflate every score; treat it as
+            # being as rare as the rarest skill seen.
+            rarest = max(idf.values(), default=1.0)
+            idf.update({t: rarest for t, n in df.items() if not n})
+            avg_length = float(round(corpus.length / total, -2) or DEFAULT_AVG_LENGTH)
+        return cls(skills, idf, avg_length, float(bm25_cfg.get('k1', 1.2)), float(bm25_cfg.get('b', 0.75)))
+
+    def key(self) -> Dict:
+        """Everything that determines a score, for the incremental scoring key."""
+        return {'weights': sorted(self.weights.items()), 'avg_length': self.avg_length, 'k1': self.k1, 'b': self.b}
+
+    def _saturation(self, tf: float, length: float) -> float:
+        k = self.k1 * (1 - self.b + self.b * length / self.avg_length)
+        return tf * (self.k1 + 1) / (tf + k)
+
+    def score_tokens(self, tokens: List[str], length: int) -> float:
+        return self.score_hits(self._all, tokens, [], length)
+
+    def score_hits(self, present: Collection[str], title_tokens: List[str], description_tokens: List[str],
+                   length: int) -> float:
+        """score_tokens() over title + description, given the skill terms the
+        keyword matcher found (`present`); skills not found are not counted."""
+        if self._norm <= 0 or not present:
+            return 0.0
+        k = self.k1 * (1 - self.b + self.b * length / self.avg_length)
+        total = 0.0
+        # One C-level pass keeps only the single-token skills before counting.
+        counts = Counter(filter(self._counted, title_tokens))
+        counts.update(filter(self._counted, description_tokens))
+        joined = None
+        for key, singles, needles, weight in self._entries:
+            if key not in present:
+                continue
+            tf = sum(counts[tok] for tok in singles)
+            if needles:
+                if joined is None:
+                    joined = ' ' + ' '.join(title_tokens + description_tokens) + ' '
+                tf += sum(joined.count(needle) for needle in needles)
+            if tf:
+                sat = tf * (self.k1 + 1) / (tf + k)
+                total += weight * min(1.0, sat / self._reference)
+        return total / self._norm
+
+    def score(self, text: str) -> float:
+        return self.score_tokens(tokenize(text), len(text))
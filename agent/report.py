@@ -0,0 +1,246 @@
+import csv
+import heapq
+import io
+import json
+import os
+from datetime import datetime
+from html import escape
+from typing import Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+from .models import Job
+
+EXPORT_FIELDS = ('rank', 'id', 'title', 'company', 'location', 'url', 'source', 'date_posted', 'resume_match',
+                 'h1b_confidence', 'entry_level_score', 'final_score')
+
+_HEAD = (
+    "<html>"
+    "  <head>"
+    "    <meta charset='utf-8'>"
+    "    <title>Job AI Agent Report</title>"
+    "    <style>"
+    "      body { font-family: Arial, sans-serif; padding: 20px; }"
+    "      table { border-collapse: collapse; width: 100%; }"
+    "      th, td { border: 1px solid #ddd; padding: 8px; }"
+    "      th { background-color: #f4f4f4; }"
+    "      tr:hover { background: #fafafa; }"
+    "    </style>"
+    "  </head>"
+    "  <body>"
+    "    <h2>Job AI Agent Report</h2>"
+)
+
+_TABLE_OPEN = (
+    "    <table>"
+    "      <thead>"
+    "        <tr>"
+    "          <th>Title</th>"
+    "          <th>Company</th>"
+    "          <th>Location</th>"
+    "          <th>Source</th>"
+    "          <th>Date</th>"
+    "          <th>Resume</th>"
+    "          <th>H-1B</th>"
+    "          <th>Entry</th>"
+    "          <th>Score</th>"
+    "        </tr>"
+    "      </thead>"
+    "      <tbody>"
+    "        "
+)
+
+_TABLE_CLOSE = (
+    "      </tbody>"
+    "    </table>"
+)
+
+_TAIL = (
+    "  </body>"
+    "</html>"
+)
+
+
+class TopJobs:
+    """Bounded min-heap keeping the best `limit` jobs seen so far.
+
+    Ties keep the earlier job, so sorted() matches the order of a full
+    stable sort by final_score over the same stream.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._seq = 0
+
+    def push(self, job: Job):
+        if self.limit <= 0:
+            return
+        item = (job.final_score, -self._seq, job)
+        self._seq += 1
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def extend(self, jobs: Iterable[Job]):
+        for job in jobs:
+            self.push(job)
+
+    def sorted(self) -> List[Job]:
+        return [item[2] for item in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+
+def _href(url: str) -> str:
+    # Only web links become clickable; anything else (javascript:, data:) does not.
+    return escape(url) if url.lower().startswith(('https://', 'http://')) else '#'
+
+
+def _row(j: Job) -> str:
+    return f"""<tr>
+                <td><a href='{_href(j.url)}' target='_blank' rel='noopener'>{escape(j.title)}</a></td>
+                <td>{escape(j.company)}</td>
+                <td>{escape(j.location)}</td>
+                <td>{escape(j.source)}</td>
+                <td>{escape(j.date_posted or '')}</td>
+                <td>{j.resume_match:.2f}</td>
+                <td>{j.h1b_confidence:.2f}</td>
+                <td>{j.entry_level_score:.2f}</td>
+                <td><b>{j.final_score:.2f}</b></td>
+            </tr>"""
+
+
+def _write_table(out: TextIO, jobs: Iterable[Job]):
+    out.write(_TABLE_OPEN)
+    for j in jobs:
+        out.write(_row(j))
+    out.write(_TABLE_CLOSE)
+
+
+def write_html(out: TextIO, jobs: Sequence[Job], group_by_company: bool = False, nav: str = '',
+               generated: Optional[str] = None):
+    """Stream one report page to `out`, a row at a time."""
+    out.write(_HEAD)
+    out.write(f"    <p>Generated at: {generated or datetime.utcnow().isoformat() + 'Z'}</p>")
+    if nav:
+        out.write(nav)
+    if not group_by_company:
+        _write_table(out, jobs)
+    else:
+        # Companies in order of their best posting; jobs arrive best first.
+        groups: Dict[str, List[Job]] = {}
+        for j in jobs:
+            groups.setdefault(j.company, []).append(j)
+        for company, group in groups.items():
+            out.write(f"    <h3>{escape(company)} ({len(group)})</h3>")
+            _write_table(out, group)
+    if nav:
+        out.write(nav)
+    out.write(_TAIL)
+
+
+def render_html_report(jobs: Sequence[Job], limit: int = 50) -> str:
+    """The report as one string, e.g. for an email body."""
+    out = io.StringIO()
+    write_html(out, jobs[:limit])
+    return out.getvalue()
+
+
+def page_path(path: str, page: int) -> str:
+    """reports/latest_report.html, reports/latest_report-2.html, ..."""
+    if page <= 1:
+        return path
+    base, ext = os.path.splitext(path)
+    return f'{base}-{page}{ext}'
+
+
+def _nav(path: str, page: int, pages: int) -> str:
+    links = []
+    if page > 1:
+        links.append(f"<a href='{escape(os.path.basename(page_path(path, page - 1)))}'>&lsaquo; Previous</a>")
+    links.append(f'Page {page} of {pages}')
+    if page < pages:
+        links.append(f"<a href='{escape(os.path.basename(page_path(path, page + 1)))}'>Next &rsaquo;</a>")
+    return '    <p>' + ' &middot; '.join(links) + '</p>'
+
+
+def _replace(path: str, write):
+    # Write beside the target and rename, so readers never see half a report.
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def write_json(out: TextIO, jobs: Sequence[Job], include_description: bool = False):
+    out.write('[')
+    for rank, j in enumerate(jobs, 1):
+        record = {f: (rank if f == 'rank' else getattr(j, f)) for f in EXPORT_FIELDS}
+        if include_description:
+            record['description'] = j.description
+        out.write(('\n  ' if rank == 1 else ',\n  ') + json.dumps(record))
+    out.write('\n]\n' if jobs else ']\n')
+
+
+def write_csv(out: TextIO, jobs: Sequence[Job], include_description: bool = False):
+    writer = csv.writer(out)
+    fields = EXPORT_FIELDS + (('description',) if include_description else ())
+    writer.writerow(fields)
+    for rank, j in enumerate(jobs, 1):
+        writer.writerow([rank if f == 'rank' else getattr(j, f) for f in fields])
+
+
+EXPORTERS = {'json': write_json, 'csv': write_csv}
+
+
+class ReportWriter:
+    """Writes a profile's report: the HTML page(s) plus any JSON/CSV exports.
+
+    Jobs are expected best first (as TopJobs.sorted() returns them) and are
+    written row by row, so memory does not grow with the page being built.
+    Every file is replaced atomically.
+    """
+
+    def __init__(self, page_size: int = 0, group_by_company: bool = False, exports: Sequence[str] = (),
+                 include_description: bool = False):
+        unknown = set(exports) - set(EXPORTERS)
+        if unknown:
+            raise ValueError(f"Unknown report export format(s): {', '.join(sorted(unknown))}")
+        self.page_size = page_size
+        self.group_by_company = group_by_company
+        self.exports = tuple(exports)
+        self.include_description = include_description
+
+    @classmethod
+    def from_config(cls, cfg: Dict) -> 'ReportWriter':
+        report_cfg = cfg.get('report', {}) or {}
+        return cls(
+            page_size=int(report_cfg.get('page_size', 0) or 0),
+            group_by_company=bool(report_cfg.get('group_by_company', False)),
+            exports=[str(x).lower() for x in report_cfg.get('exports', []) or []],
+            include_description=bool(report_cfg.get('include_description', False)),
+        )
+
+    def write(self, path: str, jobs: Sequence[Job]) -> List[str]:
+        """Write the report to `path` (and its pages and exports); returns every file written."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        generated = datetime.utcnow().isoformat() + 'Z'
+        size = self.page_size if self.page_size > 0 else max(len(jobs), 1)
+        pages = max(1, -(-len(jobs) // size))
+        written = []
+        for page in range(1, pages + 1):
+            target = page_path(path, page)
+            nav = _nav(path, page, pages) if pages > 1 else ''
+            chunk = jobs[(page - 1) * size:page * size]
+            _replace(target, lambda f: write_html(f, chunk, self.group_by_company, nav, generated))
+            written.append(target)
+        # Drop pages left over from an earlier, longer report.
+        page = pages + 1
+        while os.path.exists(page_path(path, page)):
+            os.remove(page_path(path, page))
+            page += 1
+
+        base = os.path.splitext(path)[0]
+        for fmt in self.exports:
+            target = f'{base}.{fmt}'
+            _replace(target, lambda f: EXPORTERS[fmt](f, jobs, self.include_description))
+            written.append(target)
+        return written
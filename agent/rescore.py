@@ -0,0 +1,155 @@
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from .dedupe import NearDuplicateIndex
+from .job_agent import (ProfileRun, ScoringPool, collapse_duplicates, iter_batches, job_hash, prepare_corpus,
+                        prepare_profiles, score_and_filter_jobs)
+from .models import Job
+from .report import TopJobs
+from .relevance import CorpusStats
+from .snapshot import RECORDED_SECTIONS, iter_snapshot
+from .storage import JobStore
+
+# Score differences below this are float noise (summation order), not changes.
+SCORE_TOLERANCE = 1e-9
+
+
+@dataclass
+class RescoreResult:
+    """One profile's ranking of the snapshot postings under one config."""
+    top: List[Job]
+    cfg: Dict
+    accepted: int = 0
+    rejections: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class _Ranking:
+    profiles: List[ProfileRun]
+    dedupe: Optional[NearDuplicateIndex]
+    tops: Dict[str, TopJobs]
+    accepted: Counter = field(default_factory=Counter)
+    rejections: Dict[str, Counter] = field(default_factory=dict)
+
+
+def iter_postings(paths: List[str]) -> Iterator[Dict]:
+    """Postings from the snapshots at `paths` (oldest first), newest snapshot
+    first. A posting already taken from a newer snapshot is skipped in older
+    ones, so history spanning several crawls is ranked once per posting with
+    its latest content."""
+    seen: Set[str] = set()
+    for path in reversed(paths):
+        current: Set[str] = set()
+        for rj in iter_snapshot(path):
+            jid = job_hash((rj.get('url') or '').strip())
+            if jid in seen:
+                continue
+            if len(paths) > 1:
+                current.add(jid)
+            yield rj
+        seen |= current
+
+
+def snapshot_corpora(postings: Iterable[Dict], configs: Dict[str, Dict],
+                     batch_size: int = 500) -> Dict[str, CorpusStats]:
+    """BM25 corpus statistics over `postings` for each config that ranks by
+    BM25, gathered in one pass; a snapshot gives the statistics the crawl
+    that wrote it was scored with."""
+    corpora = {label: prepare_corpus(cfg) for label, cfg in configs.items()}
+    corpora = {label: corpus for label, corpus in corpora.items() if corpus is not None}
+    if corpora:
+        for batch in iter_batches(postings, batch_size):
+            for corpus in corpora.values():
+                corpus.add(batch)
+    return corpora
+
+
+def snapshot_config(header: Dict, cfg: Dict) -> Dict:
+    """`cfg` with the scoring sections replaced by those a snapshot was crawled with."""
+    base = {k: v for k, v in cfg.items() if k not in RECORDED_SECTIONS}
+    base.update(header.get('config') or {})
+    return base
+
+
+def rescore(postings: Iterable[Dict], configs: Dict[str, Dict], store: Optional[JobStore] = None,
+            batch_size: int = 500,
+            corpora: Optional[Dict[str, CorpusStats]] = None) -> Dict[str, Dict[str, RescoreResult]]:
+    """Rank `postings` under each of `configs` in a single streaming pass.
+
+    Every config goes through the same dedupe -> score_and_filter_jobs ->
+    top-N steps as a run, per candidate profile, but nothing is persisted:
+    the store (if any) only provides known near-duplicate fingerprints.
+    Configs ranking by BM25 need their corpus statistics over the same
+    postings in `corpora` (see snapshot_corpora). Returns {config label:
+    {profile: result}}.
+    """
+    rankings: Dict[str, _Ranking] = {}
+    for label, cfg in configs.items():
+        profiles = prepare_profiles(cfg, store, load_cached=False, corpus=(corpora or {}).get(label))
+        rankings[label] = _Ranking(profiles, NearDuplicateIndex.from_config(cfg, store),
+                                   {p.name: TopJobs(p.top_n) for p in profiles},
+                                   rejections={p.name: Counter() for p in profiles})
+    first = next(iter(configs.values()))
+    pool = ScoringPool.from_config(first, [p.ctx for r in rankings.values() for p in r.profiles])
+
+    started = time.perf_counter()
+    count = 0
+    try:
+        for batch in iter_batches(postings, batch_size):
+            count += len(batch)
+            for r in rankings.values():
+                kept = collapse_duplicates(batch, r.dedupe)
+                for p in r.profiles:
+                    accepted = score_and_filter_jobs(kept, p.cfg, p.resume_profile, p.ctx, pool,
+                                                     r.rejections[p.name], sort=False)
+                    r.tops[p.name].extend(accepted)
+                    r.accepted[p.name] += len(accepted)
+    finally:
+        if pool:
+            pool.close()
+    logging.info(f'Rescored {count} postings under {len(configs)} config(s) in '
+                  f'{time.perf_counter() - started:.2f}s')
+    return {label: {p.name: RescoreResult(r.tops[p.name].sorted(), p.cfg, r.accepted[p.name],
+                                          r.rejections[p.name])
+                    for p in r.profiles}
+            for label, r in rankings.items()}
+
+
+def diff_rankings(before: List[Job], after: List[Job]) -> List[Dict]:
+    """The union of two rankings: postings in their new order, then those that
+    dropped out, each with its rank and score before and after (None where
+    it was not ranked)."""
+    previous = {j.id: (rank, j) for rank, j in enumerate(before, 1)}
+    rows: List[Dict] = []
+    for rank, j in enumerate(after, 1):
+        old_rank, old = previous.pop(j.id, (None, None))
+        rows.append({'id': j.id, 'title': j.title, 'company': j.company, 'url': j.url,
+                     'rank': rank, 'previous_rank': old_rank, 'score': j.final_score,
+                     'previous_score': old.final_score if old is not None else None})
+    for old_rank, old in sorted(previous.values(), key=lambda item: item[0]):
+        rows.append({'id': old.id, 'title': old.title, 'company': old.company, 'url': old.url,
+                     'rank': None, 'previous_rank': old_rank, 'score': None, 'previous_score': old.final_score})
+    return rows
+
+
+def summarize_diff(rows: List[Dict]) -> Dict[str, int]:
+    summary = Counter(entered=0, dropped=0, moved=0, unchanged=0)
+    for row in rows:
+        if row['previous_rank'] is None:
+            summary['entered'] += 1
+        elif row['rank'] is None:
+            summary['dropped'] += 1
+        elif row['rank'] != row['previous_rank']:
+            summary['moved'] += 1
+        else:
+            summary['unchanged'] += 1
+    return dict(summary)
+
+
+def ranking_changes(rows: List[Dict]) -> List[Dict]:
+    """The diff_rankings() rows whose rank or score changed."""
+    return [r for r in rows if r['rank'] != r['previous_rank'] or r['score'] is None or r['previous_score'] is None
+            or abs(r['score'] - r['previous_score']) > SCORE_TOLERANCE]
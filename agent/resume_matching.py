@@ -1,11 +1,22 @@
+import hashlib
+import json
+import logging
 import os
 from dataclasses import dataclass
-from typing import Dict
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Optional
 
-try:
-    from PyPDF2 import PdfReader
-except Exception:
-    PdfReader = None
+from .matcher import Hits, KeywordMatcher
+
+# Bump when the cached extraction or skill detection changes.
+RESUME_CACHE_VERSION = 1
+
+DEFAULT_PDF_SKILLS = {
+    'python': 1.0, 'java': 0.8, 'javascript': 0.7, 'sql': 1.0,
+    'aws': 0.8, 'docker': 0.7, 'react': 0.6, 'node': 0.6,
+    'data structures': 0.9, 'algorithms': 0.9,
+}
 
 
 @dataclass
@@ -13,13 +24,21 @@ class ResumeProfile:
     skills: Dict[str, float]
     titles_of_interest: set
 
+    @cached_property
+    def matcher(self) -> KeywordMatcher:
+        """The profile's skill terms, compiled once and reused for every posting."""
+        return KeywordMatcher({'skill': self.skills})
+
 
 def _normalize(s: str) -> str:
     return (s or '').lower()
 
 
 def _extract_text_from_pdf(path: str) -> str:
-    if not PdfReader:
+    # PyPDF2 is optional and slow to import; only runs with a resume PDF need it.
+    try:
+        from PyPDF2 import PdfReader
+    except Exception:
         return ''
     if not os.path.isfile(path):
         return ''
@@ -36,27 +55,78 @@ def _extract_text_from_pdf(path: str) -> str:
         return ''
 
 
+def _file_sha256(path: str) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _pdf_skills(path: str, candidates: Dict[str, float], cache_dir: Optional[str]) -> Dict[str, float]:
+    """Skills from `candidates` that appear in the resume PDF.
+
+    The extracted text and the detected skills are cached under cache_dir in a
+    file named after the PDF's sha256, with skills keyed by a hash of the
+    candidate list, so a changed PDF or skills config is picked up
+    automatically and repeat runs never parse the PDF.
+    """
+    pdf_hash = _file_sha256(path)
+    if pdf_hash is None:
+        return {}
+    skills_key = hashlib.sha256(json.dumps(sorted(candidates.items())).encode('utf-8')).hexdigest()
+    cache_file = Path(cache_dir) / f'{pdf_hash}.json' if cache_dir else None
+
+    entry: Dict = {}
+    if cache_file is not None:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = {}
+        if entry.get('version') != RESUME_CACHE_VERSION:
+            entry = {}
+    cached = entry.get('skills', {}).get(skills_key)
+    if cached is not None:
+        logging.info(f'Resume profile loaded from cache ({cache_file})')
+        return cached
+
+    text = entry.get('text')
+    if text is None:
+        text = _extract_text_from_pdf(path)
+    found = KeywordMatcher({'skill': candidates}).scan(text)['skill']
+    skills = {k: v for k, v in candidates.items() if k in found}
+
+    # An empty extraction may just mean PyPDF2 is missing; don't pin it.
+    if cache_file is not None and text:
+        entry = {
+            'version': RESUME_CACHE_VERSION,
+            'text': text,
+            'skills': {**entry.get('skills', {}), skills_key: skills},
+        }
+        tmp = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp, cache_file)
+        except OSError as e:
+            logging.warning(f"Could not write resume cache {cache_file}: {e}")
+    return skills
+
+
 def build_resume_profile(cfg: Dict) -> ResumeProfile:
     resume_cfg = cfg.get('resume', {})
     skills: Dict[str, float] = {}
 
     if resume_cfg.get('use_pdf'):
-        text = _extract_text_from_pdf(resume_cfg.get('resume_pdf_path', ''))
-        t = _normalize(text)
         configured = resume_cfg.get('skills', {}) or {}
         if configured:
-            for skill, wt in configured.items():
-                if _normalize(skill) in t:
-                    skills[_normalize(skill)] = float(wt)
+            candidates = {_normalize(k): float(v) for k, v in configured.items()}
         else:
-            defaults = {
-                'python': 1.0, 'java': 0.8, 'javascript': 0.7, 'sql': 1.0,
-                'aws': 0.8, 'docker': 0.7, 'react': 0.6, 'node': 0.6,
-                'data structures': 0.9, 'algorithms': 0.9,
-            }
-            for k, v in defaults.items():
-                if k in t:
-                    skills[k] = v
+            candidates = dict(DEFAULT_PDF_SKILLS)
+        skills = _pdf_skills(resume_cfg.get('resume_pdf_path', ''), candidates,
+                             resume_cfg.get('cache_dir', 'data/resume_cache'))
     else:
         cfg_skills = resume_cfg.get('skills', {}) or {}
         for k, v in cfg_skills.items():
@@ -66,8 +136,7 @@ def build_resume_profile(cfg: Dict) -> ResumeProfile:
     return ResumeProfile(skills=skills, titles_of_interest=titles)
 
 
-def compute_match_score(text: str, profile: ResumeProfile) -> float:
-    t = _normalize(text)
+def match_score(hits: Hits, profile: ResumeProfile) -> float:
     if not profile.skills:
         return 0.0
 
@@ -75,8 +144,9 @@ def compute_match_score(text: str, profile: ResumeProfile) -> float:
     if total_weight <= 0:
         return 0.0
 
-    score = 0.0
-    for skill, weight in profile.skills.items():
-        if skill in t:
-            score += weight
+    score = sum(profile.skills[skill] for skill in hits['skill'] if skill in profile.skills)
     return max(0.0, min(1.0, score / total_weight))
+
+
+def compute_match_score(text: str, profile: ResumeProfile, matcher: Optional[KeywordMatcher] = None) -> float:
+    return match_score((matcher or profile.matcher).scan(text), profile)
@@ -0,0 +1,254 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator, Optional
+
+# Responses that mean "slow down": the board is retried later in the run
+# instead of being dropped.
+THROTTLE_STATUSES = {429, 503}
+
+# Request starts remembered per host to measure the rate that got us throttled.
+RATE_WINDOW = 10.0
+
+# Slowest request rate a throttled host is backed off to.
+MIN_RATE = 0.2
+
+# Smoothing of the per-host latency average.
+LATENCY_ALPHA = 0.2
+
+# Latency rises smaller than this (seconds) are treated as jitter, not load.
+LATENCY_SLACK = 0.05
+
+
+class TokenBucket:
+    """Request-rate limiter. Callers reserve a token and sleep for the
+    returned delay, so waiting never happens under the scheduler's lock."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = 0.0
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+
+class HostState:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.bucket: Optional[TokenBucket] = None
+        self.cooldown_until = 0.0
+        # When the host was last backed off; throttle responses to requests
+        # admitted before then belong to the same episode.
+        self.backed_off_at = float('-inf')
+        self.started: deque = deque()
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self.successes = 0
+        self.throttle_streak = 0
+        self.stats = {
+            'requests': 0, 'ok': 0, 'throttled': 0, 'errors': 0, 'deferred': 0, 'recovered': 0,
+            'dropped': 0, 'wait_s': 0.0, 'limit_min': limit, 'limit_max': limit,
+        }
+
+    def recent_rate(self, now: float) -> Optional[float]:
+        while self.started and self.started[0] < now - RATE_WINDOW:
+            self.started.popleft()
+        if len(self.started) < 2:
+            return None
+        return len(self.started) / max(now - self.started[0], 1.0)
+
+    def set_limit(self, limit: int):
+        self.limit = limit
+        self.stats['limit_min'] = min(self.stats['limit_min'], limit)
+        self.stats['limit_max'] = max(self.stats['limit_max'], limit)
+
+
+class CrawlScheduler:
+    """Per-host admission control for the board crawl.
+
+    Each API host gets a concurrency limit that adapts AIMD-style: it grows by
+    one after `limit` consecutive healthy responses and shrinks by one when
+    the host's average latency rises past `latency_factor` times the best
+    seen so far. A 429/503 halves the limit, starts a cooldown (Retry-After,
+    or an exponential backoff from `retry_delay`) and puts the host on a
+    token bucket at half the rate that got it throttled; further 429/503s
+    to requests that were already in flight back off no further. The rate
+    then recovers by a quarter per healthy window, up to `rate` if configured.
+
+    Throttled boards are deferred rather than dropped: the crawl re-queues
+    them after the rest of the work, up to `max_deferrals` times each.
+    """
+
+    def __init__(self, concurrency: int = 4, max_concurrency: Optional[int] = None, min_concurrency: int = 1,
+                 rate: Optional[float] = None, burst: Optional[float] = None, max_deferrals: int = 3,
+                 retry_delay: float = 5.0, max_cooldown: float = 120.0, latency_factor: float = 2.0):
+        self.concurrency = max(1, concurrency)
+        self.max_concurrency = max(self.concurrency, max_concurrency or self.concurrency * 2)
+        self.min_concurrency = max(1, min(min_concurrency, self.concurrency))
+        self.rate = rate
+        self.burst = burst
+        self.max_deferrals = max_deferrals
+        self.retry_delay = retry_delay
+        self.max_cooldown = max_cooldown
+        self.latency_factor = latency_factor
+        self.hosts: Dict[str, HostState] = {}
+        self._deferrals: Dict[Hashable, int] = {}
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_config(cls, cfg: Dict) -> 'CrawlScheduler':
+        sources_cfg = cfg.get('sources', {}) or {}
+        sched_cfg = sources_cfg.get('scheduler', {}) or {}
+        max_workers = int(sources_cfg.get('max_workers', 1) or 1)
+        rate = sched_cfg.get('rate')
+        return cls(
+            concurrency=int(sources_cfg.get('per_host_limit', max_workers) or max_workers),
+            max_concurrency=int(sched_cfg.get('max_per_host', 0) or 0) or max_workers,
+            rate=float(rate) if rate else None,
+            burst=float(sched_cfg['burst']) if sched_cfg.get('burst') else None,
+            max_deferrals=int(sched_cfg.get('max_deferrals', 3)),
+            retry_delay=float(sched_cfg.get('retry_delay', 5.0)),
+            max_cooldown=float(sched_cfg.get('max_cooldown', 120.0)),
+            latency_factor=float(sched_cfg.get('latency_factor', 2.0)),
+        )
+
+    def _host(self, host: str) -> HostState:
+        h = self.hosts.get(host)
+        if h is None:
+            h = self.hosts[host] = HostState(self.concurrency)
+            if self.rate:
+                h.bucket = TokenBucket(self.rate, self.burst or self.concurrency, time.monotonic())
+                h.bucket.tokens = h.bucket.burst
+        return h
+
+    def ready(self, host: str) -> bool:
+        """Whether `host` is out of its cooldown."""
+        with self._cond:
+            return time.monotonic() >= self._host(host).cooldown_until
+
+    @contextmanager
+    def slot(self, host: str) -> Iterator[float]:
+        """Hold one of `host`'s request slots, waiting for cooldown, a free
+        slot and a rate token first. Yields the time the request was let
+        through, to pass to complete()."""
+        started = time.monotonic()
+        with self._cond:
+            h = self._host(host)
+            while True:
+                now = time.monotonic()
+                if now < h.cooldown_until:
+                    self._cond.wait(h.cooldown_until - now)
+                elif h.in_flight >= h.limit:
+                    self._cond.wait()
+                else:
+                    break
+            h.in_flight += 1
+            h.started.append(now)
+            delay = h.bucket.reserve(now) if h.bucket is not None else 0.0
+            admitted = now
+        if delay > 0:
+            time.sleep(delay)
+        with self._cond:
+            # A backoff that began while this request waited for its rate
+            # token applies to it as well.
+            while time.monotonic() < h.cooldown_until:
+                self._cond.wait(h.cooldown_until - time.monotonic())
+                admitted = time.monotonic()
+            h.stats['wait_s'] += time.monotonic() - started
+        try:
+            yield admitted
+        finally:
+            with self._cond:
+                h.in_flight -= 1
+                self._cond.notify_all()
+
+    def complete(self, host: str, board: Hashable, status: Optional[int], latency: float,
+                 retry_after: Optional[float] = None, admitted: Optional[float] = None) -> bool:
+        """Record a board's response and adapt the host's limits. Returns True
+        when the board was throttled and should be retried later.
+
+        `admitted` is the time slot() let the request through; a throttle
+        response to a request admitted before the host's last backoff is
+        counted but does not back the host off again.
+        """
+        with self._cond:
+            h = self._host(host)
+            st = h.stats
+            st['requests'] += 1
+            now = time.monotonic()
+            if status in THROTTLE_STATUSES:
+                st['throttled'] += 1
+                if admitted is None or admitted >= h.backed_off_at:
+                    self._throttled(h, now, retry_after)
+                    self._cond.notify_all()
+                tries = self._deferrals.get(board, 0)
+                if tries < self.max_deferrals:
+                    self._deferrals[board] = tries + 1
+                    st['deferred'] += 1
+                    return True
+                st['dropped'] += 1
+                return False
+
+            h.throttle_streak = 0
+            if status is None or status >= 400:
+                st['errors'] += 1
+                h.successes = 0
+                return False
+            st['ok'] += 1
+            if self._deferrals.pop(board, None):
+                st['recovered'] += 1
+            h.latency = latency if h.latency is None else (
+                (1 - LATENCY_ALPHA) * h.latency + LATENCY_ALPHA * latency)
+            h.baseline = h.latency if h.baseline is None else min(h.baseline, h.latency)
+            h.successes += 1
+            if h.successes >= h.limit:
+                h.successes = 0
+                if h.latency > self.latency_factor * h.baseline + LATENCY_SLACK:
+                    h.set_limit(max(self.min_concurrency, h.limit - 1))
+                else:
+                    h.set_limit(min(self.max_concurrency, h.limit + 1))
+                    if h.bucket is not None:
+                        self._recover_rate(h)
+                self._cond.notify_all()
+            return False
+
+    def _throttled(self, h: HostState, now: float, retry_after: Optional[float]):
+        h.successes = 0
+        h.set_limit(max(self.min_concurrency, h.limit // 2))
+        current = h.bucket.rate if h.bucket is not None else h.recent_rate(now)
+        rate = max(MIN_RATE, (current or float(h.limit)) / 2)
+        if h.bucket is None:
+            h.bucket = TokenBucket(rate, self.burst or 1.0, now)
+        else:
+            h.bucket.rate = rate
+        if retry_after is None:
+            retry_after = self.retry_delay * (2 ** min(h.throttle_streak, 5))
+        h.throttle_streak += 1
+        h.backed_off_at = now
+        h.cooldown_until = max(h.cooldown_until, now + min(retry_after, self.max_cooldown))
+
+    def _recover_rate(self, h: HostState):
+        rate = h.bucket.rate * 1.25
+        if self.rate and rate >= self.rate:
+            rate = self.rate
+        h.bucket.rate = rate
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._cond:
+            out = {}
+            for host, h in sorted(self.hosts.items()):
+                st = dict(h.stats)
+                st['wait_s'] = round(st['wait_s'], 3)
+                st['limit'] = h.limit
+                st['rate'] = round(h.bucket.rate, 2) if h.bucket is not None else None
+                st['latency_ms'] = round(h.latency * 1000, 1) if h.latency is not None else None
+                st['baseline_ms'] = round(h.baseline * 1000, 1) if h.baseline is not None else None
+                out[host] = st
+            return out
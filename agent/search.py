@@ -0,0 +1,111 @@
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .storage import JobStore
+
+# bm25() column weights for jobs_fts(title, company, location, description).
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_TERM_RE = re.compile(r'\w+')
+_OPERATORS = {'AND', 'OR', 'NOT'}
+
+RESULT_COLUMNS = ('job_id', 'title', 'company', 'location', 'url', 'source', 'date_posted', 'first_seen',
+                  'last_seen', 'final_score')
+
+
+def match_query(text: str) -> str:
+    """Turn free text into an FTS5 query.
+
+    Each whitespace-separated term becomes a quoted phrase of its word
+    characters, so "new-grad" matches "new grad" and punctuation never
+    produces a syntax error. Upper-case AND/OR/NOT pass through as operators.
+    """
+    parts = []
+    for term in text.split():
+        if term in _OPERATORS:
+            parts.append(term)
+            continue
+        words = _TERM_RE.findall(term)
+        if words:
+            parts.append('"' + ' '.join(words) + '"')
+    return ' '.join(parts)
+
+
+def search_jobs(store: JobStore, text: Optional[str] = None, source: Optional[str] = None,
+                company: Optional[str] = None, min_score: Optional[float] = None,
+                since: Optional[str] = None, until: Optional[str] = None, days: Optional[int] = None,
+                limit: int = 20, raw_query: bool = False, profile: Optional[str] = None) -> List[Dict]:
+    """Search persisted jobs, ranked by full-text relevance when `text` is given
+    and by final score otherwise.
+
+    source is a source name ('greenhouse') or a single board ('greenhouse:acme').
+    Date filters apply to last_seen, i.e. when the posting was last crawled.
+    profile keeps only jobs accepted for that candidate profile, and then
+    min_score applies to that profile's score rather than the best score
+    across profiles.
+    """
+    where: List[str] = []
+    params: List = []
+    if source:
+        if ':' in source:
+            where.append('j.source = ?')
+            params.append(source)
+        else:
+            # A range instead of LIKE so idx_jobs_source can be used.
+            where.append('j.source >= ? AND j.source < ?')
+            params.extend([source + ':', source + ';'])
+    if company:
+        where.append('j.company = ? COLLATE NOCASE')
+        params.append(company)
+    if profile:
+        if min_score is not None:
+            where.append('j.job_id IN (SELECT job_id FROM job_scores '
+                         'WHERE profile = ? AND accepted = 1 AND final_score >= ?)')
+            params.extend([profile, min_score])
+        else:
+            where.append('j.job_id IN (SELECT job_id FROM job_scores WHERE profile = ? AND accepted = 1)')
+            params.append(profile)
+    elif min_score is not None:
+        where.append('j.final_score >= ?')
+        params.append(min_score)
+    if days is not None:
+        since = max(since or '', (datetime.utcnow() - timedelta(days=days)).isoformat())
+    if since:
+        where.append('j.last_seen >= ?')
+        params.append(since)
+    if until:
+        # Date-only bounds include the whole day.
+        where.append('j.last_seen < ?')
+        params.append(until + 'T99' if len(until) == 10 else until)
+
+    columns = ', '.join(f'j.{c}' for c in RESULT_COLUMNS)
+    if text and store.has_fts:
+        query = text if raw_query else match_query(text)
+        weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+        sql = (f'SELECT {columns}, bm25(jobs_fts, {weights}) AS rank '
+               'FROM jobs_fts JOIN jobs j ON j.rowid = jobs_fts.rowid '
+               'WHERE jobs_fts MATCH ?' + ''.join(f' AND {w}' for w in where) +
+               ' ORDER BY rank LIMIT ?')
+        params = [query] + params
+    else:
+        if text:
+            for word in _TERM_RE.findall(text):
+                where.append('(j.title LIKE ? OR (SELECT inflate(body) FROM descriptions d '
+                             'WHERE d.hash = j.description_hash) LIKE ?)')
+                params.extend([f'%{word}%', f'%{word}%'])
+        sql = (f'SELECT {columns}, NULL AS rank FROM jobs j' +
+               (' WHERE ' + ' AND '.join(where) if where else '') +
+               ' ORDER BY j.final_score DESC, j.last_seen DESC LIMIT ?')
+    params.append(limit)
+
+    try:
+        rows = store.con.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as e:
+        # FTS5 rejects malformed MATCH expressions (unbalanced quotes, a stray
+        # AND) only when the query runs.
+        if text and store.has_fts:
+            raise ValueError(f'invalid query syntax: {e}') from None
+        raise
+    return [dict(zip(RESULT_COLUMNS + ('rank',), row)) for row in rows]
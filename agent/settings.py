@@ -0,0 +1,219 @@
+import copy
+import json
+import logging
+import os
+import re
+import zlib
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Bump when validation or the cached file layout changes.
+SETTINGS_CACHE_VERSION = 3
+
+# Parsed configs are cached here as JSON, keyed by the config file's path,
+# size and mtime, so most CLI calls skip importing and running the YAML
+# parser. Set JOB_AGENT_CONFIG_CACHE to another directory, or to 0 to disable.
+DEFAULT_CACHE_DIR = os.path.join('data', 'config_cache')
+
+# Keys holding credentials (email.smtp_pass and the like). A config that sets
+# one inline, rather than as a ${VAR} placeholder, is never cached, so the
+# secret is not copied into the cache directory.
+_SECRET_KEY = re.compile(r'pass|secret|token|api_?key', re.I)
+_PLACEHOLDER = re.compile(r'\$\{\w+\}')
+
+
+def _str_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(x, str) for x in value)
+
+
+def _number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _weights(value) -> bool:
+    return isinstance(value, dict) and all(isinstance(k, str) and _number(v) for k, v in value.items())
+
+
+def _whole_number(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _mapping(value) -> bool:
+    return isinstance(value, dict)
+
+
+# (dotted key, check, what it must be). Missing or empty keys are left to
+# each section's defaults.
+CHECKS: List[Tuple[str, Callable, str]] = [
+    ('sources.greenhouse', _str_list, 'a list of board slugs'),
+    ('sources.lever', _str_list, 'a list of board slugs'),
+    ('filters.entry_level_keywords', _str_list, 'a list of strings'),
+    ('filters.excluded_seniority', _str_list, 'a list of strings'),
+    ('filters.titles_of_interest', _str_list, 'a list of strings'),
+    ('filters.require_us_location', lambda v: isinstance(v, bool), 'true or false'),
+    ('h1b.positive_keywords', _str_list, 'a list of strings'),
+    ('h1b.negative_keywords', _str_list, 'a list of strings'),
+    ('h1b.fuzzy_threshold', _number, 'a number'),
+    ('resume.skills', _weights, 'a mapping of skill -> weight'),
+    ('resume.titles_of_interest', _str_list, 'a list of strings'),
+    ('resume.min_match_score', _number, 'a number'),
+    ('report.top_n', _whole_number, 'a whole number'),
+]
+
+# Config sections a profile may override; sources, persistence, scoring and
+# pipeline settings are shared so the crawl happens once.
+PROFILE_SECTIONS = ('resume', 'filters', 'h1b', 'report', 'email')
+
+
+def _lookup(cfg: Dict, dotted: str):
+    value = cfg
+    for part in dotted.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def config_problems(cfg: Dict, prefix: str = '') -> List[str]:
+    problems = []
+    for key, check, expected in CHECKS:
+        value = _lookup(cfg, key)
+        if value is not None and not check(value):
+            problems.append(f'{prefix}{key} must be {expected}')
+    for section in sorted({key.split('.', 1)[0] for key, _, _ in CHECKS} | set(PROFILE_SECTIONS)):
+        if cfg.get(section) is not None and not _mapping(cfg[section]):
+            problems.append(f'{prefix}{section} must be a mapping')
+    return problems
+
+
+def validate_config(cfg, path: str = 'config') -> Dict:
+    """Raise ValueError naming every malformed setting `cfg` has, so a typo
+    fails at startup instead of halfway through a crawl."""
+    if not isinstance(cfg, dict):
+        raise ValueError(f'{path}: expected a mapping of config sections')
+    problems = config_problems(cfg)
+    profiles = cfg.get('profiles')
+    if profiles is not None:
+        if not isinstance(profiles, list) or not all(isinstance(p, dict) for p in profiles):
+            problems.append('profiles must be a list of mappings')
+        else:
+            for i, entry in enumerate(profiles):
+                problems.extend(config_problems(entry, f'profiles[{i}].'))
+    if problems:
+        raise ValueError(f"{path}: {'; '.join(sorted(problems))}")
+    return cfg
+
+
+class Settings(NamedTuple):
+    """A parsed and validated config file.
+
+    Treat `data` as read-only; load_config() hands every caller its own copy
+    for the from_config() constructors (see filters.FilterSettings for the
+    scoring keywords and thresholds in typed form).
+    """
+    path: str
+    stamp: Tuple[int, int]
+    data: Dict
+
+    def config(self) -> Dict:
+        return copy.deepcopy(self.data)
+
+
+_loaded: Dict[str, Settings] = {}
+
+
+def _stamp(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _cache_path(path: str) -> Optional[str]:
+    directory = os.environ.get('JOB_AGENT_CONFIG_CACHE', DEFAULT_CACHE_DIR)
+    if not directory or directory == '0':
+        return None
+    # The cached file records the full path, so a checksum is enough to name it.
+    return os.path.join(directory, f"{zlib.crc32(path.encode('utf-8')):08x}.json")
+
+
+def _read_cached(cache_path: Optional[str], path: str, stamp: Tuple[int, int]) -> Optional[Dict]:
+    if not cache_path:
+        return None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if doc.get('version') != SETTINGS_CACHE_VERSION or doc.get('path') != path or doc.get('stamp') != list(stamp):
+        return None
+    return doc.get('config')
+
+
+def _has_inline_secret(value) -> bool:
+    if isinstance(value, dict):
+        return any((_SECRET_KEY.search(str(k)) and v not in (None, '') and not _PLACEHOLDER.fullmatch(str(v)))
+                   or _has_inline_secret(v) for k, v in value.items())
+    if isinstance(value, list):
+        return any(_has_inline_secret(v) for v in value)
+    return False
+
+
+def _write_cached(cache_path: Optional[str], path: str, stamp: Tuple[int, int], cfg: Dict):
+    if not cache_path:
+        return
+    if _has_inline_secret(cfg):
+        try:
+            os.remove(cache_path)  # a copy written before the secret was added
+        except OSError:
+            pass
+        return
+    try:
+        text = json.dumps({'version': SETTINGS_CACHE_VERSION, 'path': path, 'stamp': list(stamp), 'config': cfg})
+    except (TypeError, ValueError):
+        return
+    if json.loads(text)['config'] != cfg:
+        return  # YAML-only values (dates, non-string keys) would not round-trip
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        logging.debug(f'Could not cache parsed config {path}: {e}')
+
+
+def parse_yaml(path: str):
+    import yaml
+
+    loader = getattr(yaml, 'CSafeLoader', None) or yaml.SafeLoader
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=loader)
+
+
+def load_settings(path: str) -> Settings:
+    """Parse and validate the config at `path` (or config.example.yaml next
+    to it when it does not exist), once per file version: repeat calls in
+    the same process reuse the result, and other processes read the parsed
+    config back from the JSON cache while the file is unchanged."""
+    if not os.path.isfile(path):
+        example_path = os.path.join(os.path.dirname(path), 'config.example.yaml')
+        if not os.path.isfile(example_path):
+            raise FileNotFoundError(f"Config not found: {path}")
+        path = example_path
+    path = os.path.abspath(path)
+    stamp = _stamp(path)
+    settings = _loaded.get(path)
+    if settings is not None and settings.stamp == stamp:
+        return settings
+
+    cache_path = _cache_path(path)
+    cfg = _read_cached(cache_path, path, stamp)
+    if cfg is None:
+        cfg = validate_config(parse_yaml(path), path)
+        _write_cached(cache_path, path, stamp, cfg)
+    settings = Settings(path, stamp, cfg)
+    _loaded[path] = settings
+    return settings
+
+
+def load_config(path: str) -> Dict:
+    return load_settings(path).config()
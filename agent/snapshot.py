@@ -0,0 +1,117 @@
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Bump when the header or posting format changes.
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_SUFFIX = '.jsonl.gz'
+
+# Config sections recorded in each snapshot, so a rescore can compare a new
+# config against the one the crawl was ranked with. Email settings stay out.
+RECORDED_SECTIONS = ('resume', 'filters', 'h1b', 'dedupe', 'report', 'profiles')
+
+
+def recorded_config(cfg: Dict) -> Dict:
+    out = {k: cfg[k] for k in RECORDED_SECTIONS if k in cfg}
+    if out.get('profiles'):
+        out['profiles'] = [{k: v for k, v in entry.items() if k != 'email'} for entry in out['profiles']]
+    return out
+
+
+class SnapshotWriter:
+    """Writes one crawl's raw postings to data/snapshots/crawl-<UTC time>.jsonl.gz.
+
+    The first line is a header (format version, creation time and the
+    scoring-related config sections); every other line is one posting dict
+    exactly as the source parsers returned it. Postings are appended as they
+    are crawled, under a .part name that is renamed once the crawl finished,
+    so readers never pick up a partial snapshot. Snapshots older than
+    keep_days are removed when a new one is completed.
+    """
+
+    def __init__(self, directory: str, cfg: Optional[Dict] = None, keep_days: Optional[float] = None,
+                 compresslevel: int = 6):
+        self.directory = directory
+        self.keep_days = keep_days
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+        self.path = os.path.join(directory, f'crawl-{stamp}{SNAPSHOT_SUFFIX}')
+        self._part = self.path + '.part'
+        self._file = gzip.open(self._part, 'wt', encoding='utf-8', compresslevel=compresslevel)
+        header = {'snapshot': SNAPSHOT_VERSION, 'created': stamp, 'config': recorded_config(cfg or {})}
+        self._file.write(json.dumps(header, default=str) + '\n')
+        self.count = 0
+
+    @classmethod
+    def from_config(cls, cfg: Dict) -> Optional['SnapshotWriter']:
+        snap_cfg = cfg.get('snapshots', {}) or {}
+        if not snap_cfg.get('enabled', False):
+            return None
+        keep_days = snap_cfg.get('keep_days')
+        return cls(snap_cfg.get('directory', 'data/snapshots'), cfg,
+                   keep_days=float(keep_days) if keep_days else None)
+
+    def write(self, postings: Iterable[Dict]):
+        for rj in postings:
+            self._file.write(json.dumps(rj, separators=(',', ':')) + '\n')
+            self.count += 1
+
+    def close(self, complete: bool = True) -> Optional[str]:
+        """Finish the snapshot; an incomplete crawl's snapshot is discarded."""
+        self._file.close()
+        if not complete:
+            os.remove(self._part)
+            return None
+        os.replace(self._part, self.path)
+        logging.info(f'Snapshot of {self.count} postings written to {self.path}')
+        if self.keep_days:
+            prune_snapshots(self.directory, self.keep_days)
+        return self.path
+
+
+def prune_snapshots(directory: str, keep_days: float):
+    cutoff = time.time() - keep_days * 86400
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith('crawl-') and (name.endswith(SNAPSHOT_SUFFIX) or name.endswith('.part')):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def list_snapshots(paths: Iterable[str]) -> List[str]:
+    """Snapshot files named by `paths` (files, or directories holding them), oldest first."""
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            found.update(os.path.join(path, name) for name in os.listdir(path)
+                         if name.startswith('crawl-') and name.endswith(SNAPSHOT_SUFFIX))
+        elif os.path.isfile(path):
+            found.add(path)
+        else:
+            raise FileNotFoundError(f'No snapshot at {path}')
+    return sorted(found, key=lambda p: (os.path.basename(p), p))
+
+
+def read_header(path: str) -> Dict:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline() or '{}')
+    if header.get('snapshot') != SNAPSHOT_VERSION:
+        raise ValueError(f'{path} is not a version {SNAPSHOT_VERSION} crawl snapshot')
+    return header
+
+
+def iter_snapshot(path: str) -> Iterator[Dict]:
+    read_header(path)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        f.readline()
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .http import HttpTransport, default_transport
+
+# Bump when the normalized job dict format changes so stale entries are ignored.
+CACHE_VERSION = 2
+
+
+class ResponseCache:
+    """On-disk cache of normalized board responses keyed by board URL.
+
+    Each entry keeps the ETag/Last-Modified validators from the last full
+    download plus the job dicts produced from it, so a 304 can be answered
+    without re-parsing. An entry's age is its file's mtime, which a 304
+    refreshes (touch), so entries not confirmed within max_age are dropped,
+    and the least recently used entries are evicted once the directory
+    exceeds max_bytes.
+    """
+
+    def __init__(self, directory: str, max_age: float = 7 * 24 * 3600, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, cfg: Dict) -> Optional['ResponseCache']:
+        cache_cfg = (cfg.get('sources', {}) or {}).get('cache', {}) or {}
+        if not cache_cfg.get('enabled', False):
+            return None
+        return cls(
+            cache_cfg.get('directory', 'data/http_cache'),
+            max_age=float(cache_cfg.get('max_age_hours', 168)) * 3600,
+            max_bytes=int(float(cache_cfg.get('max_size_mb', 256)) * 1024 * 1024),
+        )
+
+    def _path(self, url: str) -> Path:
+        return self.directory / (hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url: str) -> Optional[Dict]:
+        path = self._path(url)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('version') != CACHE_VERSION or entry.get('url') != url:
+            return None
+        return entry
+
+    def put(self, url: str, headers, jobs: List[Dict]):
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not (etag or last_modified):
+            return
+        entry = {
+            'version': CACHE_VERSION,
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time(),
+            'jobs': jobs,
+        }
+        path = self._path(url)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, separators=(',', ':'))
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.warning(f"Could not write response cache for {url}: {e}")
+
+    def touch(self, url: str):
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def prune(self):
+        now = time.time()
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = 0
+        for mtime, size, path in sorted(entries, reverse=True):
+            if now - mtime > self.max_age or total + size > self.max_bytes:
+                path.unlink(missing_ok=True)
+            else:
+                total += size
+
+
+def validator_headers(entry: Optional[Dict]) -> Optional[Dict[str, str]]:
+    if not entry:
+        return None
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers or None
+
+
+def fetch_normalized(url: str, normalize: Callable[[object], List[Dict]],
+                     transport: Optional[HttpTransport] = None,
+                     cache: Optional[ResponseCache] = None) -> List[Dict]:
+    entry = cache.get(url) if cache else None
+    r = (transport or default_transport()).get(url, headers=validator_headers(entry))
+    if r.status_code == 304 and entry is not None:
+        cache.touch(url)
+        return entry['jobs']
+    r.raise_for_status()
+    jobs = normalize(r.json())
+    if cache:
+        cache.put(url, r.headers, jobs)
+    return jobs
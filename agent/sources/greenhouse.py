@@ -1,33 +1,29 @@
 
-import requests
-import re
 from html import unescape
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from .cache import ResponseCache, fetch_normalized
+from .http import HttpTransport
+from .text import html_to_text
 
 API_URL = 'https://boards-api.greenhouse.io/v1/boards/{slug}/jobs?content=true'
 
 
-def _strip_html(html: str) -> str:
-    if not html:
-        return ''
-    text = re.sub(r'<[^>]+>', ' ', html)
-    text = unescape(text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+def _description(content: str) -> str:
+    # Greenhouse returns the posting body as entity-encoded HTML; decode it
+    # first so the tags are stripped rather than kept as literal text.
+    if '<' not in content and '&lt;' in content:
+        content = unescape(content)
+    return html_to_text(content)
 
 
-def fetch_jobs(slug: str) -> List[Dict]:
-    url = API_URL.format(slug=slug)
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    data = r.json()
+def _parse_jobs(data: Dict, slug: str) -> List[Dict]:
     out: List[Dict] = []
     for j in data.get('jobs', []):
         title = j.get('title') or ''
         location = (j.get('location') or {}).get('name') or ''
         abs_url = j.get('absolute_url') or ''
-        content = j.get('content') or ''
-        desc = _strip_html(content)
+        desc = _description(j.get('content') or '')
         updated = j.get('updated_at') or j.get('created_at')
         company = slug.title()
         out.append({
@@ -40,3 +36,9 @@ def fetch_jobs(slug: str) -> List[Dict]:
             'date_posted': updated,
         })
     return out
+
+
+def fetch_jobs(slug: str, transport: Optional[HttpTransport] = None,
+               cache: Optional[ResponseCache] = None) -> List[Dict]:
+    url = API_URL.format(slug=slug)
+    return fetch_normalized(url, lambda data: _parse_jobs(data, slug), transport, cache)
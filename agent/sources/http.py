@@ -0,0 +1,142 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    import requests
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+USER_AGENT = 'job-ai-agent/1.0 (+https://github.com/saiswaroopkakuru/Jobagent)'
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpTransport:
+    """Shared HTTP client for the source adapters.
+
+    Keeps one keep-alive connection pool per host, negotiates gzip, and retries
+    429/5xx responses and connection errors with jittered exponential backoff,
+    honoring Retry-After when the server sends it. Statuses left out of
+    `retry_statuses` are returned at once, e.g. for a scheduler that defers
+    throttled requests instead of sleeping on them.
+    """
+
+    def __init__(self, timeout: float = 30, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, pool_size: int = 10, retry_statuses=RETRY_STATUSES):
+        self.timeout = timeout
+        self.retry_statuses = frozenset(retry_statuses)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        # Imported here so commands that never crawl (query, rescore) start
+        # without loading requests and urllib3.
+        import requests
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+        self._mounted = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, cfg: Dict, retry_statuses=RETRY_STATUSES) -> 'HttpTransport':
+        sources_cfg = cfg.get('sources', {}) or {}
+        http_cfg = sources_cfg.get('http', {}) or {}
+        per_host = int(sources_cfg.get('per_host_limit', 0) or 0)
+        return cls(
+            timeout=float(http_cfg.get('timeout', 30)),
+            max_retries=int(http_cfg.get('max_retries', 3)),
+            backoff_base=float(http_cfg.get('backoff_base', 0.5)),
+            backoff_max=float(http_cfg.get('backoff_max', 30.0)),
+            pool_size=max(per_host, int(http_cfg.get('pool_size', 10))),
+            retry_statuses=retry_statuses,
+        )
+
+    def _mount(self, url: str):
+        parts = urlparse(url)
+        prefix = f'{parts.scheme}://{parts.netloc}/'
+        if prefix in self._mounted:
+            return
+        with self._lock:
+            if prefix not in self._mounted:
+                from requests.adapters import HTTPAdapter
+
+                self.session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size))
+                self._mounted.add(prefix)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> 'requests.Response':
+        import requests
+
+        self._mount(url)
+        attempt = 0
+        while True:
+            try:
+                r = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logging.info(f"Retrying {url} in {delay:.1f}s after {e.__class__.__name__}")
+            else:
+                if r.status_code not in self.retry_statuses or attempt >= self.max_retries:
+                    self._local.last = (r.status_code, int(r.headers.get('Content-Length') or len(r.content)),
+                                        r.elapsed.total_seconds())
+                    return r
+                delay = self._backoff(attempt, parse_retry_after(r.headers.get('Retry-After')))
+                logging.info(f"Retrying {url} in {delay:.1f}s after HTTP {r.status_code}")
+                r.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def last_response(self) -> Tuple[Optional[int], int, float]:
+        """(status, bytes, seconds to response headers) of the last response
+        returned to the calling thread."""
+        return getattr(self._local, 'last', (None, 0, 0.0))
+
+    def reset_last_response(self):
+        self._local.last = (None, 0, 0.0)
+
+    def close(self):
+        self.session.close()
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> HttpTransport:
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
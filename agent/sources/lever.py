@@ -1,32 +1,22 @@
 
-import requests
-import re
-from html import unescape
-from typing import Dict, List
-
-API_URL = 'https://api.lever.co/v0/postings/{slug}?mode=json'
+from typing import Dict, List, Optional
 
+from .cache import ResponseCache, fetch_normalized
+from .http import HttpTransport
+from .text import html_to_text
 
-def _strip_html(html: str) -> str:
-    if not html:
-        return ''
-    text = re.sub(r'<[^>}+>', ' ', html)
-    text = unescape(text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+API_URL = 'https://api.lever.co/v0/postings/{slug}?mode=json'
 
 
-def fetch_jobs(slug: str) -> List[Dict]:
-    url = API_URL.format(slug=slug)
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    arr = r.json()
+def _parse_jobs(arr: List[Dict], slug: str) -> List[Dict]:
     out: List[Dict] = []
     for j in arr:
-        title = (j.get('text') or {}).get('title') or j.get('title') or ''
+        # The postings API returns the title as a plain string in 'text'.
+        text = j.get('text')
+        title = (text.get('title') if isinstance(text, dict) else text) or j.get('title') or ''
         location = (j.get('categories') or {}).get('location') or ''
         abs_url = j.get('hostedUrl') or j.get('applyUrl') or ''
-        desc = _strip_html(j.get('descriptionPlain') or j.get('description') or '')
+        desc = html_to_text(j.get('descriptionPlain') or j.get('description') or '')
         created = j.get('createdAt')
         date_str = None
         if isinstance(created, (int, float)):
@@ -46,3 +36,9 @@ def fetch_jobs(slug: str) -> List[Dict]:
             'date_posted': date_str,
         })
     return out
+
+
+def fetch_jobs(slug: str, transport: Optional[HttpTransport] = None,
+               cache: Optional[ResponseCache] = None) -> List[Dict]:
+    url = API_URL.format(slug=slug)
+    return fetch_normalized(url, lambda arr: _parse_jobs(arr, slug), transport, cache)
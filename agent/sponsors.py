@@ -0,0 +1,169 @@
+import csv
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from rapidfuzz import fuzz, process
+except Exception:
+    fuzz = process = None
+
+
+DEFAULT_FUZZY_THRESHOLD = 90.0
+
+# Names shorter than this (after normalization) only match exactly; a single
+# edit is already a large share of 'brex' or 'block'.
+MIN_FUZZY_LENGTH = 5
+
+# Legal-form and filler words that differ between a board name, a careers
+# page and the employer name on a petition ("Stripe" vs "STRIPE, INC.").
+_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'llp', 'lp', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'plc', 'pllc', 'pc', 'gmbh', 'ag', 'sa', 'bv', 'the', 'usa', 'us', 'na',
+    'technologies', 'technology', 'holdings', 'group',
+}
+_PUNCT = re.compile(r"[^\w\s]+")
+
+# Column holding the employer name in CSV exports (USCIS H-1B Employer Data Hub
+# uses "Employer (Petitioner) Name", older exports "Employer").
+_EMPLOYER_COLUMN = re.compile(r'employer|petitioner|company', re.I)
+
+
+def normalize_company(name: str) -> str:
+    """Lower-case, drop punctuation and trailing/leading legal suffixes:
+    'Scale AI, Inc.' -> 'scale ai', 'The Walt Disney Company' -> 'walt disney'."""
+    s = _PUNCT.sub(' ', (name or '').lower().replace('&', ' and '))
+    words = s.split()
+    while words and words[-1] in _SUFFIXES:
+        words.pop()
+    while words and words[0] in _SUFFIXES:
+        words.pop(0)
+    return ' '.join(words)
+
+
+def _compact(normalized: str) -> str:
+    # Board slugs carry no spaces ('scaleai'), so names are also indexed joined.
+    return normalized.replace(' ', '')
+
+
+def read_sponsor_names(path: str, column: Optional[str] = None) -> List[str]:
+    """Employer names from a plain list (one per line) or a CSV export."""
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        if not path.lower().endswith('.csv'):
+            return [line.strip() for line in f if line.strip()]
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if column:
+            if column not in header:
+                raise ValueError(f'{path}: h1b.known_sponsors_column {column!r} is not a column '
+                                 f"(found: {', '.join(header) or 'no header'})")
+            idx = header.index(column)
+        else:
+            idx = next((i for i, h in enumerate(header) if _EMPLOYER_COLUMN.search(h)), 0)
+        return [row[idx].strip() for row in reader if len(row) > idx and row[idx].strip()]
+
+
+class SponsorIndex:
+    """Known H-1B sponsors, preloaded for exact, normalized and fuzzy lookup.
+
+    A company is looked up by its lower-cased name, then by its normalized
+    name (punctuation and legal suffixes removed) with and without spaces, and
+    finally with rapidfuzz against the space-less normalized names that share
+    its first character and a close enough length. The fuzzy pass only runs
+    for names the exact passes miss, and every result is memoized per company,
+    so a crawl pays for it once per board however many postings it has.
+
+    Supports `company in index`, so it stands in for the plain set of
+    lower-cased names scoring used before.
+    """
+
+    def __init__(self, names: Iterable[str], fuzzy_threshold: Optional[float] = DEFAULT_FUZZY_THRESHOLD):
+        self.exact: Dict[str, str] = {}
+        self.normalized: Dict[str, str] = {}
+        self._blocks: Dict[Tuple[str, int], List[str]] = {}
+        for name in names:
+            name = (name or '').strip()
+            if not name:
+                continue
+            self.exact.setdefault(name.lower(), name)
+            norm = normalize_company(name)
+            if not norm:
+                continue
+            compact = _compact(norm)
+            if compact not in self.normalized:
+                self.normalized[compact] = name
+                self._blocks.setdefault((compact[0], len(compact)), []).append(compact)
+            self.normalized.setdefault(norm, name)
+        self.fuzzy_threshold = fuzzy_threshold if process is not None else None
+        self._memo: Dict[str, Optional[str]] = {}
+
+    @classmethod
+    def from_file(cls, path: str, fuzzy_threshold: Optional[float] = DEFAULT_FUZZY_THRESHOLD,
+                  column: Optional[str] = None) -> 'SponsorIndex':
+        key = (os.path.abspath(path), os.path.getmtime(path), fuzzy_threshold, column)
+        index = _loaded.get(key)
+        if index is None:
+            index = cls(read_sponsor_names(path, column), fuzzy_threshold)
+            _loaded.clear()
+            _loaded[key] = index
+            logging.info(f'Loaded {len(index.exact)} known sponsors from {path}')
+        return index
+
+    @classmethod
+    def from_config(cls, cfg: Dict) -> 'SponsorIndex':
+        h1b_cfg = cfg.get('h1b', {}) or {}
+        path = h1b_cfg.get('known_sponsors_file')
+        threshold = h1b_cfg.get('fuzzy_threshold', DEFAULT_FUZZY_THRESHOLD)
+        threshold = float(threshold) if threshold else None
+        if path and os.path.isfile(path):
+            return cls.from_file(path, threshold, h1b_cfg.get('known_sponsors_column'))
+        return cls([], threshold)
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    def __contains__(self, company: str) -> bool:
+        return self.lookup(company) is not None
+
+    def lookup(self, company: str) -> Optional[str]:
+        """The known sponsor `company` resolves to, or None."""
+        company = (company or '').strip().lower()
+        if not company:
+            return None
+        try:
+            return self._memo[company]
+        except KeyError:
+            pass
+        match = self.exact.get(company)
+        if match is None:
+            match = self._resolve(normalize_company(company))
+        self._memo[company] = match
+        return match
+
+    def _resolve(self, norm: str) -> Optional[str]:
+        if not norm:
+            return None
+        compact = _compact(norm)
+        match = self.normalized.get(norm) or self.normalized.get(compact)
+        if match is not None or self.fuzzy_threshold is None or len(compact) < MIN_FUZZY_LENGTH:
+            return match
+        # fuzz.ratio is 2 * matches / (len(a) + len(b)), so names whose lengths
+        # differ by more than the threshold allows can never reach it.
+        n = len(compact)
+        slack = int(n * (100.0 - self.fuzzy_threshold) / self.fuzzy_threshold) + 1
+        candidates: List[str] = []
+        for length in range(n - slack, n + slack + 1):
+            candidates.extend(self._blocks.get((compact[0], length), ()))
+        best = process.extractOne(compact, candidates, scorer=fuzz.ratio, processor=None,
+                                  score_cutoff=self.fuzzy_threshold)
+        return self.normalized[best[0]] if best else None
+
+    def __getstate__(self):
+        # Workers get the index without the parent's memo.
+        state = self.__dict__.copy()
+        state['_memo'] = {}
+        return state
+
+
+_loaded: Dict[Tuple, SponsorIndex] = {}
@@ -0,0 +1,368 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Job
+from .sources.text import truncate_text
+
+_U64 = (1 << 64) - 1
+
+SCORE_COLUMNS = ('entry_level_score', 'h1b_confidence', 'resume_match', 'final_score')
+
+# Descriptions are kept once per distinct text, zlib-compressed, under a
+# 16-byte BLAKE2b digest of the text.
+DESCRIPTION_COMPRESSION = 6
+
+# Host parameters per IN (...) lookup; SQLite builds before 3.32 allow 999.
+_IN_CHUNK = 500
+
+
+def description_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def _inflate(body: Optional[bytes]) -> Optional[str]:
+    return zlib.decompress(body).decode('utf-8') if body is not None else None
+
+
+class JobStore:
+    """Persistence for scored jobs over a single long-lived SQLite connection.
+
+    The database runs in WAL mode and every batch is written with one
+    executemany upsert inside a single transaction.
+
+    Descriptions live in a content-addressed `descriptions` table that jobs
+    reference by digest: reposts, regional copies and unchanged postings
+    share one compressed blob, and a blob is only compressed and written the
+    first time its text is seen. Blobs no longer referenced by any job are
+    removed by compact(). With `max_description_chars`, descriptions are
+    stored cut to that length; scoring has already seen the full text. The
+    connection registers an inflate() SQL function
+    that the full-text triggers rely on, so the jobs table should only be
+    written through a JobStore.
+    """
+
+    def __init__(self, db_path: str, max_description_chars: Optional[int] = None):
+        self.db_path = db_path
+        self.max_description_chars = max_description_chars
+        parent = os.path.dirname(db_path)
+        if parent:
+            Path(parent).mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(db_path)
+        self.con.create_function('inflate', 1, _inflate, deterministic=True)
+        self.con.execute('PRAGMA journal_mode=WAL')
+        self.con.execute('PRAGMA synchronous=NORMAL')
+        self._migrate()
+
+    @classmethod
+    def from_config(cls, cfg: Dict) -> 'JobStore':
+        persistence_cfg = cfg.get('persistence', {}) or {}
+        max_chars = persistence_cfg.get('max_description_chars')
+        return cls(persistence_cfg.get('database_path', 'data/jobs.db'),
+                   max_description_chars=int(max_chars) if max_chars else None)
+
+    def __enter__(self) -> 'JobStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.con.close()
+
+    def _migrate(self):
+        with self.con:
+            self.con.execute(
+                '''CREATE TABLE IF NOT EXISTS jobs (
+                       job_id TEXT PRIMARY KEY,
+                       title TEXT,
+                       company TEXT,
+                       location TEXT,
+                       url TEXT,
+                       source TEXT,
+                       date_posted TEXT,
+                       first_seen TEXT,
+                       last_seen TEXT,
+                       description TEXT  -- inline text from older versions, see _migrate_descriptions
+                   )'''
+            )
+            columns = {row[1] for row in self.con.execute('PRAGMA table_info(jobs)')}
+            for col in SCORE_COLUMNS:
+                if col not in columns:
+                    self.con.execute(f'ALTER TABLE jobs ADD COLUMN {col} REAL')
+            if 'description_hash' not in columns:
+                self.con.execute('ALTER TABLE jobs ADD COLUMN description_hash BLOB')
+            self.con.execute(
+                '''CREATE TABLE IF NOT EXISTS descriptions (
+                       hash BLOB PRIMARY KEY,
+                       body BLOB NOT NULL,
+                       size INTEGER NOT NULL
+                   )'''
+            )
+            self.con.execute('CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(source)')
+            self.con.execute('CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company)')
+            self.con.execute('CREATE INDEX IF NOT EXISTS idx_jobs_last_seen ON jobs(last_seen)')
+            self.con.execute(
+                '''CREATE TABLE IF NOT EXISTS job_scores (
+                       job_id TEXT NOT NULL,
+                       score_key TEXT NOT NULL,
+                       content_hash TEXT NOT NULL,
+                       accepted INTEGER NOT NULL,
+                       entry_level_score REAL,
+                       h1b_confidence REAL,
+                       resume_match REAL,
+                       final_score REAL,
+                       last_seen TEXT,
+                       PRIMARY KEY (job_id, score_key)
+                   )'''
+            )
+            score_columns = {row[1] for row in self.con.execute('PRAGMA table_info(job_scores)')}
+            if 'profile' not in score_columns:
+                self.con.execute("ALTER TABLE job_scores ADD COLUMN profile TEXT NOT NULL DEFAULT ''")
+            if 'rejection' not in score_columns:
+                self.con.execute('ALTER TABLE job_scores ADD COLUMN rejection TEXT')
+            self.con.execute('CREATE INDEX IF NOT EXISTS idx_job_scores_profile ON job_scores(profile, accepted)')
+            self.con.execute(
+                '''CREATE TABLE IF NOT EXISTS job_fingerprints (
+                       job_id TEXT PRIMARY KEY,
+                       simhash INTEGER NOT NULL,
+                       cluster_id TEXT NOT NULL,
+                       last_seen TEXT
+                   )'''
+            )
+            self.con.execute('CREATE INDEX IF NOT EXISTS idx_fingerprints_cluster ON job_fingerprints(cluster_id)')
+        self._migrate_descriptions()
+        self.has_fts = self._migrate_fts()
+
+    def _migrate_descriptions(self):
+        """Move descriptions stored inline by older versions into blobs.
+
+        jobs.description is only read here; the index built over it is dropped
+        first and rebuilt over the blobs by _migrate_fts().
+        """
+        if not self.con.execute('SELECT 1 FROM jobs WHERE description IS NOT NULL LIMIT 1').fetchone():
+            return
+        logging.info('Moving stored job descriptions into compressed blobs')
+        with self.con:
+            self._drop_fts()
+            while True:
+                batch = self.con.execute(
+                    'SELECT rowid, description FROM jobs WHERE description IS NOT NULL LIMIT 1000').fetchall()
+                if not batch:
+                    break
+                hashes = self._store_descriptions(text for _, text in batch)
+                self.con.executemany('UPDATE jobs SET description_hash=?, description=NULL WHERE rowid=?',
+                                     [(h, rowid) for (rowid, _), h in zip(batch, hashes)])
+
+    def _drop_fts(self):
+        for trigger in ('jobs_fts_insert', 'jobs_fts_delete', 'jobs_fts_update'):
+            self.con.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        self.con.execute('DROP TABLE IF EXISTS jobs_fts')
+
+    def _migrate_fts(self) -> bool:
+        """Full-text index over jobs, kept in sync by triggers.
+
+        jobs_fts is an external-content FTS5 table keyed by the jobs rowid that
+        reads through the job_texts view, which inflates each description from
+        its blob, so descriptions are not stored twice. Returns False when the
+        SQLite build has no FTS5; search then falls back to LIKE scans.
+        """
+        row = self.con.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='jobs_fts'").fetchone()
+        if row and 'job_texts' in row[0]:
+            return True
+        text = '(SELECT inflate(body) FROM descriptions WHERE hash = {}.description_hash)'
+        try:
+            with self.con:
+                # Indexes from before descriptions moved out of jobs read jobs.description.
+                self._drop_fts()
+                self.con.execute(
+                    f'''CREATE VIEW IF NOT EXISTS job_texts AS
+                        SELECT j.rowid AS job_rowid, j.title, j.company, j.location, {text.format('j')} AS description
+                        FROM jobs j'''
+                )
+                self.con.execute(
+                    '''CREATE VIRTUAL TABLE jobs_fts USING fts5(
+                           title, company, location, description,
+                           content='job_texts', content_rowid='job_rowid', tokenize='porter unicode61'
+                       )'''
+                )
+                self.con.execute(
+                    f'''CREATE TRIGGER jobs_fts_insert AFTER INSERT ON jobs BEGIN
+                            INSERT INTO jobs_fts(rowid, title, company, location, description)
+                            VALUES (new.rowid, new.title, new.company, new.location, {text.format('new')});
+                        END'''
+                )
+                self.con.execute(
+                    f'''CREATE TRIGGER jobs_fts_delete AFTER DELETE ON jobs BEGIN
+                            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+                            VALUES ('delete', old.rowid, old.title, old.company, old.location, {text.format('old')});
+                        END'''
+                )
+                # Upserts rewrite every column on each run; only reindex rows whose text changed.
+                self.con.execute(
+                    f'''CREATE TRIGGER jobs_fts_update AFTER UPDATE OF title, company, location, description_hash
+                        ON jobs
+                        WHEN old.title IS NOT new.title OR old.company IS NOT new.company
+                             OR old.location IS NOT new.location OR old.description_hash IS NOT new.description_hash
+                        BEGIN
+                            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+                            VALUES ('delete', old.rowid, old.title, old.company, old.location, {text.format('old')});
+                            INSERT INTO jobs_fts(rowid, title, company, location, description)
+                            VALUES (new.rowid, new.title, new.company, new.location, {text.format('new')});
+                        END'''
+                )
+                self.con.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e:
+            logging.warning(f"SQLite full-text search unavailable ({e}); job search will use slow LIKE scans")
+            return False
+        return True
+
+    def _store_descriptions(self, texts: Iterable[Optional[str]]) -> List[Optional[bytes]]:
+        """Digests of `texts` (None for empty ones), writing blobs only for
+        texts not already stored. Runs inside the caller's transaction."""
+        texts = list(texts)
+        hashes = [description_digest(t) if t else None for t in texts]
+        pending = {h: t for h, t in zip(hashes, texts) if h is not None}
+        keys = list(pending)
+        for i in range(0, len(keys), _IN_CHUNK):
+            chunk = keys[i:i + _IN_CHUNK]
+            cur = self.con.execute(
+                f"SELECT hash FROM descriptions WHERE hash IN ({', '.join('?' * len(chunk))})", chunk)
+            for (h,) in cur:
+                del pending[h]
+        if pending:
+            self.con.executemany(
+                'INSERT OR IGNORE INTO descriptions (hash, body, size) VALUES (?, ?, ?)',
+                [(h, zlib.compress(t.encode('utf-8'), DESCRIPTION_COMPRESSION), len(t)) for h, t in pending.items()]
+            )
+        return hashes
+
+    def upsert_jobs(self, jobs: Iterable[Job]):
+        jobs = list(jobs)
+        if not jobs:
+            return
+        now = datetime.utcnow().isoformat()
+        with self.con:
+            hashes = self._store_descriptions(truncate_text(j.description or '', self.max_description_chars)
+                                              for j in jobs)
+            self.con.executemany(
+                '''INSERT INTO jobs (job_id, title, company, location, url, source, date_posted, first_seen,
+                                     last_seen, description_hash, entry_level_score, h1b_confidence, resume_match,
+                                     final_score)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(job_id) DO UPDATE SET
+                       last_seen=excluded.last_seen, title=excluded.title, company=excluded.company,
+                       location=excluded.location, url=excluded.url, source=excluded.source,
+                       date_posted=excluded.date_posted, description_hash=excluded.description_hash,
+                       entry_level_score=excluded.entry_level_score, h1b_confidence=excluded.h1b_confidence,
+                       resume_match=excluded.resume_match, final_score=excluded.final_score''',
+                [(j.id, j.title, j.company, j.location, j.url, j.source, j.date_posted, now, now, h,
+                  j.entry_level_score, j.h1b_confidence, j.resume_match, j.final_score)
+                 for j, h in zip(jobs, hashes)]
+            )
+
+    def load_descriptions(self, job_ids: Iterable[str]) -> Dict[str, str]:
+        """Stored descriptions by job id; jobs without one are left out."""
+        job_ids = list(job_ids)
+        out: Dict[str, str] = {}
+        for i in range(0, len(job_ids), _IN_CHUNK):
+            chunk = job_ids[i:i + _IN_CHUNK]
+            cur = self.con.execute(
+                f'''SELECT j.job_id, d.body FROM jobs j JOIN descriptions d ON d.hash = j.description_hash
+                    WHERE j.job_id IN ({', '.join('?' * len(chunk))})''',
+                chunk
+            )
+            out.update((jid, _inflate(body)) for jid, body in cur)
+        return out
+
+    def load_scores(self, score_key: str, profile: str = '') -> Dict[str, tuple]:
+        with self.con:
+            # Scores computed under another config can never be reused again.
+            self.con.execute('DELETE FROM job_scores WHERE profile = ? AND score_key != ?', (profile, score_key))
+            cur = self.con.execute(
+                '''SELECT job_id, content_hash, accepted, entry_level_score, h1b_confidence, resume_match,
+                          final_score, rejection
+                   FROM job_scores WHERE score_key = ?''',
+                (score_key,)
+            )
+            return {row[0]: row[1:] for row in cur.fetchall()}
+
+    def save_scores(self, score_key: str, rows: List[tuple], seen_ids: List[str], profile: str = ''):
+        """Store (job_id, content_hash, accepted, scores..., rejection reason)
+        rows for freshly scored jobs and bump last_seen in bulk for unchanged
+        jobs served from the cache. Rows are tagged with the profile they were
+        scored for."""
+        now = datetime.utcnow().isoformat()
+        with self.con:
+            self.con.executemany(
+                '''INSERT OR REPLACE INTO job_scores
+                       (job_id, score_key, content_hash, accepted, entry_level_score, h1b_confidence,
+                        resume_match, final_score, rejection, last_seen, profile)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                [(r[0], score_key, *r[1:], now, profile) for r in rows]
+            )
+            self.con.executemany(
+                'UPDATE job_scores SET last_seen=? WHERE job_id=? AND score_key=?',
+                [(now, jid, score_key) for jid in seen_ids]
+            )
+            self.con.executemany('UPDATE jobs SET last_seen=? WHERE job_id=?', [(now, jid) for jid in seen_ids])
+
+    def load_fingerprints(self) -> List[Tuple[str, int, str]]:
+        cur = self.con.execute('SELECT job_id, simhash, cluster_id FROM job_fingerprints')
+        return [(jid, fp & _U64, cluster_id) for jid, fp, cluster_id in cur.fetchall()]
+
+    def save_fingerprints(self, rows: Iterable[Tuple[str, int, str]]):
+        """Store (job_id, simhash, cluster_id); SimHashes are kept as signed 64-bit integers."""
+        now = datetime.utcnow().isoformat()
+        with self.con:
+            self.con.executemany(
+                '''INSERT INTO job_fingerprints (job_id, simhash, cluster_id, last_seen) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(job_id) DO UPDATE SET
+                       simhash=excluded.simhash, cluster_id=excluded.cluster_id, last_seen=excluded.last_seen''',
+                [(jid, fp - (1 << 64) if fp >> 63 else fp, cluster_id, now) for jid, fp, cluster_id in rows]
+            )
+
+    def compact(self, prune_days: Optional[int] = None) -> Dict[str, int]:
+        """Garbage-collect description blobs no longer referenced by any job,
+        optionally after forgetting postings not seen for `prune_days` days,
+        then VACUUM the file.
+
+        VACUUM may renumber the jobs rowids the full-text index is keyed by,
+        so the index is checked afterwards and rebuilt if it no longer lines
+        up. Returns counts of what was removed and the file size before and
+        after.
+        """
+        before = os.path.getsize(self.db_path)
+        removed = {'jobs': 0, 'scores': 0, 'fingerprints': 0}
+        with self.con:
+            if prune_days is not None:
+                cutoff = (datetime.utcnow() - timedelta(days=prune_days)).isoformat()
+                removed['jobs'] = self.con.execute('DELETE FROM jobs WHERE last_seen < ?', (cutoff,)).rowcount
+                removed['scores'] = self.con.execute(
+                    'DELETE FROM job_scores WHERE last_seen < ?', (cutoff,)).rowcount
+                removed['fingerprints'] = self.con.execute(
+                    'DELETE FROM job_fingerprints WHERE last_seen < ?', (cutoff,)).rowcount
+            removed['descriptions'] = self.con.execute(
+                '''DELETE FROM descriptions WHERE hash NOT IN
+                       (SELECT description_hash FROM jobs WHERE description_hash IS NOT NULL)'''
+            ).rowcount
+            if self.has_fts:
+                self.con.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('optimize')")
+        self.con.execute('VACUUM')
+        if self.has_fts:
+            try:
+                with self.con:
+                    self.con.execute("INSERT INTO jobs_fts(jobs_fts, rank) VALUES ('integrity-check', 1)")
+            except sqlite3.DatabaseError:
+                logging.info('Rebuilding the full-text index after VACUUM')
+                with self.con:
+                    self.con.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+        self.con.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        removed['bytes_before'] = before
+        removed['bytes_after'] = os.path.getsize(self.db_path)
+        return removed
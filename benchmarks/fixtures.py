@@ -0,0 +1,128 @@
+"""Deterministic Greenhouse/Lever board payloads for offline benchmarks.
+
+The JSON files under fixtures/ are hand-written in the exact shape the public
+board APIs return. build_boards() expands them into synthetic boards of any
+size, so each scale exercises the same adapter code paths as a live crawl.
+"""
+import copy
+import html
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+TITLES = [
+    'Software Engineer, New Grad', 'Software Engineer I', 'Junior Backend Engineer', 'Full Stack Engineer',
+    'Senior Software Engineer', 'Staff Engineer, Infrastructure', 'Machine Learning Engineer',
+    'Site Reliability Engineer', 'Engineering Manager', 'Data Analyst', 'Platform Engineer - Early Career',
+]
+LOCATIONS = [
+    'San Francisco, CA', 'New York, NY', 'Seattle, WA', 'Austin, TX', 'Remote - US', 'United States',
+    'London, United Kingdom', 'Toronto, Canada', 'Bengaluru, India', 'Chicago, IL', 'Boston, MA',
+]
+VOCAB = (
+    'python java javascript typescript react node sql postgresql mongodb aws docker kubernetes linux '
+    'data structures algorithms distributed systems services api backend frontend platform team customers '
+    'build design ship operate scale reliability performance security collaborate mentor learn growth '
+    'experience degree computer science graduate new grad early career university benefits equity '
+    'medical dental vision 401k parental leave equal opportunity employer diversity inclusion '
+    'visa sponsorship h-1b authorized work without sponsorship senior staff lead principal manager'
+).split()
+
+# Pseudo-words giving each posting its own topic vocabulary, the way real
+# postings differ in product names, tools and team jargon.
+_SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'su', 'ta', 'vo', 'ri', 'de', 'fa', 'go', 'hu', 'ji', 'pe', 'qu', 'zo']
+TOPIC_WORDS = [a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES]
+
+# Share of Greenhouse postings re-posted under another region and URL.
+REPOST_RATE = 0.05
+
+
+def load_sample(name: str):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _paragraphs(rng: random.Random, words: int, topic: List[str] = ()) -> List[str]:
+    out = []
+    while words > 0:
+        n = min(words, rng.randint(20, 80))
+        out.append(' '.join(rng.choice(topic) if topic and rng.random() < 0.3 else rng.choice(VOCAB)
+                            for _ in range(n)).capitalize() + '.')
+        words -= n
+    return out
+
+
+def _html_body(rng: random.Random, topic: List[str]) -> str:
+    paras = _paragraphs(rng, rng.randint(200, 1200), topic)
+    parts = ['<div class="content-intro">']
+    for i, p in enumerate(paras):
+        if i % 3 == 2:
+            parts.append('<ul>' + ''.join(f'<li>{s}</li>' for s in p.split(', ')) + '</ul>')
+        else:
+            parts.append(f'<p>{p} &amp; more &mdash; <a href="https://example.com/{i}">details</a></p>')
+    if rng.random() < 0.3:
+        parts.append('<script>window.dataLayer = window.dataLayer || []; dataLayer.push({"event": "view"});</script>')
+    if rng.random() < 0.3:
+        parts.append('<style>.job-post { color: #333; margin: 0 auto; }</style>')
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+def greenhouse_board(slug: str, n: int, seed: int = 0) -> Dict:
+    rng = random.Random(f'gh:{slug}:{seed}')
+    templates = load_sample('greenhouse_sample.json')['jobs']
+    jobs = []
+    for i in range(n):
+        j = copy.deepcopy(templates[i % len(templates)])
+        j['id'] = 5000000 + i
+        j['title'] = rng.choice(TITLES)
+        j['location'] = {'name': rng.choice(LOCATIONS)}
+        j['absolute_url'] = f'https://boards.greenhouse.io/{slug}/jobs/{5000000 + i}'
+        if i >= len(templates):
+            if i > len(templates) and rng.random() < REPOST_RATE:
+                original = rng.choice(jobs[len(templates):])
+                j['title'], j['content'] = original['title'], original['content']
+            else:
+                # Greenhouse returns content as entity-encoded HTML.
+                j['content'] = html.escape(_html_body(rng, rng.sample(TOPIC_WORDS, 60)))
+        jobs.append(j)
+    return {'jobs': jobs, 'meta': {'total': n}}
+
+
+def lever_board(slug: str, n: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(f'lever:{slug}:{seed}')
+    templates = load_sample('lever_sample.json')
+    jobs = []
+    for i in range(n):
+        j = copy.deepcopy(templates[i % len(templates)])
+        j['id'] = f'{slug}-{i:08d}'
+        j['text'] = rng.choice(TITLES)
+        j['categories']['location'] = rng.choice(LOCATIONS)
+        j['hostedUrl'] = f'https://jobs.lever.co/{slug}/{j["id"]}'
+        j['createdAt'] = 1736000000000 + i * 60000
+        if i >= len(templates):
+            topic = rng.sample(TOPIC_WORDS, 60)
+            j['description'] = _html_body(rng, topic)
+            # Roughly half the boards only ship HTML, which exercises the stripper.
+            j['descriptionPlain'] = None if rng.random() < 0.5 else ' '.join(_paragraphs(rng, 300, topic))
+        jobs.append(j)
+    return jobs
+
+
+def build_boards(total: int, seed: int = 0) -> Tuple[Dict[str, Dict], Dict[str, List[Dict]]]:
+    """Split `total` postings evenly over Greenhouse and Lever boards."""
+    boards = max(2, min(200, total // 50))
+    per_board = [total // boards + (1 if i < total % boards else 0) for i in range(boards)]
+    greenhouse: Dict[str, Dict] = {}
+    lever: Dict[str, List[Dict]] = {}
+    for i, n in enumerate(per_board):
+        if i % 2 == 0:
+            slug = f'ghco{i:03d}'
+            greenhouse[slug] = greenhouse_board(slug, n, seed)
+        else:
+            slug = f'lvco{i:03d}'
+            lever[slug] = lever_board(slug, n, seed)
+    return greenhouse, lever
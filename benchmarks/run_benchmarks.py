@@ -0,0 +1,319 @@
+import argparse
+import copy
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from html import unescape
+from typing import Callable, Dict, List, Optional
+
+# Ensure the project root (parent of this file) is on sys.path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from agent import filters as job_filters
+from agent import job_agent, resume_matching
+from agent.dedupe import NearDuplicateIndex
+from agent.matcher import merge_hits
+from agent.report import ReportWriter, TopJobs
+from agent.sources.text import html_to_text
+from agent.storage import JobStore
+from benchmarks.fixtures import build_boards
+from benchmarks.server import FixtureServer
+
+DEFAULT_SCALES = [100, 10000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+STAGES = ['fetch', 'strip_legacy', 'strip', 'dedupe', 'filter', 'match', 'score', 'persist', 'render']
+# CLI invocations timed by --startup, and the heavy imports each should avoid.
+STARTUP_COMMANDS = ['interpreter', 'import', 'help', 'query_cold', 'query']
+HEAVY_MODULES = ('requests', 'yaml', 'PyPDF2', 'smtplib', 'rapidfuzz')
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def legacy_strip_html(html: str) -> str:
+    """The three-pass stripper the adapters used before html_to_text, kept as a baseline."""
+    if not html:
+        return ''
+    text = re.sub(r'<[^>]+>', ' ', html)
+    text = unescape(text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def bench_config(greenhouse_boards: Dict, lever_boards: Dict) -> Dict:
+    cfg = job_agent.load_config(os.path.join(ROOT, 'config', 'config.example.yaml'))
+    cfg = copy.deepcopy(cfg)
+    cfg['sources'].update({
+        'greenhouse': sorted(greenhouse_boards),
+        'lever': sorted(lever_boards),
+        'cache': {'enabled': False},
+    })
+    cfg['h1b']['known_sponsors_file'] = os.path.join(ROOT, 'data', 'h1b_companies.txt')
+    # Keep every entry-level US posting so persist/render see a realistic load.
+    cfg['resume']['min_match_score'] = 0.0
+    return cfg
+
+
+def measure(fn: Callable[[], int], memory: bool) -> Dict:
+    """Run fn (which returns the number of items processed) and time it."""
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    items = fn()
+    wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+    result = {
+        'items': items,
+        'wall_s': round(wall, 6),
+        'cpu_s': round(cpu, 6),
+        'items_per_s': round(items / wall, 1) if wall > 0 else None,
+    }
+    if memory:
+        tracemalloc.start()
+        fn()
+        result['peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return result
+
+
+def run_scale(total: int, memory: bool, throttle: Optional[float] = None) -> Dict[str, Dict]:
+    gh_boards, lever_boards = build_boards(total)
+    cfg = bench_config(gh_boards, lever_boards)
+    profile = resume_matching.build_resume_profile(cfg)
+    ctx = job_agent.prepare_scoring(cfg, profile)
+
+    # Greenhouse bodies are entity-encoded; decode them up front so both
+    # strippers see the same markup and only the extraction is timed.
+    html_docs: List[str] = []
+    for data in gh_boards.values():
+        html_docs.extend(unescape(j.get('content') or '') for j in data['jobs'])
+    for data in lever_boards.values():
+        html_docs.extend(j.get('description') or '' for j in data)
+
+    results: Dict[str, Dict] = {}
+    state: Dict = {}
+
+    with FixtureServer(gh_boards, lever_boards, max_rps=throttle) as server, server.patch_sources():
+        def fetch() -> int:
+            before = server.bytes_served
+            state['raw'] = job_agent.fetch_all_jobs(cfg)
+            state['bytes'] = server.bytes_served - before
+            return len(state['raw'])
+
+        results['fetch'] = measure(fetch, memory)
+        results['fetch']['bytes'] = state['bytes']
+        results['fetch']['postings_served'] = total
+        results['fetch']['throttled'] = server.throttled
+
+    raw = state['raw']
+
+    def strip_with(fn: Callable[[str], str]) -> Callable[[], int]:
+        def strip() -> int:
+            for doc in html_docs:
+                fn(doc)
+            return len(html_docs)
+        return strip
+
+    def dedupe() -> int:
+        state['unique'] = len(job_agent.collapse_duplicates(raw, NearDuplicateIndex()))
+        return len(raw)
+
+    def filter_stage() -> int:
+        for rj in raw:
+            if not job_filters.is_us_location(rj.get('location') or ''):
+                continue
+            title_hits = ctx.matcher.scan(rj.get('title') or '')
+            description_hits = ctx.matcher.scan(rj.get('description') or '')
+            job_filters.entry_level_score(title_hits, description_hits)
+            job_filters.h1b_confidence(rj.get('company') or '', merge_hits(title_hits, description_hits),
+                                       ctx.known_sponsors)
+        return len(raw)
+
+    def match() -> int:
+        for rj in raw:
+            resume_matching.compute_match_score(f"{rj.get('title')}\n{rj.get('description')}", profile)
+        return len(raw)
+
+    def score() -> int:
+        state['scored'] = job_agent.score_and_filter_jobs(raw, cfg, profile, ctx)
+        return len(raw)
+
+    results['strip_legacy'] = measure(strip_with(legacy_strip_html), memory)
+    results['strip'] = measure(strip_with(html_to_text), memory)
+    results['dedupe'] = measure(dedupe, memory)
+    results['dedupe']['unique'] = state['unique']
+    results['filter'] = measure(filter_stage, memory)
+    results['match'] = measure(match, memory)
+    results['score'] = measure(score, memory)
+    scored = state['scored']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def persist() -> int:
+            with JobStore(os.path.join(tmp, f'jobs-{time.monotonic_ns()}.db')) as store:
+                store.upsert_jobs(scored)
+            return len(scored)
+
+        results['persist'] = measure(persist, memory)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = ReportWriter(exports=('json', 'csv'))
+
+        def render() -> int:
+            top = TopJobs(len(scored))
+            top.extend(scored)
+            writer.write(os.path.join(tmp, 'report.html'), top.sorted())
+            return len(scored)
+
+        results['render'] = measure(render, memory)
+    return results
+
+
+def _startup_argv(command: str) -> List[str]:
+    if command == 'interpreter':
+        return [sys.executable, '-c', 'pass']
+    if command == 'import':
+        return [sys.executable, '-c', 'import agent.__main__']
+    if command == 'help':
+        return [sys.executable, '-m', 'agent', '--help']
+    return [sys.executable, '-m', 'agent', 'query', '--config', 'config.yaml', 'python', '--limit', '1']
+
+
+def _import_profile(argv: List[str], cwd: str, env: Dict) -> Dict:
+    """Total import time and the heavy modules loaded, from -X importtime."""
+    proc = subprocess.run(argv[:1] + ['-X', 'importtime'] + argv[1:], cwd=cwd, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    total, heavy = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit() and not name.startswith('  '):
+            total += int(cumulative)
+        if name.strip() in HEAVY_MODULES:
+            heavy.add(name.strip())
+    return {'import_s': round(total / 1e6, 6), 'heavy_imports': sorted(heavy)}
+
+
+def run_startup(runs: int) -> Dict[str, Dict]:
+    """Wall time of short CLI invocations in fresh interpreters. `query_cold`
+    parses the YAML config every time; `query` reads the parsed-config cache."""
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(ROOT, 'config', 'config.example.yaml'), 'r', encoding='utf-8') as src, \
+                open(os.path.join(tmp, 'config.yaml'), 'w', encoding='utf-8') as dst:
+            dst.write(src.read())
+        os.makedirs(os.path.join(tmp, 'data'))
+        JobStore(os.path.join(tmp, 'data', 'jobs.db')).close()
+        base_env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))}
+        for command in STARTUP_COMMANDS:
+            env = dict(base_env, JOB_AGENT_CONFIG_CACHE='0' if command == 'query_cold' else
+                       os.path.join(tmp, 'config_cache'))
+            argv = _startup_argv(command)
+            subprocess.run(argv, cwd=tmp, env=env, stdout=subprocess.DEVNULL, check=True)  # warm up
+            times = []
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                subprocess.run(argv, cwd=tmp, env=env, stdout=subprocess.DEVNULL, check=True)
+                times.append(time.perf_counter() - t0)
+            times.sort()
+            results[command] = {'runs': runs, 'median_s': round(times[len(times) // 2], 6),
+                                'min_s': round(times[0], 6), **_import_profile(argv, tmp, env)}
+    return results
+
+
+def print_startup(results: Dict[str, Dict], baseline: Dict = None):
+    header = f"{'command':<12} {'median s':>9} {'min s':>9} {'import s':>9}  heavy imports"
+    print(header)
+    for command in STARTUP_COMMANDS:
+        r = results.get(command)
+        if not r:
+            continue
+        line = (f"{command:<12} {r['median_s']:>9.4f} {r['min_s']:>9.4f} {r['import_s']:>9.4f}  "
+                f"{', '.join(r['heavy_imports']) or '-'}")
+        base = (baseline or {}).get('startup', {}).get(command)
+        if base and base.get('median_s'):
+            line += f"  ({r['median_s'] / base['median_s']:.2f}x vs base)"
+        print(line)
+
+
+def print_table(results: Dict[str, Dict[str, Dict]], baseline: Dict = None):
+    header = f"{'scale':>8} {'stage':<12} {'items':>8} {'wall s':>9} {'cpu s':>9} {'items/s':>11} {'peak KB':>10}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for scale, stages in results.items():
+        for stage in STAGES:
+            r = stages.get(stage)
+            if not r:
+                continue
+            line = (f"{scale:>8} {stage:<12} {r['items']:>8} {r['wall_s']:>9.4f} {r['cpu_s']:>9.4f} "
+                    f"{r['items_per_s'] or 0:>11.1f} {r.get('peak_kb', 0):>10.1f}")
+            if baseline:
+                base = baseline.get('results', {}).get(scale, {}).get(stage)
+                if base and base.get('wall_s'):
+                    line += f" {r['wall_s'] / base['wall_s']:>7.2f}x"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks for the Job AI Agent pipeline')
+    parser.add_argument('--scales', type=str, default=','.join(str(s) for s in DEFAULT_SCALES),
+                        help='Comma-separated posting counts, e.g. 100,10000,100000')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak-memory pass')
+    parser.add_argument('--throttle', type=float, default=None, metavar='RPS',
+                        help='Rate-limit each fixture API to RPS requests/s (answering 429 beyond it)')
+    parser.add_argument('--startup', action='store_true',
+                        help='Time CLI startup (help, query) in fresh interpreters instead of the pipeline stages')
+    parser.add_argument('--runs', type=int, default=10, help='Repetitions per command for --startup (default: 10)')
+    parser.add_argument('--output', type=str, default=None, help='Where to write the JSON results')
+    parser.add_argument('--compare', type=str, default=None, help='Earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    if args.startup:
+        results, startup = {}, run_startup(args.runs)
+    else:
+        scales = [int(s) for s in args.scales.split(',') if s.strip()]
+        results = {str(scale): run_scale(scale, memory=not args.no_memory, throttle=args.throttle)
+                   for scale in scales}
+        startup = None
+
+    commit = _git_commit()
+    doc = {
+        'commit': commit,
+        'generated': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if startup is not None:
+        doc['startup'] = startup
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(doc, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    if startup is not None:
+        print_startup(startup, baseline)
+    else:
+        print_table(results, baseline)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
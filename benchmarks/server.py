@@ -0,0 +1,131 @@
+"""Local stand-in for the Greenhouse and Lever board APIs."""
+import hashlib
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from agent.sources import greenhouse, lever
+
+GREENHOUSE_PATH = re.compile(r'^/v1/boards/([^/]+)/jobs')
+LEVER_PATH = re.compile(r'^/v0/postings/([^/?]+)')
+
+
+class FixtureServer:
+    """Serves pre-encoded board payloads over HTTP on 127.0.0.1.
+
+    Payloads are serialized once up front so the benchmark measures the
+    client side only. Responses carry an ETag and honor If-None-Match, like
+    the real APIs. With `max_rps`, each API (greenhouse, lever) answers
+    requests beyond that rate with 429 and Retry-After, like a rate-limited
+    host.
+    """
+
+    def __init__(self, greenhouse_boards: Dict[str, Dict], lever_boards: Dict[str, List[Dict]],
+                 max_rps: Optional[float] = None, retry_after: int = 1):
+        self.payloads: Dict[str, bytes] = {}
+        for slug, data in greenhouse_boards.items():
+            self.payloads[f'greenhouse/{slug}'] = json.dumps(data).encode('utf-8')
+        for slug, data in lever_boards.items():
+            self.payloads[f'lever/{slug}'] = json.dumps(data).encode('utf-8')
+        self.etags = {k: '"' + hashlib.sha1(v).hexdigest() + '"' for k, v in self.payloads.items()}
+        self.bytes_served = 0
+        self.requests = 0
+        self.throttled = 0
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self._allowance: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self._httpd.server_port}'
+
+    def _admit(self, api: str) -> bool:
+        if not self.max_rps:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._allowance.get(api, (self.max_rps, now))
+            tokens = min(self.max_rps, tokens + (now - updated) * self.max_rps)
+            admitted = tokens >= 1
+            self._allowance[api] = (tokens - 1 if admitted else tokens, now)
+            if not admitted:
+                self.throttled += 1
+            return admitted
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                m = GREENHOUSE_PATH.match(self.path)
+                key = f'greenhouse/{m.group(1)}' if m else None
+                if not m:
+                    m = LEVER_PATH.match(self.path)
+                    key = f'lever/{m.group(1)}' if m else None
+                body = server.payloads.get(key) if key else None
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if not server._admit(key.split('/')[0]):
+                    self.send_response(429)
+                    self.send_header('Retry-After', str(server.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                etag = server.etags[key]
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.bytes_served += len(body)
+                    server.requests += 1
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @contextmanager
+    def patch_sources(self):
+        """Point the source adapters at this server for the duration of the block."""
+        old = (greenhouse.API_URL, lever.API_URL)
+        greenhouse.API_URL = self.base_url + '/v1/boards/{slug}/jobs?content=true'
+        lever.API_URL = self.base_url + '/v0/postings/{slug}?mode=json'
+        try:
+            yield self
+        finally:
+            greenhouse.API_URL, lever.API_URL = old
+
+    def __enter__(self) -> 'FixtureServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
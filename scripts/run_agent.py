@@ -1,5 +1,3 @@
-
-import argparse
 import os
 import sys
 
@@ -8,15 +6,7 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from agent.job_agent import run
-
-
-def main():
-    parser = argparse.ArgumentParser(description='Run the Enhanced Job AI Agent')
-    parser.add_argument('--config', type=str, default='config/config.yaml', help='Path to YAML config file')
-    args = parser.parse_args()
-    rp = run(args.config)
-    print(rp)
+from agent.__main__ import main
 
 
 if __name__ == '__main__':
@@ -0,0 +1,64 @@
+import os
+import time
+
+from agent.sources.cache import ResponseCache, fetch_normalized
+
+URL = 'https://boards-api.greenhouse.io/v1/boards/acme/jobs'
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeTransport:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, headers=None):
+        self.sent.append(headers)
+        return self.responses.pop(0)
+
+
+def _age(cache, seconds):
+    past = time.time() - seconds
+    os.utime(cache._path(URL), (past, past))
+
+
+def test_304_replays_cached_jobs(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    transport = FakeTransport([FakeResponse(200, ['job'], {'ETag': '"v1"'}), FakeResponse(304)])
+    assert fetch_normalized(URL, list, transport, cache) == ['job']
+    assert fetch_normalized(URL, list, transport, cache) == ['job']
+    assert transport.sent[1] == {'If-None-Match': '"v1"'}
+
+
+def test_304_keeps_entry_alive_past_max_age(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age=100)
+    transport = FakeTransport([FakeResponse(200, ['job'], {'ETag': '"v1"'}),
+                               FakeResponse(304), FakeResponse(304)])
+    fetch_normalized(URL, list, transport, cache)
+    _age(cache, 90)
+    fetch_normalized(URL, list, transport, cache)
+    # Stored 150s ago, but confirmed by the 304 60s ago.
+    _age(cache, 60)
+    assert cache.get(URL) is not None
+    assert fetch_normalized(URL, list, transport, cache) == ['job']
+
+
+def test_unconfirmed_entry_expires(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age=100)
+    cache.put(URL, {'ETag': '"v1"'}, ['job'])
+    _age(cache, 101)
+    assert cache.get(URL) is None
+    cache.prune()
+    assert not os.path.exists(cache._path(URL))
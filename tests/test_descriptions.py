@@ -0,0 +1,63 @@
+import zlib
+
+import pytest
+
+from agent.models import Job
+from agent.storage import JobStore, description_digest
+
+
+def _job(job_id, description):
+    return Job(job_id, 'Software Engineer', 'Acme', 'Remote - US', f'https://example.com/{job_id}',
+               'greenhouse:acme', description)
+
+
+@pytest.fixture
+def store(tmp_path):
+    with JobStore(str(tmp_path / 'jobs.db')) as store:
+        yield store
+
+
+def _blob_count(store):
+    return store.con.execute('SELECT COUNT(*) FROM descriptions').fetchone()[0]
+
+
+def test_round_trips_compressed_text(store):
+    text = 'Café résumé — build APIs in Python.\n' * 50
+    store.upsert_jobs([_job('a', text)])
+    assert store.load_descriptions(['a']) == {'a': text}
+    body, size = store.con.execute('SELECT body, size FROM descriptions').fetchone()
+    assert size == len(text)
+    assert len(body) < len(text.encode('utf-8'))
+    assert zlib.decompress(body).decode('utf-8') == text
+
+
+def test_identical_descriptions_share_one_blob(store):
+    store.upsert_jobs([_job('a', 'Same text'), _job('b', 'Same text'), _job('c', 'Other text')])
+    store.upsert_jobs([_job('d', 'Same text')])
+    assert _blob_count(store) == 2
+    hashes = dict(store.con.execute('SELECT job_id, description_hash FROM jobs'))
+    assert hashes['a'] == hashes['b'] == hashes['d'] == description_digest('Same text')
+
+
+def test_empty_descriptions_store_no_blob(store):
+    store.upsert_jobs([_job('a', '')])
+    assert _blob_count(store) == 0
+    assert store.load_descriptions(['a']) == {}
+
+
+def test_compact_removes_unreferenced_blobs(store):
+    store.upsert_jobs([_job('a', 'First version'), _job('b', 'Kept')])
+    store.upsert_jobs([_job('a', 'Second version')])
+    assert _blob_count(store) == 3
+    removed = store.compact()
+    assert removed['descriptions'] == 1
+    assert _blob_count(store) == 2
+    assert store.load_descriptions(['a', 'b']) == {'a': 'Second version', 'b': 'Kept'}
+
+
+def test_max_description_chars_truncates_stored_text(tmp_path):
+    with JobStore(str(tmp_path / 'jobs.db'), max_description_chars=20) as store:
+        store.upsert_jobs([_job('a', 'word ' * 100)])
+        stored = store.load_descriptions(['a'])['a']
+    # Cut at the last word boundary within the limit.
+    assert stored == 'word word word word'
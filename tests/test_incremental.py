@@ -0,0 +1,69 @@
+from agent import job_agent
+from agent.metrics import RunMetrics
+from agent.resume_matching import ResumeProfile
+from agent.storage import JobStore
+
+PROFILE = ResumeProfile({'python': 1.0, 'sql': 0.5}, {'software engineer'})
+
+
+def _config(min_match_score=0.3):
+    return {
+        'resume': {'use_pdf': False, 'min_match_score': min_match_score},
+        'filters': {'require_us_location': True},
+        'persistence': {'incremental': True},
+    }
+
+
+def _posting(i, description='Python and SQL services.', location='Remote - US'):
+    return {'title': 'Software Engineer', 'company': f'Company {i}', 'location': location,
+            'url': f'https://example.com/jobs/{i}', 'source': 'greenhouse:example', 'description': description}
+
+
+def _run(store, postings, cfg=None):
+    cfg = cfg or _config()
+    metrics = RunMetrics()
+    accepted, fresh = job_agent.score_incrementally(postings, cfg, PROFILE, store, metrics=metrics)
+    store.upsert_jobs(fresh)
+    return accepted, fresh, metrics
+
+
+def test_unchanged_postings_reuse_stored_scores(tmp_path):
+    postings = [_posting(i) for i in range(3)] + [_posting(9, location='Berlin, Germany')]
+    with JobStore(str(tmp_path / 'jobs.db')) as store:
+        first, fresh, metrics = _run(store, postings)
+        assert len(first) == len(fresh) == 3
+        assert metrics.counts['scored_fresh'] == 4
+
+        again, fresh, metrics = _run(store, postings)
+        assert fresh == []
+        assert [(j.id, j.final_score) for j in again] == [(j.id, j.final_score) for j in first]
+        assert (metrics.counts['unchanged'], metrics.counts['cached_scores_reused']) == (4, 3)
+        # Cached rejections are still reported under their filter reason.
+        assert metrics.rejections[''] == {'non_us_location': 1}
+
+
+def test_changed_content_is_scored_again(tmp_path):
+    postings = [_posting(i) for i in range(3)]
+    with JobStore(str(tmp_path / 'jobs.db')) as store:
+        _run(store, postings)
+        postings[1] = _posting(1, description='Frontend only, TypeScript.')
+        accepted, fresh, metrics = _run(store, postings)
+        assert fresh == []
+        assert len(accepted) == 2
+        assert metrics.counts['scored_fresh'] == 1
+        assert metrics.rejections[''] == {'low_resume_match': 1}
+
+
+def test_config_change_invalidates_stored_scores(tmp_path):
+    postings = [_posting(i) for i in range(3)]
+    with JobStore(str(tmp_path / 'jobs.db')) as store:
+        _run(store, postings)
+        key = job_agent.prepare_scoring(_config(), PROFILE).score_key
+        assert job_agent.prepare_scoring(_config(0.9), PROFILE).score_key != key
+
+        accepted, fresh, metrics = _run(store, postings, _config(0.9))
+        assert len(fresh) == 3
+        assert (metrics.counts['scored_fresh'], metrics.counts['cached_scores_reused']) == (3, 0)
+        # Rows stored under the old key are dropped once the new key is in use.
+        keys = {row[0] for row in store.con.execute('SELECT DISTINCT score_key FROM job_scores')}
+        assert key not in keys
@@ -0,0 +1,60 @@
+import pytest
+
+from agent.filters import is_us_location
+from agent.locations import resolve_location
+
+
+@pytest.mark.parametrize('location', [
+    'Latin America',
+    'South America',
+    'Central America',
+    'Americas',
+    'Remote - Latin America',
+    'America/Bogota',
+    'America/Sao_Paulo',
+])
+def test_american_regions_abroad_are_not_us(location):
+    assert not is_us_location(location)
+
+
+@pytest.mark.parametrize('location', [
+    'United States of America',
+    'Remote - US',
+    'New York, NY',
+])
+def test_us_names_still_resolve(location):
+    assert is_us_location(location)
+
+
+@pytest.mark.parametrize('location, state', [
+    ('Portland, ME', 'ME'),
+    ('Portland, Maine', 'ME'),
+    ('Portland, OR', 'OR'),
+    ('Portland', 'OR'),
+    ('Kansas City, KS', 'KS'),
+])
+def test_explicit_state_beats_city(location, state):
+    loc = resolve_location(location)
+    assert loc.is_us
+    assert loc.state == state
+
+
+@pytest.mark.parametrize('location, country', [
+    ('Tbilisi, Georgia', 'GE'),
+    ('San Jose, Costa Rica', 'CR'),
+])
+def test_country_abroad_beats_us_place_name(location, country):
+    assert not is_us_location(location)
+    assert resolve_location(location).country == country
+
+
+@pytest.mark.parametrize('location, state', [
+    ('Atlanta, Georgia', 'GA'),
+    ('Remote - Georgia', 'GA'),
+    ('San Jose, CA', 'CA'),
+    ('Remote - US, Canada', None),
+])
+def test_us_places_without_a_country_abroad(location, state):
+    loc = resolve_location(location)
+    assert loc.is_us
+    assert loc.state == state
@@ -0,0 +1,55 @@
+import pytest
+
+from agent.filters import compute_entry_level_score
+from agent.matcher import KeywordMatcher, plural, term_forms, tokenize
+from agent.relevance import BM25Relevance
+
+
+def _found(terms, text):
+    return KeywordMatcher({'k': terms}).find_terms(tokenize(text))
+
+
+@pytest.mark.parametrize('term,text', [
+    ('java', 'JavaScript and TypeScript'),
+    ('lead', 'leading a small team'),
+    ('go', 'good communication'),
+    ('data structures', 'structures of data'),
+])
+def test_whole_words_do_not_match_inside_other_words(term, text):
+    assert _found([term], text) == set()
+
+
+@pytest.mark.parametrize('term,text', [
+    ('java', 'Java, Kotlin'),
+    ('manager', 'reports to engineering managers'),
+    ('class', 'two classes'),
+    ('data structure', 'Data Structures and Algorithms'),
+    ('new grad*', 'New Graduate Software Engineer'),
+    ('new grad*', 'new grads welcome'),
+    ('new grad*', 'new grad'),
+    ('c++', 'C++ and Rust'),
+])
+def test_terms_match_words_plurals_and_prefixes(term, text):
+    assert _found([term], text) == {term}
+
+
+def test_plural_only_applies_to_words():
+    assert plural('bus') == 'buses'
+    assert plural('c++') is None
+    assert plural('go') is None
+    assert term_forms('new grad*') == ([('new', 'grad')], True)
+
+
+def test_seniority_exclusion_covers_plural_titles():
+    cfg = {'filters': {}}
+    assert compute_entry_level_score('Engineering Managers', '', cfg) == 0.0
+    assert compute_entry_level_score('Leading Edge Software Engineer', '', cfg) > 0.0
+    assert compute_entry_level_score('Software Engineer', 'open to new graduates', cfg) == 0.8
+
+
+def test_bm25_counts_every_form_of_a_skill():
+    relevance = BM25Relevance({'data structure': 1.0, 'api': 1.0})
+    once = relevance.score_tokens(tokenize('data structure design, apis'), 4000)
+    twice = relevance.score_tokens(tokenize('data structure and data structures, api and apis'), 4000)
+    assert 0.0 < once < twice
+    assert relevance.score('structured data') == 0.0
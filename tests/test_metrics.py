@@ -0,0 +1,21 @@
+from collections import Counter
+
+from agent.metrics import RunMetrics
+
+
+def test_single_profile_rejections_stay_flat():
+    metrics = RunMetrics()
+    metrics.add_rejections(Counter(non_us_location=3))
+    metrics.add_rejections(Counter(non_us_location=1, seniority=2))
+    assert metrics.summary()['rejections'] == {'non_us_location': 4, 'seniority': 2}
+
+
+def test_rejections_are_reported_per_profile():
+    metrics = RunMetrics()
+    # Both profiles filter the same 800 postings.
+    metrics.add_rejections(Counter(non_us_location=800), 'alice')
+    metrics.add_rejections(Counter(non_us_location=800, low_resume_match=5), 'bob')
+    assert metrics.summary()['rejections'] == {
+        'alice': {'non_us_location': 800},
+        'bob': {'non_us_location': 800, 'low_resume_match': 5},
+    }
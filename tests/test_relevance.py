@@ -0,0 +1,66 @@
+from agent import job_agent
+from agent.relevance import BM25Relevance, CorpusStats
+from agent.storage import JobStore
+
+SKILLS = {'python': 1.0, 'sql': 0.8, 'data structures': 0.9, 'kubernetes': 0.5}
+
+
+def _config(db_path):
+    return {
+        'resume': {'use_pdf': False, 'skills': SKILLS, 'min_match_score': 0.35, 'relevance': 'bm25'},
+        'filters': {'require_us_location': True},
+        'persistence': {'database_path': db_path, 'incremental': True},
+    }
+
+
+def _postings():
+    bodies = [
+        'Python and SQL every day.',
+        'Python services, SQL reporting, data structures interviews.',
+        'Kubernetes operators written in Python.',
+        'We like data structures and Python.',
+        'Frontend role, TypeScript only.',
+        'SQL analyst working with Python notebooks.',
+    ]
+    return [{'title': 'Software Engineer', 'company': f'Company {i}', 'location': 'Remote - US',
+             'url': f'https://example.com/jobs/{i}', 'source': 'greenhouse:example', 'description': body}
+            for i, body in enumerate(bodies * 5)]
+
+
+def _accepted(db_path):
+    cfg = _config(db_path)
+    postings = _postings()
+    corpus = job_agent.prepare_corpus(cfg)
+    corpus.add(postings)
+    with JobStore(db_path) as store:
+        profiles = job_agent.prepare_profiles(cfg, store, corpus=corpus)
+        accepted_by, changed = job_agent.score_batch(postings, profiles, store)
+        store.upsert_jobs(changed)
+    return {(j.id, j.final_score) for j in accepted_by['']}
+
+
+def test_corpus_counts_every_posting_once():
+    corpus = CorpusStats(SKILLS)
+    corpus.add(_postings())
+    assert corpus.total == 30
+    assert corpus.doc_freq('Python') == 25
+    assert corpus.doc_freq('data structures') == 10
+    assert corpus.doc_freq('kubernetes') == 5
+
+
+def test_same_postings_score_the_same_cold_and_warm(tmp_path):
+    db_path = str(tmp_path / 'jobs.db')
+    cold = _accepted(db_path)
+    assert cold
+    # The second run finds only accepted postings stored; scores must not
+    # depend on them.
+    assert _accepted(db_path) == cold
+    assert _accepted(str(tmp_path / 'fresh.db')) == cold
+
+
+def test_idf_comes_from_the_corpus():
+    corpus = CorpusStats(SKILLS)
+    corpus.add(_postings())
+    relevance = BM25Relevance.from_config({'resume': {'relevance': 'bm25'}}, SKILLS, corpus)
+    assert relevance.weights['kubernetes'] / SKILLS['kubernetes'] > relevance.weights['python'] / SKILLS['python']
+    assert BM25Relevance.from_config({'resume': {}}, SKILLS, corpus) is None
@@ -0,0 +1,133 @@
+import pytest
+
+from agent import scheduler as scheduler_module
+from agent.scheduler import MIN_RATE, CrawlScheduler, TokenBucket
+
+HOST = 'boards-api.greenhouse.io'
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler_module.time, 'monotonic', clock)
+    return clock
+
+
+def _ok(sched, n, latency=0.1, board='b'):
+    for _ in range(n):
+        assert sched.complete(HOST, board, 200, latency) is False
+
+
+def test_token_bucket_spaces_requests_after_the_burst():
+    bucket = TokenBucket(rate=2.0, burst=2.0, now=0.0)
+    bucket.tokens = 2.0
+    assert bucket.reserve(0.0) == 0.0
+    assert bucket.reserve(0.0) == 0.0
+    assert bucket.reserve(0.0) == pytest.approx(0.5)
+    assert bucket.reserve(0.0) == pytest.approx(1.0)
+    # Tokens refill at `rate`, capped at `burst`.
+    assert bucket.reserve(10.0) == 0.0
+    assert bucket.tokens == pytest.approx(1.0)
+
+
+def test_limit_grows_after_a_window_of_healthy_responses(clock):
+    sched = CrawlScheduler(concurrency=2, max_concurrency=3)
+    sched._host(HOST)
+    _ok(sched, 1)
+    assert sched.hosts[HOST].limit == 2
+    _ok(sched, 1)
+    assert sched.hosts[HOST].limit == 3
+    _ok(sched, 6)
+    assert sched.hosts[HOST].limit == 3
+
+
+def test_limit_shrinks_when_latency_rises(clock):
+    sched = CrawlScheduler(concurrency=4, latency_factor=2.0)
+    _ok(sched, 4, latency=0.1)
+    assert sched.hosts[HOST].limit == 5
+    _ok(sched, 15, latency=2.0)
+    assert sched.hosts[HOST].limit < 5
+    assert sched.stats()[HOST]['limit_max'] == 5
+
+
+def test_throttle_halves_limit_starts_cooldown_and_rate_limits(clock):
+    sched = CrawlScheduler(concurrency=8, retry_delay=5.0)
+    assert sched.complete(HOST, 'b', 429, 0.1, admitted=clock.now) is True
+    h = sched.hosts[HOST]
+    assert h.limit == 4
+    assert h.cooldown_until == clock.now + 5.0
+    assert h.bucket is not None and h.bucket.rate >= MIN_RATE
+    assert not sched.ready(HOST)
+    clock.now += 5.0
+    assert sched.ready(HOST)
+
+
+def test_retry_after_sets_the_cooldown_up_to_the_cap(clock):
+    sched = CrawlScheduler(concurrency=4, max_cooldown=30.0)
+    sched.complete(HOST, 'b', 503, 0.1, retry_after=600.0, admitted=clock.now)
+    assert sched.hosts[HOST].cooldown_until == clock.now + 30.0
+
+
+def test_one_backoff_per_throttle_episode(clock):
+    sched = CrawlScheduler(concurrency=8, retry_delay=1.0)
+    admitted = clock.now
+    clock.now += 0.5
+    sched.complete(HOST, 'a', 429, 0.1, admitted=admitted)
+    rate = sched.hosts[HOST].bucket.rate
+    # Requests already in flight when the host was backed off come back
+    # throttled too; they are counted but do not halve the host again.
+    sched.complete(HOST, 'b', 429, 0.1, admitted=admitted)
+    sched.complete(HOST, 'c', 429, 0.1, admitted=admitted)
+    h = sched.hosts[HOST]
+    assert h.limit == 4
+    assert h.bucket.rate == rate
+    assert h.stats['throttled'] == 3
+    # A request admitted after the backoff starts a new episode.
+    clock.now += 2.0
+    sched.complete(HOST, 'd', 429, 0.1, admitted=clock.now)
+    assert h.limit == 2
+    assert h.cooldown_until == clock.now + 2.0
+
+
+def test_throttled_boards_are_deferred_then_dropped(clock):
+    sched = CrawlScheduler(concurrency=4, max_deferrals=2)
+    assert sched.complete(HOST, 'b', 429, 0.1) is True
+    assert sched.complete(HOST, 'b', 429, 0.1) is True
+    assert sched.complete(HOST, 'b', 429, 0.1) is False
+    stats = sched.stats()[HOST]
+    assert (stats['deferred'], stats['dropped']) == (2, 1)
+
+
+def test_deferred_board_that_succeeds_is_recovered(clock):
+    sched = CrawlScheduler(concurrency=4)
+    assert sched.complete(HOST, 'b', 503, 0.1) is True
+    assert sched.complete(HOST, 'b', 200, 0.1) is False
+    assert sched.stats()[HOST]['recovered'] == 1
+
+
+def test_rate_recovers_towards_the_configured_rate(clock):
+    sched = CrawlScheduler(concurrency=1, max_concurrency=1, rate=4.0)
+    sched.complete(HOST, 'b', 429, 0.1, admitted=clock.now)
+    h = sched.hosts[HOST]
+    assert h.bucket.rate == 2.0
+    _ok(sched, 1)
+    assert h.bucket.rate == pytest.approx(2.5)
+    _ok(sched, 10)
+    assert h.bucket.rate == 4.0
+
+
+def test_slot_counts_requests_in_flight():
+    sched = CrawlScheduler(concurrency=2)
+    with sched.slot(HOST):
+        with sched.slot(HOST) as admitted:
+            assert sched.hosts[HOST].in_flight == 2
+            assert sched.complete(HOST, 'b', 200, 0.01, admitted=admitted) is False
+    assert sched.hosts[HOST].in_flight == 0
@@ -0,0 +1,40 @@
+import pytest
+
+from agent.models import Job
+from agent.search import search_jobs
+from agent.storage import JobStore
+
+
+def _job(job_id, title, final_score, description='Build data pipelines in Python.'):
+    return Job(job_id, title, 'Acme', 'Remote - US', f'https://example.com/{job_id}', 'greenhouse:acme',
+               description, final_score=final_score)
+
+
+@pytest.fixture
+def store(tmp_path):
+    with JobStore(str(tmp_path / 'jobs.db')) as store:
+        # jobs.final_score is the best score across profiles.
+        store.upsert_jobs([_job('a', 'Data Engineer', 0.9), _job('b', 'Backend Engineer', 0.8)])
+        store.save_scores('key-alice', [('a', 'h', 1, 0, 0, 0, 0.3, None), ('b', 'h', 1, 0, 0, 0, 0.8, None)],
+                          [], profile='alice')
+        store.save_scores('key-bob', [('a', 'h', 1, 0, 0, 0, 0.9, None), ('b', 'h', 0, 0, 0, 0, 0.1, 'skills')],
+                          [], profile='bob')
+        yield store
+
+
+def _ids(rows):
+    return sorted(r['job_id'] for r in rows)
+
+
+def test_min_score_uses_best_score_without_candidate(store):
+    assert _ids(search_jobs(store, min_score=0.85)) == ['a']
+
+
+def test_min_score_uses_candidate_score(store):
+    assert _ids(search_jobs(store, profile='alice', min_score=0.5)) == ['b']
+    assert _ids(search_jobs(store, profile='bob', min_score=0.5)) == ['a']
+    assert _ids(search_jobs(store, profile='alice')) == ['a', 'b']
+
+
+def test_full_text_search_with_candidate(store):
+    assert _ids(search_jobs(store, text='python', profile='alice', min_score=0.5)) == ['b']
@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+
+from agent.models import Job
+from agent.storage import SCORE_COLUMNS, JobStore
+
+
+def _job(job_id, title='Software Engineer', description='Build services in Python.', final_score=0.5):
+    return Job(job_id, title, 'Acme', 'Remote - US', f'https://example.com/{job_id}', 'greenhouse:acme',
+               description, final_score=final_score)
+
+
+def _fts_ids(store, query):
+    cur = store.con.execute(
+        'SELECT j.job_id FROM jobs_fts JOIN jobs j ON j.rowid = jobs_fts.rowid WHERE jobs_fts MATCH ?', (query,))
+    return sorted(row[0] for row in cur)
+
+
+@pytest.fixture
+def store(tmp_path):
+    with JobStore(str(tmp_path / 'jobs.db')) as store:
+        if not store.has_fts:
+            pytest.skip('SQLite build without FTS5')
+        yield store
+
+
+def test_migrates_a_database_from_before_scores_and_blobs(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    con = sqlite3.connect(path)
+    con.execute('''CREATE TABLE jobs (job_id TEXT PRIMARY KEY, title TEXT, company TEXT, location TEXT, url TEXT,
+                                      source TEXT, date_posted TEXT, first_seen TEXT, last_seen TEXT,
+                                      description TEXT)''')
+    con.execute("INSERT INTO jobs VALUES ('old', 'Data Engineer', 'Acme', 'Austin, TX', 'u', 's', NULL, 't', 't',"
+                " 'Spark and Kafka pipelines')")
+    con.commit()
+    con.close()
+
+    with JobStore(path) as store:
+        columns = {row[1] for row in store.con.execute('PRAGMA table_info(jobs)')}
+        assert set(SCORE_COLUMNS) | {'description_hash'} <= columns
+        score_columns = {row[1] for row in store.con.execute('PRAGMA table_info(job_scores)')}
+        assert {'profile', 'rejection'} <= score_columns
+        assert store.con.execute('SELECT description FROM jobs').fetchone() == (None,)
+        assert store.load_descriptions(['old']) == {'old': 'Spark and Kafka pipelines'}
+        if store.has_fts:
+            assert _fts_ids(store, 'kafka') == ['old']
+
+    # Reopening a migrated database changes nothing.
+    with JobStore(path) as store:
+        assert store.load_descriptions(['old']) == {'old': 'Spark and Kafka pipelines'}
+
+
+def test_fts_follows_inserts_updates_and_deletes(store):
+    store.upsert_jobs([_job('a', description='Rust compilers'), _job('b', description='Go microservices')])
+    assert _fts_ids(store, 'rust') == ['a']
+    assert _fts_ids(store, 'microservice') == ['b']
+
+    store.upsert_jobs([_job('a', title='Compiler Engineer', description='LLVM backends')])
+    assert _fts_ids(store, 'rust') == []
+    assert _fts_ids(store, 'llvm') == ['a']
+    assert _fts_ids(store, 'title:compiler') == ['a']
+
+    with store.con:
+        store.con.execute("DELETE FROM jobs WHERE job_id = 'b'")
+    assert _fts_ids(store, 'microservice') == []
+    store.con.execute("INSERT INTO jobs_fts(jobs_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def test_upsert_keeps_first_seen_and_updates_scores(store):
+    store.upsert_jobs([_job('a', final_score=0.2)])
+    first_seen, = store.con.execute("SELECT first_seen FROM jobs WHERE job_id = 'a'").fetchone()
+    store.upsert_jobs([_job('a', final_score=0.7)])
+    assert store.con.execute("SELECT first_seen, final_score FROM jobs WHERE job_id = 'a'").fetchone() == \
+        (first_seen, 0.7)
+    assert store.con.execute('SELECT COUNT(*) FROM jobs').fetchone() == (1,)
+
+
+def test_upsert_writes_a_batch_in_one_transaction(store):
+    # A batch that fails part-way leaves neither its jobs nor its blobs behind.
+    bad = _job('c', description='Partial batch')
+    bad.final_score = object()
+    with pytest.raises(sqlite3.Error):
+        store.upsert_jobs([_job('b', description='Earlier row'), bad])
+    assert store.con.execute('SELECT COUNT(*) FROM jobs').fetchone() == (0,)
+    assert store.con.execute('SELECT COUNT(*) FROM descriptions').fetchone() == (0,)